@@ -0,0 +1,217 @@
+"""
+a local stub of the AI service (the Gemini 'generateContent' and 'streamGenerateContent' methods), for
+the AI benchmarks and for trying the AI commands without an API key or a network connection
+
+every request gets a valid quiz about the topic found in the prompt, after a delay. the streaming method
+sends the quiz as server-sent events, in pieces spread over the delay. with --faults the answers have the
+mistakes of a real model: repeated questions, numbers written as text, broken questions and cut-off JSON
+
+usage:
+    python benchmarks/ai_stub_server.py --port 8000 --latency 2
+    QUIZ_ENGINE_AI_BASE_URL=http://127.0.0.1:8000/v1beta python main.py generate --topic Rome --topic Mars --api-key test
+"""
+import argparse
+import json
+import random
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOPIC_PATTERN = re.compile(r"topic: '(.*?)'")
+COUNT_PATTERN = re.compile(r"with (\d+) multiple-choice questions")
+SUBTOPIC_PATTERN = re.compile(r"Only ask about this part of the topic: '(.*)'\.")
+STREAM_PIECES = 48 # server-sent events used to send a streamed quiz (cut anywhere in the JSON text)
+WORDS = [start + end for start in ("ka", "lo", "mi", "ne", "ru", "sa", "te", "vo", "bi", "du", "fe", "go", "ha", "ji", "ku", "pe")
+         for end in ("ber", "dor", "fin", "gal", "lum", "mar", "nix", "tor", "bas", "cen", "dul", "fos", "gir", "hon", "lek", "pra")]
+
+def build_stub_quiz(topic, question_count=12, subtopic=None, variant=None):
+    """
+    this function builds a valid quiz about a topic, like the one the AI service would give back
+
+    with a subtopic or a variant every question gets a few random words (always the same for the same
+    subtopic and variant), so the questions of different subtopics, or of the same prompt asked again
+    (a real model samples a new answer every time), are not duplicates
+    """
+    def question_text(i):
+        if subtopic is None and variant is None:
+            return f"Question {i + 1} about {topic}?"
+
+        words = " ".join(random.Random(f"{topic}|{subtopic}|{variant}|{i}").sample(WORDS, 5))
+        about = topic if subtopic is None else f"{topic}, {subtopic}"
+
+        return f"Question {i + 1} about {about}: {words}?"
+
+    return {
+        "title": f"{topic} quiz",
+        "difficulty": "Medium",
+        "questions": [
+            {
+                "question": question_text(i),
+                "options": [f"Answer {letter}" for letter in "ABCD"],
+                "id": i,
+                "correctOption": i % 4,
+                "explanation": f"Explanation {i + 1}.",
+                "points": 10,
+                "penalty": 5,
+                "time_limit": 20,
+                "category": topic
+            }
+            for i in range(question_count)
+        ]
+    }
+
+def add_faults(quiz, topic, request_number):
+    """
+    this function adds the mistakes of a real model to a quiz and gives back its JSON text: the first
+    question is the same in every answer, a number is written as text, an answer is given as a letter,
+    a question has a single option, and every third answer is cut off before its end
+    """
+    questions = quiz["questions"]
+
+    if len(questions) > 0:
+        questions[0]["question"] = f"What is the most important fact about {topic}?"
+    if len(questions) > 1:
+        questions[1]["points"] = str(questions[1]["points"])
+    if len(questions) > 2:
+        questions[2]["correctOption"] = "ABCD"[questions[2]["correctOption"]]
+    if len(questions) > 3:
+        questions[3]["options"] = ["The only option"]
+
+    text = json.dumps(quiz)
+
+    return text[:len(text) * 4 // 5] if request_number % 3 == 0 else text
+
+class StubAIServer:
+    """
+    a stub AI server running on a background thread
+
+    'latency' is called with the topic of every request and gives back the seconds to wait before the
+    answer. the first requests get the error status codes in 'errors' (example: [503, 429]), with the
+    Retry-After header when 'retry_after' is given. with 'faults' the quizzes have mistakes (see
+    add_faults). 'requests' counts the requests received and 'connections' the TCP connections opened by
+    the clients
+    """
+
+    def __init__(self, latency=lambda topic: 0.0, port=0, errors=None, retry_after=None, faults=False):
+        self.latency = latency
+        self.faults = faults
+        self.errors = list(errors or [])
+        self.retry_after = retry_after
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # the headers and the body are written separately, without this every answer waits for a delayed ACK
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+                with server._lock:
+                    server.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+                with server._lock:
+                    server.requests += 1
+                    request_number = server.requests
+                    error_status = server.errors.pop(0) if server.errors else None
+
+                if error_status is not None:
+                    headers = {} if server.retry_after is None else {"Retry-After": str(server.retry_after)}
+                    self.send_answer(error_status, {"error": {"code": error_status, "message": "stub error"}}, headers)
+                    return
+
+                prompt = body["contents"][0]["parts"][0]["text"]
+                topic_match = TOPIC_PATTERN.search(prompt)
+                count_match = COUNT_PATTERN.search(prompt)
+                subtopic_match = SUBTOPIC_PATTERN.search(prompt)
+                topic = topic_match.group(1) if topic_match else "Unknown"
+                quiz = build_stub_quiz(topic, int(count_match.group(1)) if count_match else 12, subtopic_match.group(1) if subtopic_match else None, request_number)
+                text = add_faults(quiz, topic, request_number) if server.faults else json.dumps(quiz)
+
+                if ":streamGenerateContent" in self.path:
+                    self.send_stream(text, server.latency(topic))
+                    return
+
+                time.sleep(server.latency(topic))
+                self.send_answer(200, {"candidates": [{"content": {"parts": [{"text": text}]}}]})
+
+            def send_stream(self, text, latency):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                piece_size = -(-len(text) // STREAM_PIECES)
+
+                for start in range(0, len(text), piece_size):
+                    time.sleep(latency / STREAM_PIECES)
+                    event = {"candidates": [{"content": {"parts": [{"text": text[start:start + piece_size]}]}}]}
+                    data = f"data: {json.dumps(event)}\r\n\r\n".encode("utf-8")
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+                self.wfile.write(b"0\r\n\r\n")
+
+            def send_answer(self, status, data, headers=None):
+                payload = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        """
+        the value for QUIZ_ENGINE_AI_BASE_URL
+        """
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1beta"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the AI service.")
+    parser.add_argument("--port", type=int, default=8000, help="the port to listen on")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds to wait before every answer")
+    parser.add_argument("--faults", action="store_true", help="answer with the mistakes of a real model")
+    arguments = parser.parse_args()
+
+    server = StubAIServer(lambda topic: arguments.latency, arguments.port, faults=arguments.faults)
+    print(f"Stub AI server on {server.base_url} (Ctrl+C to stop)")
+
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
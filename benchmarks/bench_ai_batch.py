@@ -0,0 +1,76 @@
+"""
+benchmark of the batch AI generation against a local stub server: generates one quiz per topic with
+one request at a time and with several at the same time, and compares the wall time with the sum of
+the request latencies
+
+usage:
+    python benchmarks/bench_ai_batch.py --topics 8 --concurrency 8
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ai_stub_server import StubAIServer
+from src.ai_generator import AI_BASE_URL_ENV_VARIABLE, run_batch_generation
+from src.creator import save_quiz_to_file
+from src.file_utils import DATA_DIR_ENV_VARIABLE
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch AI generation benchmark.")
+    parser.add_argument("--topics", type=int, default=8, help="number of topics")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests sent at the same time")
+    parser.add_argument("--latency", type=float, default=0.5, help="latency of the slowest request, in seconds")
+    arguments = parser.parse_args()
+
+    topics = [f"Topic {i}" for i in range(arguments.topics)]
+    # the latencies go from a fifth of the slowest one up to the slowest one
+    latencies = {topic: arguments.latency * (0.2 + 0.8 * i / max(1, len(topics) - 1)) for i, topic in enumerate(topics)}
+    original_directory = os.getcwd()
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory, StubAIServer(lambda topic: latencies.get(topic, 0.0)) as server:
+        os.environ[AI_BASE_URL_ENV_VARIABLE] = server.base_url
+        os.environ[DATA_DIR_ENV_VARIABLE] = os.path.join(directory, "data")
+        os.chdir(directory)
+        os.makedirs("data")
+
+        try:
+            print(f"{len(topics)} topics, slowest request {max(latencies.values()):.2f}s, sum of the latencies {sum(latencies.values()):.2f}s")
+
+            for concurrency in (1, arguments.concurrency):
+                start_time = time.perf_counter()
+
+                with redirect_stdout(io.StringIO()):
+                    # without the cache, so the second batch calls the server again
+                    results = run_batch_generation("test-key", topics, concurrency, save_quiz_to_file, use_cache=False)
+
+                elapsed = time.perf_counter() - start_time
+                saved = [result for result in results if result["saved_path"] is not None]
+                print(f"concurrency {concurrency:3}: {elapsed:6.2f}s, {len(saved)} quizzes saved")
+
+                if len(saved) != len(topics) or not all(os.path.exists(result["saved_path"]) for result in saved):
+                    print("FAIL: some quizzes were not generated or saved")
+                    failed = True
+
+            if elapsed > max(latencies.values()) * 1.5 + 0.5 and arguments.concurrency >= len(topics):
+                print("FAIL: the batch is not close to the slowest request")
+                failed = True
+        finally:
+            os.chdir(original_directory)
+            del os.environ[AI_BASE_URL_ENV_VARIABLE]
+            del os.environ[DATA_DIR_ENV_VARIABLE]
+
+    if failed:
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
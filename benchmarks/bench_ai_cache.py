@@ -0,0 +1,96 @@
+"""
+benchmark of the AI response cache against a local stub server: the first generation of a topic calls
+the server, the same generation again is answered from the disk. it also checks --no-cache, the TTL
+and the LRU eviction
+
+usage:
+    python benchmarks/bench_ai_cache.py --latency 0.5
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ai_stub_server import StubAIServer
+from src.ai_cache import evict_cache_entries, get_cache_directory, load_cached_response
+from src.ai_generator import AI_BASE_URL_ENV_VARIABLE, run_ai_quiz_generation
+from src.file_utils import DATA_DIR_ENV_VARIABLE
+
+def timed_generation(topic, use_cache=True):
+    """
+    this function generates a quiz with the output hidden and gives back (quiz, seconds)
+    """
+    start_time = time.perf_counter()
+
+    with redirect_stdout(io.StringIO()):
+        quiz_data = run_ai_quiz_generation("test-key", topic, use_cache)
+
+    return quiz_data, time.perf_counter() - start_time
+
+def main():
+    parser = argparse.ArgumentParser(description="AI response cache benchmark.")
+    parser.add_argument("--latency", type=float, default=0.5, help="latency of the stub server, in seconds")
+    parser.add_argument("--topics", type=int, default=20, help="topics used for the eviction check")
+    arguments = parser.parse_args()
+
+    failed = []
+
+    with tempfile.TemporaryDirectory() as directory, StubAIServer(lambda topic: arguments.latency) as server:
+        os.environ[AI_BASE_URL_ENV_VARIABLE] = server.base_url
+        os.environ[DATA_DIR_ENV_VARIABLE] = directory
+
+        try:
+            first_quiz, first_seconds = timed_generation("Rome")
+            cached_quiz, cached_seconds = timed_generation("Rome")
+            print(f"first generation: {first_seconds * 1000:8.1f}ms ({server.requests} request)")
+            print(f"same again:       {cached_seconds * 1000:8.1f}ms ({server.requests} request)")
+
+            if server.requests != 1 or cached_quiz != first_quiz:
+                failed.append("the repeated generation was not answered by the cache")
+
+            if cached_seconds > 0.05:
+                failed.append("the cached generation is not in the millisecond range")
+
+            _, bypass_seconds = timed_generation("Rome", use_cache=False)
+            print(f"--no-cache:       {bypass_seconds * 1000:8.1f}ms ({server.requests} requests)")
+
+            if server.requests != 2:
+                failed.append("use_cache=False did not call the server")
+
+            for i in range(arguments.topics):
+                timed_generation(f"Topic {i}")
+
+            cache_files = sorted(get_cache_directory().iterdir(), key=lambda path: path.stat().st_mtime_ns)
+            keep = 5
+            max_bytes = sum(path.stat().st_size for path in cache_files[-keep:])
+            removed = evict_cache_entries(max_bytes)
+            left = list(get_cache_directory().iterdir())
+            print(f"eviction:         {removed} of {len(cache_files)} answers removed, {len(left)} left")
+
+            if len(left) != keep or any(not path.exists() for path in cache_files[-keep:]):
+                failed.append("the eviction did not keep the most recently used answers")
+
+            key = cache_files[-1].stem
+
+            if load_cached_response(key) is None or load_cached_response(key, ttl=-1) is not None or cache_files[-1].exists():
+                failed.append("an expired answer was not dropped")
+        finally:
+            del os.environ[AI_BASE_URL_ENV_VARIABLE]
+            del os.environ[DATA_DIR_ENV_VARIABLE]
+
+    if failed:
+        for message in failed:
+            print(f"FAIL: {message}")
+
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
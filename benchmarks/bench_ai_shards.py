@@ -0,0 +1,89 @@
+"""
+benchmark of the sharded AI generation against a local stub server that makes the mistakes of a real
+model (repeated questions, numbers as text, broken questions, cut-off answers): generates a big quiz
+with many requests at the same time and checks that it has exactly the questions asked, all valid,
+without duplicates and with sequential ids
+
+usage:
+    python benchmarks/bench_ai_shards.py --questions 200 --concurrency 8 --latency 1
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ai_stub_server import StubAIServer
+from src.ai_generator import AI_BASE_URL_ENV_VARIABLE
+from src.ai_shards import merge_questions, plan_shards, run_sharded_generation
+from src.file_utils import DATA_DIR_ENV_VARIABLE
+from src.quiz_schema import validate_quiz
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded AI generation benchmark.")
+    parser.add_argument("--questions", type=int, default=200, help="questions of the quiz")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests sent at the same time")
+    parser.add_argument("--latency", type=float, default=1.0, help="seconds the stub server takes for one request")
+    arguments = parser.parse_args()
+
+    failed = []
+
+    with tempfile.TemporaryDirectory() as directory, StubAIServer(lambda topic: arguments.latency, faults=True) as server:
+        os.environ[AI_BASE_URL_ENV_VARIABLE] = server.base_url
+        os.environ[DATA_DIR_ENV_VARIABLE] = directory
+
+        try:
+            with redirect_stdout(io.StringIO()):
+                quiz_data, report = run_sharded_generation("test-key", "Rome", arguments.questions, arguments.concurrency)
+
+            shard_count = len(plan_shards(arguments.questions))
+            print(f"{report['questions']} of {arguments.questions} questions in {report['seconds']:.2f}s from {report['requests']} requests "
+                  f"(one request: {arguments.latency:.2f}s, {shard_count} requests one at a time: {shard_count * arguments.latency:.2f}s)")
+            print(f"received {report['received']}, repaired {report['repaired']}, dropped {report['dropped']}, duplicates removed {report['duplicates']}")
+
+            questions = quiz_data["questions"] if quiz_data else []
+
+            if len(questions) != arguments.questions:
+                failed.append(f"{len(questions)} questions instead of {arguments.questions}")
+
+            if quiz_data is None or validate_quiz(quiz_data):
+                failed.append("the merged quiz is not valid")
+
+            if [question["id"] for question in questions] != list(range(len(questions))):
+                failed.append("the ids are not sequential")
+
+            if len({question["question"] for question in questions}) != len(questions) or merge_questions(questions)[1]:
+                failed.append("the merged quiz has duplicates")
+
+            if not (report["repaired"] and report["dropped"] and report["duplicates"]):
+                failed.append("the faults of the stub server were not all found")
+
+            requests_before = server.requests
+            start_time = time.perf_counter()
+
+            with redirect_stdout(io.StringIO()):
+                cached_quiz, _ = run_sharded_generation("test-key", "Rome", arguments.questions, arguments.concurrency)
+
+            print(f"same quiz again from the cache: {(time.perf_counter() - start_time) * 1000:.1f}ms")
+
+            if cached_quiz != quiz_data or server.requests != requests_before:
+                failed.append("the shards were not answered by the cache")
+        finally:
+            del os.environ[AI_BASE_URL_ENV_VARIABLE]
+            del os.environ[DATA_DIR_ENV_VARIABLE]
+
+    if failed:
+        for message in failed:
+            print(f"FAIL: {message}")
+
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+benchmark of the streaming AI generation against a local stub server: measures when the first question
+can be played compared with the time the whole quiz takes to generate, and checks that every question
+is valid and the quiz is saved in the cache at the end
+
+usage:
+    python benchmarks/bench_ai_stream.py --latency 3
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ai_stub_server import StubAIServer
+from src.ai_generator import AI_BASE_URL_ENV_VARIABLE, DEFAULT_QUESTION_COUNT
+from src.ai_stream import open_ai_quiz_stream
+from src.file_utils import DATA_DIR_ENV_VARIABLE
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming AI generation benchmark.")
+    parser.add_argument("--latency", type=float, default=3.0, help="seconds the stub server takes to write the whole quiz")
+    arguments = parser.parse_args()
+
+    failed = []
+
+    with tempfile.TemporaryDirectory() as directory, StubAIServer(lambda topic: arguments.latency) as server:
+        os.environ[AI_BASE_URL_ENV_VARIABLE] = server.base_url
+        os.environ[DATA_DIR_ENV_VARIABLE] = directory
+
+        try:
+            start_time = time.perf_counter()
+            quiz_data = open_ai_quiz_stream("test-key", "Rome")
+            title_seconds = time.perf_counter() - start_time
+            arrivals = [time.perf_counter() - start_time for _ in quiz_data["questions"]]
+            stream = quiz_data["questions"]
+
+            print(f"title '{quiz_data['title']}' after {title_seconds:.2f}s")
+            print(f"question 1 after {arrivals[0]:.2f}s, question {len(arrivals)} after {arrivals[-1]:.2f}s (whole quiz: {arguments.latency:.2f}s)")
+
+            if len(arrivals) != DEFAULT_QUESTION_COUNT or stream.skipped or stream.error:
+                failed.append(f"{len(arrivals)} valid questions, {stream.skipped} skipped, error: {stream.error}")
+
+            if arrivals[0] > arguments.latency * 0.3:
+                failed.append("the first question did not come before the rest of the quiz")
+
+            if stream.get_quiz_data() is None:
+                failed.append("the whole quiz is not valid")
+
+            start_time = time.perf_counter()
+            cached_questions = list(open_ai_quiz_stream("test-key", "Rome")["questions"])
+            print(f"same quiz again from the cache: {(time.perf_counter() - start_time) * 1000:.1f}ms, {server.requests} request(s) in total")
+
+            if len(cached_questions) != DEFAULT_QUESTION_COUNT or server.requests != 1:
+                failed.append("the streamed quiz was not saved in the cache")
+        finally:
+            del os.environ[AI_BASE_URL_ENV_VARIABLE]
+            del os.environ[DATA_DIR_ENV_VARIABLE]
+
+    if failed:
+        for message in failed:
+            print(f"FAIL: {message}")
+
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
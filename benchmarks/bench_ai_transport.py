@@ -0,0 +1,107 @@
+"""
+benchmark of the AI transport against a local stub server: keep-alive connections, retries of 503/429
+with Retry-After and backoff, the per-request deadline and the circuit breaker
+
+usage:
+    python benchmarks/bench_ai_transport.py --requests 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ai_stub_server import StubAIServer
+from src import ai_transport
+from src.ai_transport import CircuitOpenError, get_transport_stats, post_json, reset_transport_stats
+
+HEADERS = {"Content-Type": "application/json"}
+PAYLOAD = {"contents": [{"parts": [{"text": "Generate a quiz on the topic: 'Rome' with 12 multiple-choice questions."}]}]}
+
+def get_url(server):
+    return f"{server.base_url}/models/stub:generateContent?key=test"
+
+def main():
+    parser = argparse.ArgumentParser(description="AI transport benchmark.")
+    parser.add_argument("--requests", type=int, default=50, help="requests sent for the keep-alive check")
+    arguments = parser.parse_args()
+
+    # short waits, so the retries do not slow the benchmark down
+    ai_transport.BACKOFF_BASE = 0.01
+    failed = []
+
+    with StubAIServer() as server:
+        reset_transport_stats()
+        start_time = time.perf_counter()
+
+        for _ in range(arguments.requests):
+            post_json(get_url(server), HEADERS, PAYLOAD)
+
+        elapsed = time.perf_counter() - start_time
+        stats = get_transport_stats()
+        print(f"keep-alive:      {arguments.requests} requests on {server.connections} connection(s), {elapsed / arguments.requests * 1000:.2f}ms per request (p95 {stats['latency_p95'] * 1000:.2f}ms)")
+
+        if server.connections != 1:
+            failed.append("the connection was not kept alive")
+
+    with StubAIServer(errors=[503, 429], retry_after=0.2) as server:
+        reset_transport_stats()
+        start_time = time.perf_counter()
+        status_code, _ = post_json(get_url(server), HEADERS, PAYLOAD)
+        elapsed = time.perf_counter() - start_time
+        stats = get_transport_stats()
+        print(f"503, 429, 200:   status {status_code} after {stats['attempts']} attempts, {stats['retries']} retries in {elapsed:.2f}s (Retry-After: 0.2s)")
+
+        if status_code != 200 or stats["retries"] != 2 or elapsed < 0.4:
+            failed.append("the errors were not retried after the Retry-After time")
+
+    with StubAIServer(latency=lambda topic: 3.0) as server:
+        reset_transport_stats()
+        start_time = time.perf_counter()
+
+        try:
+            post_json(get_url(server), HEADERS, PAYLOAD, timeout=0.3, deadline=1.0)
+            failed.append("a request slower than its deadline did not fail")
+        except ConnectionError:
+            pass
+
+        elapsed = time.perf_counter() - start_time
+        print(f"deadline 1.0s:   failed after {elapsed:.2f}s and {get_transport_stats()['attempts']} attempts of 0.3s")
+
+        if elapsed > 1.5:
+            failed.append("the deadline was not respected")
+
+    with StubAIServer(errors=[503] * 1000) as server:
+        reset_transport_stats()
+        threshold = ai_transport.BREAKER_THRESHOLD
+
+        for _ in range(threshold):
+            post_json(get_url(server), HEADERS, PAYLOAD)
+
+        requests_before = server.requests
+        start_time = time.perf_counter()
+
+        try:
+            post_json(get_url(server), HEADERS, PAYLOAD)
+            failed.append("the circuit did not open")
+        except CircuitOpenError:
+            pass
+
+        elapsed = time.perf_counter() - start_time
+        stats = get_transport_stats()
+        print(f"circuit breaker: open after {threshold} failed requests, next request refused in {elapsed * 1000:.3f}ms ({stats['short_circuited']} short-circuited)")
+
+        if server.requests != requests_before or stats["circuit_opened"] != 1:
+            failed.append("the open circuit still called the server")
+
+    if failed:
+        for message in failed:
+            print(f"FAIL: {message}")
+
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+benchmark of the bulk scoring API: scores random answers one at a time with score_answer (the path of
+run_quiz) and all at once with score_batch, checks that both give the same points and prints the timings
+
+usage:
+    python benchmarks/bench_batch_scoring.py --answers 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.batch_scoring import _get_numpy, score_batch
+from src.engine import score_answer
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk scoring benchmark.")
+    parser.add_argument("--answers", type=int, default=1000000, help="number of answers to score")
+    parser.add_argument("--session-size", type=int, default=12, help="answers in every session")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random answers")
+    arguments = parser.parse_args()
+
+    rng = random.Random(arguments.seed)
+    count = arguments.answers
+    base_points = [rng.choice([5, 10, 15, 20]) for _ in range(count)]
+    time_limit = [rng.choice([0, 10, 20, 30]) for _ in range(count)]
+    time_taken = [round(rng.uniform(0, 40), 1) for _ in range(count)]
+    correct = [rng.random() < 0.7 for _ in range(count)]
+    penalty = [rng.choice([0, 2, 5]) for _ in range(count)]
+    session_ids = [i // arguments.session_size for i in range(count)]
+
+    start_time = time.perf_counter()
+    expected = []
+
+    for i in range(count):
+        question = {"points": base_points[i], "time_limit": time_limit[i], "penalty": penalty[i], "correctOption": 0}
+        expected.append(score_answer(question, 0 if correct[i] else 1, time_taken[i])[0])
+
+    one_by_one = time.perf_counter() - start_time
+    print(f"score_answer loop:      {one_by_one:.3f}s ({count / one_by_one:,.0f} answers/s)")
+
+    backends = [False] + ([True] if _get_numpy() is not None else [])
+
+    for use_numpy in backends:
+        start_time = time.perf_counter()
+        result = score_batch(base_points, time_taken, time_limit, correct, penalty, session_ids=session_ids, use_numpy=use_numpy)
+        elapsed = time.perf_counter() - start_time
+        name = "numpy" if use_numpy else "array"
+
+        if list(result["points"]) != expected or result["total"] != sum(expected):
+            print(f"FAIL: score_batch ({name}) does not match score_answer")
+            sys.exit(1)
+
+        print(f"score_batch ({name}):    {elapsed:.3f}s ({count / elapsed:,.0f} answers/s, {one_by_one / elapsed:.1f}x)")
+
+    print("OK: same points as score_answer")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+benchmark of the command line: runs every non-interactive command in its own process, in a temporary
+copy of the 'data' folder, and prints how long each one takes (python start-up included). it also
+checks that importing main.py does not start the menu
+
+usage:
+    python benchmarks/bench_cli.py --repeat 5
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIRECTORY = Path(__file__).resolve().parent.parent
+QUIZ_FILE = "python_basics.json"
+
+def run(arguments, directory, stdin_text=None):
+    """
+    this function runs 'python main.py <arguments>' in 'directory' and gives back (result, seconds)
+    """
+    environment = dict(os.environ, QUIZ_ENGINE_DATA_DIR=os.path.join(directory, "data"))
+    start_time = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, str(PROJECT_DIRECTORY / "main.py"), *arguments],
+        cwd=directory, input=stdin_text, capture_output=True, text=True, env=environment, timeout=120
+    )
+
+    return result, time.perf_counter() - start_time
+
+def best_run(arguments, directory, repeat, stdin_text=None):
+    """
+    this function gives back the last result and the best time of 'repeat' runs of a command
+    """
+    best = None
+
+    for _ in range(repeat):
+        result, elapsed = run(arguments, directory, stdin_text)
+        best = elapsed if best is None else min(best, elapsed)
+
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Command line benchmark.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of every command (the best time is shown)")
+    arguments = parser.parse_args()
+
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        shutil.copytree(PROJECT_DIRECTORY / "data", os.path.join(directory, "data"), ignore=shutil.ignore_patterns(".*", "*.db*", "leaderboard*"))
+
+        with open(os.path.join(directory, "data", QUIZ_FILE), "r", encoding="utf-8") as f:
+            quiz = json.load(f)
+
+        right_answers = "\n".join("ABCDEFGH"[question["correctOption"]] for question in quiz["questions"])
+        new_quiz_path = os.path.join(directory, "new_quiz.json")
+
+        with open(new_quiz_path, "w", encoding="utf-8") as f:
+            json.dump(dict(quiz, title="Scripted quiz"), f)
+
+        start_time = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", "import main"], cwd=PROJECT_DIRECTORY, input="", capture_output=True, text=True, timeout=60)
+        print(f"{'import main':40}{(time.perf_counter() - start_time) * 1000:9.1f}ms")
+
+        if result.returncode != 0 or result.stdout:
+            print("FAIL: importing main.py started the program")
+            failed = True
+
+        checks = [
+            (["list"], None, QUIZ_FILE),
+            (["play", "--quiz", QUIZ_FILE, "--answers-file", "-", "--username", "bench"], right_answers, f"Correct Answers: {len(quiz['questions'])}/{len(quiz['questions'])}"),
+            (["leaderboard", "--quiz", quiz["title"]], None, "bench"),
+            (["create", "--from-json", new_quiz_path], None, "scripted-quiz.json")
+        ]
+
+        for command, stdin_text, expected in checks:
+            result, elapsed = best_run(command, directory, arguments.repeat, stdin_text)
+            print(f"{command[0]:40}{elapsed * 1000:9.1f}ms")
+
+            if result.returncode != 0 or expected not in result.stdout or "\x1b[H" in result.stdout:
+                print(f"FAIL: unexpected output of '{' '.join(command)}':\n{result.stdout}{result.stderr}")
+                failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+memory benchmark of the compact question model: builds a large quiz bank and compares the memory held by
+the usual list of question dictionaries with the memory held by a CompactQuestionBank
+
+usage:
+    python benchmarks/bench_compact_memory.py --questions 50000
+"""
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.compact_quiz import compact_quiz
+from src.data_manager import is_valid_quiz
+
+CATEGORIES = ["Science", "History", "Geography", "Programming", "Art", "Sport", "Music", "Literature"]
+
+def build_quiz_text(question_count, seed):
+    """
+    this function creates the JSON text of a random quiz bank
+
+    args:
+        question_count (int): the number of questions
+        seed (int): the seed of the random generator
+
+    returns:
+        str: the JSON text of the quiz
+    """
+    rng = random.Random(seed)
+    questions = []
+
+    for i in range(question_count):
+        questions.append({
+            "id": i,
+            "question": f"Question number {i}: which of these options is the right one for item {rng.randrange(10 ** 6)}?",
+            "category": rng.choice(CATEGORIES),
+            "options": [f"Option {letter} for question {i}" for letter in "ABCD"],
+            "correctOption": rng.randrange(4),
+            "explanation": f"The explanation of question {i} says why option {rng.randrange(4)} is right.",
+            "points": rng.choice([5, 10, 15]),
+            "penalty": rng.choice([1, 2, 5]),
+            "time_limit": rng.choice([10, 20, 30])
+        })
+
+    return json.dumps({"title": "Memory benchmark", "difficulty": "Hard", "questions": questions})
+
+def measure(build):
+    """
+    this function measures the memory still held by the object returned by 'build'
+
+    args:
+        build (callable): the function that creates the object
+
+    returns:
+        tuple[any, int, float]: (the object, retained_bytes, elapsed_seconds)
+    """
+    gc.collect()
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start_time
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, retained, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact question model memory benchmark.")
+    parser.add_argument("--questions", type=int, default=50000, help="number of questions in the bank")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random bank")
+    arguments = parser.parse_args()
+
+    quiz_text = build_quiz_text(arguments.questions, arguments.seed)
+
+    dict_quiz, dict_bytes, dict_time = measure(lambda: json.loads(quiz_text))
+    compact, compact_bytes, compact_time = measure(lambda: compact_quiz(dict_quiz))
+
+    print(f"questions:          {arguments.questions}")
+    print(f"dict model:         {dict_bytes / 2 ** 20:8.1f} MiB ({dict_bytes / arguments.questions:.0f} bytes/question, json.loads {dict_time:.2f}s)")
+    print(f"compact model:      {compact_bytes / 2 ** 20:8.1f} MiB ({compact_bytes / arguments.questions:.0f} bytes/question, build {compact_time:.2f}s)")
+    print(f"saving:             {dict_bytes / compact_bytes:.1f}x less memory")
+
+    start_time = time.perf_counter()
+    same_content = compact["questions"].to_list() == dict_quiz["questions"]
+    print(f"round trip:         {'OK' if same_content else 'FAIL'} ({time.perf_counter() - start_time:.2f}s)")
+    print(f"is_valid_quiz:      {'OK' if is_valid_quiz(compact) else 'FAIL'}")
+
+    if not same_content or not is_valid_quiz(compact):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
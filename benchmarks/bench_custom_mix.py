@@ -0,0 +1,130 @@
+"""
+benchmark of the question index and of the "custom mix" mode: writes many quiz files into a temporary
+'data' folder, then measures the first index build, an incremental refresh after one file changed, and
+the time to assemble a mix compared with loading every quiz
+
+usage:
+    python benchmarks/bench_custom_mix.py --quizzes 200 --questions 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_manager import build_custom_mix, load_question_index, load_quiz_data, load_quiz_file
+from src.question_index import count_categories
+
+CATEGORIES = ["History", "Science", "Geography", "Sport", "Music", "Art", "Cinema", "Literature"]
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+def write_quizzes(count, questions, seed):
+    """
+    this function writes 'count' random quiz files into the 'data' folder of the current directory
+    """
+    rng = random.Random(seed)
+    os.makedirs("data", exist_ok=True)
+
+    for quiz_number in range(count):
+        quiz = {
+            "title": f"Quiz {quiz_number}",
+            "difficulty": rng.choice(DIFFICULTIES),
+            "questions": [
+                {
+                    "id": i + 1,
+                    "question": f"Question {i + 1} of quiz {quiz_number}?",
+                    "category": rng.choice(CATEGORIES),
+                    "options": ["A", "B", "C", "D"],
+                    "correctOption": rng.randrange(4),
+                    "explanation": "Explanation.",
+                    "points": 10,
+                    "penalty": 2,
+                    "time_limit": 20
+                }
+                for i in range(questions)
+            ]
+        }
+
+        with open(os.path.join("data", f"quiz_{quiz_number}.json"), "w", encoding="utf-8") as f:
+            json.dump(quiz, f, indent=4)
+
+def timed(function):
+    """
+    this function runs function() and gives back (result, seconds)
+    """
+    start_time = time.perf_counter()
+    result = function()
+
+    return result, time.perf_counter() - start_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Question index and custom mix benchmark.")
+    parser.add_argument("--quizzes", type=int, default=200, help="number of quiz files")
+    parser.add_argument("--questions", type=int, default=500, help="questions in every quiz")
+    parser.add_argument("--mix", type=int, default=20, help="questions of the custom mix")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    original_directory = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        try:
+            write_quizzes(arguments.quizzes, arguments.questions, arguments.seed)
+            print(f"{arguments.quizzes} quizzes, {arguments.quizzes * arguments.questions} questions")
+
+            _, elapsed = timed(lambda: load_question_index())
+            print(f"first index build:         {elapsed * 1000:9.1f}ms (catalog + index)")
+
+            _, elapsed = timed(lambda: load_question_index())
+            print(f"refresh, nothing changed:  {elapsed * 1000:9.1f}ms")
+
+            changed_path = os.path.join("data", "quiz_0.json")
+
+            with open(changed_path, "r", encoding="utf-8") as f:
+                changed_quiz = json.load(f)
+
+            changed_quiz["questions"][0]["category"] = "Astronomy"
+
+            with open(changed_path, "w", encoding="utf-8") as f:
+                json.dump(changed_quiz, f, indent=4)
+
+            question_index, elapsed = timed(lambda: load_question_index())
+            print(f"refresh, one file changed: {elapsed * 1000:9.1f}ms")
+
+            if count_categories(question_index).get("Astronomy") != 1:
+                print("FAIL: the changed file was not indexed again")
+                sys.exit(1)
+
+            def load_everything():
+                science = []
+
+                for filename in load_quiz_file():
+                    quiz = load_quiz_data(filename)
+                    if quiz["difficulty"] == "Hard":
+                        science.extend(question for question in quiz["questions"] if question["category"] == "Science")
+
+                return random.sample(science, min(arguments.mix, len(science)))
+
+            _, elapsed = timed(load_everything)
+            print(f"mix by loading every quiz: {elapsed * 1000:9.1f}ms")
+
+            mix, elapsed = timed(lambda: build_custom_mix(arguments.mix, {"Science"}, {"Hard"}, question_index=question_index))
+            print(f"custom mix (index):        {elapsed * 1000:9.1f}ms, {len(mix['questions'])} questions, '{mix['title']}'")
+
+            if any(question["category"] != "Science" for question in mix["questions"]) or len(mix["questions"]) != arguments.mix:
+                print("FAIL: the mix does not match the request")
+                sys.exit(1)
+        finally:
+            os.chdir(original_directory)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
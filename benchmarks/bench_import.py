@@ -0,0 +1,112 @@
+"""
+benchmark of the bulk import: writes a folder of quiz files (some of them broken) and imports it with
+one worker process and with one per CPU, then checks that the app finds the imported quizzes without
+parsing them again
+
+usage:
+    python benchmarks/bench_import.py --files 2000 --questions 50
+"""
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import catalog
+from src.bulk_import import import_quiz_directory
+from src.data_manager import load_quiz_file
+
+def write_sources(directory, count, questions, broken, seed):
+    """
+    this function writes 'count' quiz files into 'directory', 'broken' of them with an error
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    for file_number in range(count):
+        quiz = {
+            "title": f"  Imported quiz {file_number}  ",
+            "difficulty": "Medium",
+            "questions": [
+                {
+                    "id": i + 1,
+                    "question": f" Question {i + 1}? ",
+                    "category": "General",
+                    "options": ["A", "B", "C", "D"],
+                    "correctOption": rng.randrange(4),
+                    "explanation": "Explanation.",
+                    "points": 10,
+                    "penalty": 2,
+                    "time_limit": 20
+                }
+                for i in range(questions)
+            ]
+        }
+
+        if file_number < broken:
+            quiz["questions"][0]["correctOption"] = 9
+
+        with open(os.path.join(directory, f"quiz_{file_number:05}.json"), "w", encoding="utf-8") as f:
+            json.dump(quiz, f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import benchmark.")
+    parser.add_argument("--files", type=int, default=2000, help="number of quiz files")
+    parser.add_argument("--questions", type=int, default=50, help="questions in every quiz")
+    parser.add_argument("--broken", type=int, default=5, help="files with an error")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    original_directory = os.getcwd()
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        try:
+            write_sources("dump", arguments.files, arguments.questions, arguments.broken, arguments.seed)
+
+            for workers in sorted({1, os.cpu_count() or 1}):
+                for leftover in Path("data").glob("*"):
+                    leftover.unlink()
+
+                with redirect_stdout(io.StringIO()):
+                    summary = import_quiz_directory("dump", "data", workers=workers)
+
+                print(f"{workers:3} workers: {summary['seconds']:6.2f}s, {summary['files_per_second']:8.1f} files/s, {summary['questions_per_second']:10.1f} questions/s")
+
+                if summary["imported"] != arguments.files - arguments.broken or summary["failed"] != arguments.broken:
+                    print(f"FAIL: expected {arguments.broken} broken files, got {summary['failed']}")
+                    failed = True
+
+            catalog._catalog_cache.clear()
+            start_time = time.perf_counter()
+
+            with redirect_stdout(io.StringIO()):
+                quiz_files = load_quiz_file()
+
+            print(f"app start after the import: {(time.perf_counter() - start_time) * 1000:.1f}ms for {len(quiz_files)} quizzes")
+
+            with open(os.path.join("data", quiz_files[0]), "r", encoding="utf-8") as f:
+                imported_quiz = json.load(f)
+
+            if imported_quiz["title"] != imported_quiz["title"].strip() or len(quiz_files) != arguments.files - arguments.broken:
+                print("FAIL: the imported quizzes were not normalized or are missing")
+                failed = True
+        finally:
+            os.chdir(original_directory)
+
+    if failed:
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+benchmark of the quiz selection menu: writes more and more quiz files into a temporary 'data' folder and
+measures the time to show the first page, compared with the old menu that read the whole list and
+printed every filename
+
+usage:
+    python benchmarks/bench_quiz_menu.py --sizes 100 1000 10000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_manager import iter_quiz_entries, load_quiz_file
+from src.pagination import LazyPages
+from src.ui_terminal import redraw_screen, render_quiz_page
+
+QUIZ = {
+    "title": "Menu benchmark",
+    "difficulty": "Easy",
+    "questions": [
+        {
+            "id": 1,
+            "question": "Question?",
+            "category": "General",
+            "options": ["A", "B"],
+            "correctOption": 0,
+            "explanation": "Explanation.",
+            "points": 10,
+            "penalty": 2,
+            "time_limit": 20
+        }
+    ]
+}
+
+def write_quizzes(start, stop):
+    """
+    this function writes the quiz files number 'start' to 'stop' into the 'data' folder
+    """
+    os.makedirs("data", exist_ok=True)
+    content = json.dumps(QUIZ)
+
+    for quiz_number in range(start, stop):
+        with open(os.path.join("data", f"quiz_{quiz_number:06}.json"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+def old_menu():
+    """
+    this function does what the old menu did: read the whole list, then print every filename
+    """
+    for i, filename in enumerate(load_quiz_file()):
+        print(f"{i + 1}. {filename}")
+
+def first_page():
+    """
+    this function shows the first page of the new menu
+    """
+    pages = LazyPages(iter_quiz_entries())
+    entries = pages.get_page(0)
+    page_count, is_final = pages.known_page_count()
+    redraw_screen(render_quiz_page(entries, 1, 0, page_count, is_final))
+    pages.close()
+
+def best_time(function, repeat=5):
+    """
+    this function gives back the best time of 'repeat' calls of function(), with the output thrown away
+    """
+    best = None
+
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start_time
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz selection menu benchmark.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="numbers of quiz files")
+    arguments = parser.parse_args()
+
+    original_directory = os.getcwd()
+    first_paint_times = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        try:
+            written = 0
+
+            for size in sorted(arguments.sizes):
+                write_quizzes(written, size)
+                written = size
+
+                with redirect_stdout(io.StringIO()):
+                    load_quiz_file() # the catalog is built once, like at the first start of the app
+
+                old_time = best_time(old_menu)
+                new_time = best_time(first_page)
+                first_paint_times.append(new_time)
+                print(f"{size:6} quizzes: old menu {old_time * 1000:8.2f}ms, first page {new_time * 1000:6.2f}ms")
+        finally:
+            os.chdir(original_directory)
+
+    # a little noise is allowed, but nothing like the old linear cost
+    if first_paint_times[-1] > max(first_paint_times[0] * 10, 0.005):
+        print("FAIL: the time to show the first page grows with the number of quizzes")
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+benchmark of the quiz pack format: writes a large quiz as JSON and as a .qpk pack, then opens both in a
+fresh process (to measure the real memory used, RSS) and reads a few random questions. it also checks
+the round trip JSON -> pack -> JSON
+
+usage:
+    python benchmarks/bench_quiz_pack.py --questions 1000000
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.quiz_pack import export_quiz_pack, open_quiz_pack, pack_to_quiz_dict
+
+def write_quiz(file_path, count, seed):
+    """
+    this function writes a quiz with 'count' random questions, indented like the quiz creator does
+    """
+    rng = random.Random(seed)
+    categories = ["History", "Science", "Geography", "Sport", "Music", "Art"]
+    quiz = {
+        "title": "Pack benchmark",
+        "difficulty": "Hard",
+        "questions": [
+            {
+                "id": i + 1,
+                "question": f"What is the right answer to question number {i + 1}? ✓",
+                "category": rng.choice(categories),
+                "options": [f"Option {letter} of question {i + 1}" for letter in "ABCD"],
+                "correctOption": rng.randrange(4),
+                "explanation": f"This is the explanation of question {i + 1}.",
+                "points": rng.choice([5, 10, 15]),
+                "penalty": rng.choice([0, 2, 5]),
+                "time_limit": rng.choice([0, 15, 30])
+            }
+            for i in range(count)
+        ]
+    }
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(quiz, f, indent=4)
+
+def get_memory():
+    """
+    this function gives back (peak RSS, private anonymous RSS) of this process in MiB
+
+    the pages of a memory mapped file count in the RSS but belong to the page cache (shared and
+    reclaimable), so the anonymous part is the memory really owned by the process
+    """
+    values = {}
+
+    try:
+        # on Linux ru_maxrss survives exec (it would include the parent), VmHWM does not
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmHWM", "RssAnon"):
+                    values[key] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+
+    if "VmHWM" not in values:
+        # ru_maxrss is in KiB on Linux and in bytes on macOS
+        values["VmHWM"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    return values["VmHWM"], values.get("RssAnon")
+
+def child(mode, file_path, reads):
+    """
+    this function runs inside a fresh process: it opens the quiz, reads some random questions and
+    prints the timings and the peak RSS as JSON
+    """
+    start_time = time.perf_counter()
+
+    if mode == "json":
+        with open(file_path, "r", encoding="utf-8") as f:
+            quiz_data = json.load(f)
+    else:
+        quiz_data = open_quiz_pack(file_path)
+
+    open_time = time.perf_counter() - start_time
+    questions = quiz_data["questions"]
+    rng = random.Random(0)
+    start_time = time.perf_counter()
+    ids = [questions[rng.randrange(len(questions))]["id"] for _ in range(reads)]
+    read_time = time.perf_counter() - start_time
+
+    peak_rss, anonymous_rss = get_memory()
+
+    print(json.dumps({"open": open_time, "read": read_time, "rss": peak_rss, "anonymous": anonymous_rss, "ids": ids}))
+
+def run_child(mode, file_path, reads):
+    """
+    this function starts the child measure in a new python process and gives back its result
+    """
+    output = subprocess.run([sys.executable, __file__, "--child", mode, file_path, "--reads", str(reads)],
+                            check=True, capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz pack benchmark.")
+    parser.add_argument("--questions", type=int, default=200000, help="number of questions of the quiz")
+    parser.add_argument("--reads", type=int, default=100, help="random questions read after opening")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "FILE"), help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.child:
+        child(arguments.child[0], arguments.child[1], arguments.reads)
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = os.path.join(directory, "bank.json")
+        write_quiz(json_path, arguments.questions, arguments.seed)
+
+        start_time = time.perf_counter()
+        pack_path = export_quiz_pack(json_path)
+        export_time = time.perf_counter() - start_time
+
+        print(f"questions: {arguments.questions}")
+        print(f"JSON file: {os.path.getsize(json_path) / (1024 * 1024):.1f} MiB, pack file: {os.path.getsize(pack_path) / (1024 * 1024):.1f} MiB (export {export_time:.2f}s)")
+
+        json_result = run_child("json", json_path, arguments.reads)
+        pack_result = run_child("pack", pack_path, arguments.reads)
+
+        print(f"JSON: open {json_result['open'] * 1000:9.1f}ms, {arguments.reads} reads {json_result['read'] * 1000:6.2f}ms, peak RSS {json_result['rss']:7.1f} MiB, anonymous {json_result['anonymous'] or 0:7.1f} MiB")
+        print(f"pack: open {pack_result['open'] * 1000:9.1f}ms, {arguments.reads} reads {pack_result['read'] * 1000:6.2f}ms, peak RSS {pack_result['rss']:7.1f} MiB, anonymous {pack_result['anonymous'] or 0:7.1f} MiB")
+
+        if json_result["ids"] != pack_result["ids"]:
+            print("FAIL: the pack gives different questions")
+            sys.exit(1)
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            original = json.load(f)
+
+        if pack_to_quiz_dict(pack_path) != original:
+            print("FAIL: JSON -> pack -> JSON changed the quiz")
+            sys.exit(1)
+
+    print("OK: same questions, lossless round trip")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+benchmark of the "draw N questions" mode: compares the old session setup (copy + shuffle of the whole
+question list) with draw_questions on a list, a compact bank and a quiz pack, and checks that the
+stratified draw keeps the category mix
+
+usage:
+    python benchmarks/bench_sampling.py --questions 200000 --draw 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.compact_quiz import compact_quiz
+from src.quiz_pack import open_quiz_pack, write_quiz_pack
+from src.sampling import draw_questions
+
+def build_quiz(count, seed):
+    """
+    this function builds a quiz with 'count' random questions and unbalanced categories
+    """
+    rng = random.Random(seed)
+    categories = ["History"] * 50 + ["Science"] * 30 + ["Geography"] * 15 + ["Art"] * 5
+
+    return {
+        "title": "Sampling benchmark",
+        "difficulty": "Medium",
+        "questions": [
+            {
+                "id": i + 1,
+                "question": f"Question number {i + 1}?",
+                "category": rng.choice(categories),
+                "options": ["A", "B", "C", "D"],
+                "correctOption": rng.randrange(4),
+                "explanation": "Explanation.",
+                "points": 10,
+                "penalty": 2,
+                "time_limit": 20
+            }
+            for i in range(count)
+        ]
+    }
+
+def best_time(function, repeat=5):
+    """
+    this function gives back the best time of 'repeat' calls of function()
+    """
+    best = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Draw N questions benchmark.")
+    parser.add_argument("--questions", type=int, default=200000, help="number of questions of the quiz")
+    parser.add_argument("--draw", type=int, default=20, help="questions drawn for a session")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    quiz = build_quiz(arguments.questions, arguments.seed)
+    rng = random.Random(arguments.seed)
+
+    def copy_and_shuffle():
+        questions = quiz["questions"].copy()
+        rng.shuffle(questions)
+        return questions[:arguments.draw]
+
+    print(f"copy + shuffle (old setup):   {best_time(copy_and_shuffle) * 1000:9.3f}ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        pack_path = os.path.join(directory, "bank.qpk")
+        write_quiz_pack(pack_path, quiz)
+        packed = open_quiz_pack(pack_path)
+        compact = compact_quiz(quiz)
+        compact["questions"].category_index() # built once, like a loaded bank would do
+
+        for name, quiz_data in (("list", quiz), ("compact", compact), ("pack", packed)):
+            for stratify in (False, True):
+                elapsed = best_time(lambda: draw_questions(quiz_data, arguments.draw, rng, stratify=stratify))
+                label = f"draw {arguments.draw} ({name}{', stratified' if stratify else ''}):"
+                print(f"{label:30}{elapsed * 1000:9.3f}ms")
+
+        expected = Counter(question["category"] for question in quiz["questions"])
+        drawn = draw_questions(packed, arguments.draw, rng, stratify=True)["questions"]
+        drawn_mix = Counter(question["category"] for question in drawn)
+        packed["questions"].close()
+
+    print(f"category mix of the quiz:     {dict(expected)}")
+    print(f"category mix of the draw:     {dict(drawn_mix)}")
+
+    for category, size in expected.items():
+        share = size * arguments.draw / arguments.questions
+
+        if abs(drawn_mix.get(category, 0) - share) >= 1:
+            print("FAIL: the stratified draw does not keep the category mix")
+            sys.exit(1)
+
+    if len({question["id"] for question in drawn}) != len(drawn) or len(drawn) != min(arguments.draw, arguments.questions):
+        print("FAIL: the draw has duplicated or missing questions")
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
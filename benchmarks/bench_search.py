@@ -0,0 +1,183 @@
+"""
+benchmark of the full-text search: writes many quiz files with random text into a temporary 'data'
+folder, then measures the first index build, the load of the saved index and a search in a new session
+(both must take less than LIMIT_MS), an incremental refresh after one file changed, and the time of some
+searches compared with a scan of every quiz
+
+usage:
+    python benchmarks/bench_search.py --quizzes 200 --questions 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import catalog, data_manager
+from src.data_manager import load_quiz_data, load_quiz_file, load_search_index, search_quizzes
+from src.search_index import tokenize
+
+SYLLABLES = ["ka", "lo", "mi", "ter", "son", "ra", "vel", "quo", "an", "dis", "pe", "tro", "ux", "ne", "bal", "cor"]
+QUERIES = ["photosynthesis", "solar system", "photosyn", "capital of france", "ancient rome emperor", "ter"]
+LIMIT_MS = 50
+
+def make_vocabulary(size, rng):
+    """
+    this function makes 'size' random words, plus some real ones that the queries look for
+    """
+    words = {"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size)}
+
+    return sorted(words) + ["photosynthesis", "solar", "system", "capital", "france", "ancient", "rome", "emperor"]
+
+def make_text(vocabulary, length, rng):
+    """
+    this function makes a sentence with words drawn with a zipf-like distribution (few common words,
+    many rare ones), like a real text
+    """
+    return " ".join(vocabulary[min(int(rng.paretovariate(1.1)) - 1, len(vocabulary) - 1)] if rng.random() < 0.7 else rng.choice(vocabulary) for _ in range(length))
+
+def write_quizzes(count, questions, seed):
+    """
+    this function writes 'count' random quiz files into the 'data' folder of the current directory
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(20000, rng)
+    rng.shuffle(vocabulary)
+    os.makedirs("data", exist_ok=True)
+
+    for quiz_number in range(count):
+        quiz = {
+            "title": f"Quiz {quiz_number} {make_text(vocabulary, 3, rng)}",
+            "difficulty": "Medium",
+            "questions": [
+                {
+                    "id": i + 1,
+                    "question": make_text(vocabulary, 12, rng) + "?",
+                    "category": "General",
+                    "options": [make_text(vocabulary, 2, rng) for _ in range(4)],
+                    "correctOption": rng.randrange(4),
+                    "explanation": make_text(vocabulary, 15, rng) + ".",
+                    "points": 10,
+                    "penalty": 2,
+                    "time_limit": 20
+                }
+                for i in range(questions)
+            ]
+        }
+
+        with open(os.path.join("data", f"quiz_{quiz_number}.json"), "w", encoding="utf-8") as f:
+            json.dump(quiz, f, indent=4)
+
+def timed(function):
+    """
+    this function runs function() and gives back (result, seconds)
+    """
+    start_time = time.perf_counter()
+    result = function()
+
+    return result, time.perf_counter() - start_time
+
+def start_new_session():
+    """
+    this function forgets what the previous searches kept in memory (the search index and the catalog),
+    so the next search works like the first one of a new session
+    """
+    data_manager._search_index = None
+    catalog._catalog_cache.clear()
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search benchmark.")
+    parser.add_argument("--quizzes", type=int, default=200, help="number of quiz files")
+    parser.add_argument("--questions", type=int, default=500, help="questions in every quiz")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    original_directory = os.getcwd()
+    failed = False
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        try:
+            write_quizzes(arguments.quizzes, arguments.questions, arguments.seed)
+            print(f"{arguments.quizzes} quizzes, {arguments.quizzes * arguments.questions} questions")
+
+            search_index, elapsed = timed(load_search_index)
+            print(f"first index build:         {elapsed * 1000:9.1f}ms, {len(search_index._vocabulary)} words")
+
+            _, elapsed = timed(load_search_index)
+            print(f"refresh, nothing changed:  {elapsed * 1000:9.1f}ms")
+
+            start_new_session()
+            _, elapsed = timed(load_search_index)
+            print(f"load from the saved index: {elapsed * 1000:9.1f}ms")
+
+            if elapsed * 1000 > LIMIT_MS:
+                print(f"FAIL: loading the saved index took more than {LIMIT_MS}ms")
+                failed = True
+
+            start_new_session()
+            results, elapsed = timed(lambda: search_quizzes(QUERIES[1]))
+            print(f"search in a new session:   {elapsed * 1000:9.1f}ms, {len(results)} results")
+
+            if elapsed * 1000 > LIMIT_MS:
+                print(f"FAIL: the first search of a session took more than {LIMIT_MS}ms")
+                failed = True
+
+            changed_path = os.path.join("data", "quiz_0.json")
+
+            with open(changed_path, "r", encoding="utf-8") as f:
+                changed_quiz = json.load(f)
+
+            changed_quiz["questions"][7]["question"] = "Which gas do plants release during photosynthesis?"
+
+            with open(changed_path, "w", encoding="utf-8") as f:
+                json.dump(changed_quiz, f, indent=4)
+
+            search_index, elapsed = timed(load_search_index)
+            print(f"refresh, one file changed: {elapsed * 1000:9.1f}ms")
+
+            def scan_everything():
+                words = set(tokenize(QUERIES[0]))
+                found = []
+
+                for filename in load_quiz_file():
+                    for question in load_quiz_data(filename)["questions"]:
+                        if words & set(tokenize(question["question"])):
+                            found.append(filename)
+
+                return found
+
+            _, elapsed = timed(scan_everything)
+            print(f"scan of every quiz:        {elapsed * 1000:9.1f}ms")
+
+            for query in QUERIES:
+                results, elapsed = timed(lambda: search_index.search(query))
+                label = f"search '{query}':"
+                print(f"{label:27}{elapsed * 1000:9.1f}ms, {len(results)} results")
+
+                if elapsed * 1000 > LIMIT_MS:
+                    print(f"FAIL: the search took more than {LIMIT_MS}ms")
+                    failed = True
+
+            results, elapsed = timed(lambda: search_quizzes("plants release photosynthesis"))
+            print(f"search_quizzes (+ text):   {elapsed * 1000:9.1f}ms, best: {results[0]['filename']}: {results[0]['question']}")
+
+            if results[0]["filename"] != "quiz_0.json" or "photosynthesis" not in results[0]["question"]:
+                print("FAIL: the changed question is not the best match")
+                failed = True
+        finally:
+            os.chdir(original_directory)
+
+    if failed:
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+cold-start benchmark: launches 'python -X importtime main.py', picks "Exit" from the main menu and reports
+where the import time goes
+
+the script fails (exit code 1) when a module that must stay lazy (the AI generator and the 'requests'
+stack) is imported at startup, or when the median startup time is over --max-ms
+
+usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --top 15 --max-ms 250
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# modules that only the AI menu option needs
+LAZY_MODULES = ["src.ai_generator", "src.ai_transport", "requests", "urllib3", "charset_normalizer"]
+
+def run_once():
+    """
+    this function starts the application once with '-X importtime' and exits from the main menu
+
+    returns:
+        tuple[float, str]: a pair containing (wall_time_in_ms, importtime_report)
+    """
+    environment = dict(os.environ, TERM=os.environ.get("TERM", "dumb"))
+    start_time = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py"],
+        cwd=PROJECT_ROOT,
+        input="5\n",
+        capture_output=True,
+        text=True,
+        env=environment
+    )
+    wall_time = (time.perf_counter() - start_time) * 1000
+
+    if completed.returncode != 0:
+        print(completed.stderr)
+        raise SystemExit(f"main.py exited with code {completed.returncode}")
+
+    return wall_time, completed.stderr
+
+def parse_importtime(report):
+    """
+    this function reads the '-X importtime' report
+
+    args:
+        report (str): the stderr of the process
+
+    returns:
+        list[tuple[str, int, int]]: one (module, self_us, cumulative_us) tuple for every imported module
+    """
+    modules = []
+
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+
+    return modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time benchmark.")
+    parser.add_argument("--runs", type=int, default=5, help="number of launches (the median is reported)")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules to show")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the median startup time is over this value")
+    arguments = parser.parse_args()
+
+    wall_times = []
+    modules = []
+
+    for _ in range(arguments.runs):
+        wall_time, report = run_once()
+        wall_times.append(wall_time)
+        modules = parse_importtime(report)
+
+    median_time = statistics.median(wall_times)
+    imported_names = {name for name, _, _ in modules}
+    total_import_us = sum(self_us for _, self_us, _ in modules)
+
+    print(f"startup (median of {arguments.runs}): {median_time:.1f} ms")
+    print(f"imports: {len(modules)} modules, {total_import_us / 1000:.1f} ms")
+    print(f"\nslowest modules (cumulative):")
+
+    for name, self_us, cumulative_us in sorted(modules, key=lambda item: item[2], reverse=True)[:arguments.top]:
+        print(f"  {cumulative_us / 1000:8.2f} ms  {name}")
+
+    failed = False
+    eager_modules = [name for name in LAZY_MODULES if name in imported_names]
+
+    if eager_modules:
+        print(f"\nFAIL: imported at startup but should be lazy: {', '.join(eager_modules)}")
+        failed = True
+
+    if arguments.max_ms is not None and median_time > arguments.max_ms:
+        print(f"\nFAIL: startup took {median_time:.1f} ms, the limit is {arguments.max_ms:.1f} ms")
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+    print("\nOK")
+
+if __name__ == "__main__":
+    main()
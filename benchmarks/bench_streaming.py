@@ -0,0 +1,143 @@
+"""
+benchmark of the streaming quiz loader: compares json.load with QuestionStream on a large quiz file
+(time until the first question can be shown and peak memory), then checks the offset index and the
+random sampling
+
+usage:
+    python benchmarks/bench_streaming.py --questions 200000
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.quiz_stream import QuestionStream, iter_quiz_events, load_offset_index, open_quiz_stream, sample_questions
+
+def write_quiz(file_path, count, seed):
+    """
+    this function writes a quiz with 'count' random questions (with some non-ASCII text)
+    """
+    rng = random.Random(seed)
+    categories = ["Storia", "Scienza", "Geografia", "Città e società", "Música"]
+    quiz = {
+        "title": "Streaming benchmark",
+        "difficulty": "Hard",
+        "questions": [
+            {
+                "id": i + 1,
+                "question": f"Domanda numero {i + 1}: qual è la risposta giusta? ✓",
+                "category": rng.choice(categories),
+                "options": [f"Opzione {letter} ({i + 1})" for letter in "ABCD"],
+                "correctOption": rng.randrange(4),
+                "explanation": f"Spiegazione della domanda {i + 1}, perché sì.",
+                "points": rng.choice([5, 10, 15]),
+                "penalty": rng.choice([0, 2, 5]),
+                "time_limit": rng.choice([0, 15, 30])
+            }
+            for i in range(count)
+        ]
+    }
+
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(quiz, f, indent=4, ensure_ascii=False)
+
+def measure(function):
+    """
+    this function runs function() and gives back (result, seconds, peak MiB of python memory)
+    """
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start_time
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return result, elapsed, peak / (1024 * 1024)
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming quiz loader benchmark.")
+    parser.add_argument("--questions", type=int, default=200000, help="number of questions of the quiz")
+    parser.add_argument("--sample", type=int, default=20, help="questions picked by the sampling test")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        quiz_path = os.path.join(directory, "large_quiz.json")
+        write_quiz(quiz_path, arguments.questions, arguments.seed)
+        print(f"quiz file: {arguments.questions} questions, {os.path.getsize(quiz_path) / (1024 * 1024):.1f} MiB")
+
+        def load_all():
+            with open(quiz_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        expected, elapsed, peak = measure(load_all)
+        print(f"json.load:                 first question after {elapsed:.3f}s, peak {peak:.1f} MiB")
+
+        def first_question():
+            quiz = open_quiz_stream(quiz_path, shuffle=False)
+            return next(iter(quiz["questions"]))
+
+        question, elapsed, peak = measure(first_question)
+        print(f"stream (no index):         first question after {elapsed * 1000:.1f}ms, peak {peak:.2f} MiB")
+
+        if question != expected["questions"][0]:
+            print("FAIL: the first streamed question is not the first question of the file")
+            sys.exit(1)
+
+        # the shuffle window is filled while playing, so a mixed order must not delay the first question
+        shuffled = open_quiz_stream(quiz_path, rng=random.Random(arguments.seed))
+        _, shuffled_elapsed, _ = measure(lambda: next(iter(shuffled["questions"])))
+        print(f"stream shuffled (no index): first question after {shuffled_elapsed * 1000:.1f}ms")
+
+        if shuffled_elapsed > elapsed * 2 + 0.05:
+            print("FAIL: the shuffled stream waits for the whole window before the first question")
+            sys.exit(1)
+
+        stream = QuestionStream(quiz_path, shuffle=True, rng=random.Random(arguments.seed))
+        ids, elapsed, peak = measure(lambda: [question["id"] for question in stream])
+        print(f"stream full pass:          {elapsed:.3f}s, peak {peak:.1f} MiB (the offset index is saved at the end)")
+
+        if sorted(ids) != [question["id"] for question in expected["questions"]] or stream.skipped:
+            print("FAIL: the streamed questions are not the questions of the file")
+            sys.exit(1)
+
+        index = load_offset_index(quiz_path)
+
+        if index is None or index["count"] != arguments.questions:
+            print("FAIL: the offset index was not saved")
+            sys.exit(1)
+
+        quiz, elapsed, peak = measure(lambda: open_quiz_stream(quiz_path))
+        first, first_elapsed, _ = measure(lambda: next(iter(quiz["questions"])))
+        print(f"stream (with index):       first question after {(elapsed + first_elapsed) * 1000:.1f}ms, total known: {quiz['questions'].count}")
+
+        sample, elapsed, peak = measure(lambda: sample_questions(quiz_path, arguments.sample, random.Random(arguments.seed)))
+        print(f"sample {len(sample)} questions:        {elapsed * 1000:.1f}ms, peak {peak:.2f} MiB")
+
+        if any(question != expected["questions"][question["id"] - 1] for question in sample):
+            print("FAIL: a sampled question does not match the file")
+            sys.exit(1)
+
+        # tiny pieces cut inside the multi-byte characters must give the same questions and byte offsets
+        with open(quiz_path, "rb") as f:
+            head = f.read(1024 * 1024)
+
+        small_events = itertools.islice((event for event in iter_quiz_events(quiz_path, chunk_size=7) if event[0] == "question"), 100)
+
+        for _, position, question, start_byte, end_byte in small_events:
+            if question != expected["questions"][position] or (end_byte <= len(head) and json.loads(head[start_byte:end_byte]) != question):
+                print("FAIL: small chunks give different questions or offsets")
+                sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
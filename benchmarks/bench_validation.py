@@ -0,0 +1,119 @@
+"""
+benchmark of the quiz validator: writes a large quiz file, then measures the time to parse it and to
+validate it with the compiled schema (fail-fast and collect-all), on a valid quiz and on a quiz with
+errors in the last questions
+
+usage:
+    python benchmarks/bench_validation.py --questions 100000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_manager import is_valid_quiz
+from src.quiz_schema import format_error, validate_quiz
+
+def build_quiz(count, seed):
+    """
+    this function builds a quiz with 'count' random questions
+    """
+    rng = random.Random(seed)
+    categories = ["History", "Science", "Geography", "Sport", "Music", "Art"]
+
+    return {
+        "title": "Validation benchmark",
+        "difficulty": "Medium",
+        "questions": [
+            {
+                "id": i + 1,
+                "question": f"Question number {i + 1}?",
+                "category": rng.choice(categories),
+                "options": [f"Option {letter} of {i + 1}" for letter in "ABCD"],
+                "correctOption": rng.randrange(4),
+                "explanation": f"Explanation of question {i + 1}.",
+                "points": rng.choice([5, 10, 15]),
+                "penalty": rng.choice([0, 2, 5]),
+                "time_limit": rng.choice([0, 15, 30])
+            }
+            for i in range(count)
+        ]
+    }
+
+def measure(function, repeat):
+    """
+    this function gives back the best time of 'repeat' calls of function() and its last result
+    """
+    best = None
+    result = None
+
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start_time
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Quiz validation benchmark.")
+    parser.add_argument("--questions", type=int, default=100000, help="number of questions of the quiz")
+    parser.add_argument("--repeat", type=int, default=3, help="runs of every measure (the best one is shown)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random questions")
+    arguments = parser.parse_args()
+
+    quiz = build_quiz(arguments.questions, arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        quiz_path = os.path.join(directory, "large_quiz.json")
+
+        with open(quiz_path, "w", encoding="utf-8") as f:
+            json.dump(quiz, f)
+
+        def parse():
+            with open(quiz_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        parse_time, data = measure(parse, arguments.repeat)
+
+    count = arguments.questions
+    print(f"json.load:                 {parse_time:.3f}s")
+
+    fail_fast_time, errors = measure(lambda: validate_quiz(data, fail_fast=True), arguments.repeat)
+    print(f"validate_quiz (fail-fast): {fail_fast_time:.3f}s ({count / fail_fast_time:,.0f} questions/s, {fail_fast_time / (parse_time + fail_fast_time) * 100:.0f}% of the load)")
+
+    if errors:
+        print(f"FAIL: the valid quiz was rejected ({format_error(errors[0])})")
+        sys.exit(1)
+
+    collect_time, errors = measure(lambda: validate_quiz(data), arguments.repeat)
+    print(f"validate_quiz (all):       {collect_time:.3f}s ({count / collect_time:,.0f} questions/s)")
+
+    # three broken questions at the end, the worst case for fail-fast
+    data["questions"][-1]["points"] = "ten"
+    data["questions"][-2]["correctOption"] = 9
+    del data["questions"][-3]["explanation"]
+
+    fail_fast_time, errors = measure(lambda: validate_quiz(data, fail_fast=True), arguments.repeat)
+    print(f"invalid, fail-fast:        {fail_fast_time:.3f}s, {len(errors)} error: {format_error(errors[0])}")
+
+    collect_time, errors = measure(lambda: validate_quiz(data), arguments.repeat)
+    print(f"invalid, all:              {collect_time:.3f}s, {len(errors)} errors")
+
+    for error in errors:
+        print(f"  - {format_error(error)}")
+
+    if len(errors) != 3 or is_valid_quiz(data):
+        print("FAIL: the errors were not all found")
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+benchmark of the 'data' folder watcher: writes many quiz files into a temporary 'data' folder, then
+measures how long it takes for the catalog to see a new quiz, a changed quiz and a deleted quiz, with a
+full refresh (the old way), with inotify and with the polling watcher
+
+usage:
+    python benchmarks/bench_watcher.py --quizzes 10000
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src import data_manager
+from src.catalog import WatchedCatalog, load_catalog, refresh_catalog
+from src.creator import save_quiz_to_file
+from src.data_manager import is_valid_quiz, load_catalog_entries, start_watching_data, stop_watching_data
+from src.watcher import InotifyWatcher, PollingWatcher
+
+QUIZ = {
+    "title": "Watcher benchmark",
+    "difficulty": "Easy",
+    "questions": [
+        {
+            "id": 1,
+            "question": "Question?",
+            "category": "General",
+            "options": ["A", "B"],
+            "correctOption": 0,
+            "explanation": "Explanation.",
+            "points": 10,
+            "penalty": 2,
+            "time_limit": 20
+        }
+    ]
+}
+
+def write_quizzes(count):
+    """
+    this function writes 'count' quiz files into the 'data' folder of the current directory
+    """
+    os.makedirs("data", exist_ok=True)
+    content = json.dumps(QUIZ)
+
+    for quiz_number in range(count):
+        with open(os.path.join("data", f"quiz_{quiz_number:06}.json"), "w", encoding="utf-8") as f:
+            f.write(content)
+
+def timed(function):
+    """
+    this function runs function() and gives back (result, seconds)
+    """
+    start_time = time.perf_counter()
+    result = function()
+
+    return result, time.perf_counter() - start_time
+
+def check_changes(label, refresh, round_number):
+    """
+    this function creates, changes and deletes a quiz, and after each step times refresh() and checks
+    that the catalog it gives back saw the change
+
+    returns:
+        bool: true if every change was seen
+    """
+    title = f"Watched quiz {label} {round_number}"
+    filename = None
+
+    with redirect_stdout(io.StringIO()):
+        saved_path = save_quiz_to_file(dict(QUIZ, title=title))
+
+    filename = os.path.basename(saved_path)
+    entries, created_time = timed(refresh)
+    seen_created = entries.get(filename, {}).get("title") == title
+
+    changed_quiz = dict(QUIZ, title=title, difficulty="Hard")
+
+    with open(saved_path, "w", encoding="utf-8") as f:
+        json.dump(changed_quiz, f)
+
+    entries, changed_time = timed(refresh)
+    seen_changed = entries.get(filename, {}).get("difficulty") == "Hard"
+
+    os.remove(saved_path)
+    entries, deleted_time = timed(refresh)
+    seen_deleted = filename not in entries
+
+    print(f"{label:16} created {created_time * 1000:8.2f}ms, changed {changed_time * 1000:8.2f}ms, deleted {deleted_time * 1000:8.2f}ms")
+
+    return seen_created and seen_changed and seen_deleted
+
+def main():
+    parser = argparse.ArgumentParser(description="Data folder watcher benchmark.")
+    parser.add_argument("--quizzes", type=int, default=10000, help="number of quiz files")
+    arguments = parser.parse_args()
+
+    original_directory = os.getcwd()
+    all_seen = True
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        try:
+            write_quizzes(arguments.quizzes)
+            _, elapsed = timed(lambda: refresh_catalog("data", is_valid_quiz))
+            print(f"{arguments.quizzes} quizzes, first catalog build {elapsed * 1000:.1f}ms")
+
+            all_seen &= check_changes("full refresh", lambda: refresh_catalog("data", is_valid_quiz), 0)
+
+            for round_number, watcher_class in enumerate((InotifyWatcher, PollingWatcher), 1):
+                try:
+                    watcher = watcher_class("data")
+                except OSError as e:
+                    print(f"{watcher_class.__name__}: not available ({e})")
+                    continue
+
+                data_manager._watched_catalog = WatchedCatalog("data", is_valid_quiz, watcher)
+                all_seen &= check_changes(watcher_class.__name__, load_catalog_entries, round_number)
+                stop_watching_data()
+
+            start_watching_data()
+            print(f"start_watching_data picked {type(data_manager._watched_catalog.watcher).__name__}")
+            stop_watching_data()
+
+            if load_catalog("data") != refresh_catalog("data", is_valid_quiz):
+                print("FAIL: the saved catalog does not match the folder")
+                all_seen = False
+        finally:
+            os.chdir(original_directory)
+
+    if not all_seen:
+        print("FAIL: a change was not seen by the catalog")
+        sys.exit(1)
+
+    print("OK")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+stress benchmark for the leaderboard: N processes record scores at the same time and, at the end, the
+benchmark checks that every single score was saved and that the top scores index agrees with the log
+
+usage:
+    python benchmarks/stress_concurrent_scores.py --processes 8 --scores 200
+    python benchmarks/stress_concurrent_scores.py --backend sqlite
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src import storage
+from src.file_utils import DATA_DIR_ENV_VARIABLE
+from src.sqlite_backend import BACKEND_ENV_VARIABLE
+
+QUIZ_NAMES = ["Quiz A", "Quiz B", "Quiz C"]
+
+def record_scores(worker_number, scores_per_worker):
+    """
+    this function records the scores of one worker process
+
+    args:
+        worker_number (int): the number of the worker, used to build unique usernames
+        scores_per_worker (int): how many scores the worker records
+
+    returns:
+        int: the number of scores that record_score reported as saved
+    """
+    saved = 0
+
+    # the success message of every score would flood the terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(scores_per_worker):
+            score_record = {
+                "username": f"worker{worker_number}-{i}",
+                "score": (worker_number * 7919 + i * 104729) % 1000,
+                "quiz_name": QUIZ_NAMES[i % len(QUIZ_NAMES)],
+                "date": "2000-01-01 00:00:00"
+            }
+
+            if storage.record_score(score_record):
+                saved += 1
+
+    return saved
+
+def check_results(expected_records):
+    """
+    this function checks that no score was lost and that the top 10 of every quiz is correct
+
+    args:
+        expected_records (int): the number of scores recorded by all the workers
+
+    returns:
+        list[str]: the problems found (empty if everything is fine)
+    """
+    problems = []
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = storage.load_leaderboard()
+
+    usernames = {record["username"] for record in records}
+
+    if len(records) != expected_records:
+        problems.append(f"expected {expected_records} records, found {len(records)}")
+
+    if len(usernames) != len(records):
+        problems.append(f"found {len(records) - len(usernames)} duplicated records")
+
+    shown = {}
+    storage.print_top_10 = lambda top_10_list: shown.setdefault("top_10", top_10_list)
+
+    for quiz_name in QUIZ_NAMES:
+        shown.clear()
+        storage.display_top_10(quiz_name)
+        expected_scores = sorted((record["score"] for record in records if record["quiz_name"] == quiz_name), reverse=True)[:10]
+        shown_scores = [record["score"] for record in shown["top_10"]]
+
+        if shown_scores != expected_scores:
+            problems.append(f"top 10 of '{quiz_name}' is {shown_scores}, expected {expected_scores}")
+
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent leaderboard writers stress benchmark.")
+    parser.add_argument("--processes", type=int, default=8, help="number of concurrent writer processes")
+    parser.add_argument("--scores", type=int, default=200, help="scores recorded by every process")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json", help="storage backend to stress")
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_directory:
+        # the workers inherit the environment, so they all write into the temporary folder
+        os.environ[DATA_DIR_ENV_VARIABLE] = data_directory
+        os.environ[BACKEND_ENV_VARIABLE] = arguments.backend
+
+        start_time = time.perf_counter()
+
+        with multiprocessing.Pool(arguments.processes) as pool:
+            saved_counts = pool.starmap(record_scores, [(worker, arguments.scores) for worker in range(arguments.processes)])
+
+        elapsed = time.perf_counter() - start_time
+        expected_records = arguments.processes * arguments.scores
+        problems = check_results(expected_records)
+
+    print(f"backend:        {arguments.backend}")
+    print(f"processes:      {arguments.processes}")
+    print(f"scores saved:   {sum(saved_counts)}/{expected_records}")
+    print(f"elapsed:        {elapsed:.2f}s ({expected_records / elapsed:.0f} scores/s)")
+
+    if problems:
+        for problem in problems:
+            print(f"FAIL: {problem}")
+        sys.exit(1)
+
+    print("OK: no score was lost")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,16 @@
 import sys 
+from src.cli import parse_arguments, run_command
 from src.creator import run_quiz_creator, sanitize_title_for_filename, save_quiz_to_file
 from src.engine import run_quiz
-from src.data_manager import load_quiz_file, ensure_data_directory, load_quiz_data
+from src.quiz_pack import QuizPack
+from src.quiz_stream import QuestionStream
+from src.sampling import draw_questions
+from src.data_manager import iter_quiz_entries, start_watching_data, ensure_data_directory, load_quiz_data, is_large_quiz_file, load_question_index, build_custom_mix, search_quizzes
+from src.question_index import count_categories, group_by_difficulty
 from src.storage import load_leaderboard, save_leaderboard, display_top_10
-from src.ui_terminal import clear_screen, print_header, get_username
+from src.pagination import LazyPages
+from src.ui_terminal import redraw_screen, render_quiz_page, get_username
 from src.colors import color_blue, color_red, color_yellow, color_green, color_cyan
-from src.ai_generator import ai_generator, validate_ai_quiz_structure
 
 
 def display_main_menu():
@@ -15,63 +20,174 @@ def display_main_menu():
     returns:
         None
     """
-    clear_screen()
-    print_header()
+    redraw_screen()
     print(color_blue("\n" + "=" * 35))
     print(color_yellow("      MAIN MENU"))
     print(color_blue("=" * 35))
     print("1. Create a New Quiz")
     print("2. Play a Quiz")
     print("3. Generate Quiz using AI")
-    print("4. Exit application")
+    print("4. Play a Custom Mix (questions from all quizzes)")
+    print("5. Exit application")
     print(color_blue("-" * 35))
 
-def select_quiz_to_play(available_quizzes):
+def open_quiz_pages(filter_text=""):
     """
-    this funnction allows the user to select one quiz from the available list to play
+    this function gives back the pages of the quiz list, read from the catalog only when they are shown
 
     args:
-        available_quizzes (list[str]): a list of strings with the names of the valid JSON quiz files
-    
+        filter_text (str): only the quizzes with this text in the filename or in the title ("" for all)
+
+    returns:
+        LazyPages: the pages of (filename, catalog entry)
+    """
+    entries = iter_quiz_entries()
+
+    if filter_text:
+        needle = filter_text.casefold()
+        entries = ((filename, entry) for filename, entry in entries if needle in filename.casefold() or needle in entry["title"].casefold())
+
+    return LazyPages(entries)
+
+def select_quiz_to_play():
+    """
+    this funnction allows the user to select one quiz to play, one page at a time
+
+    only the page on the screen is read from the catalog and it is drawn with a single write, so the
+    menu shows up right away even with thousands of quizzes. the user can move between the pages, jump
+    to a page, filter the list or search inside the quizzes
+
     returns:
         str or None: the filename of the selected quiz, or None if the user wants to go back to the main menu
     """
+    filter_text = ""
+    pages = open_quiz_pages()
+    page_number = 0
+
+    try:
+        while True:
+            entries = pages.get_page(page_number)
+            page_count, is_final = pages.known_page_count()
+            first_number = page_number * pages.page_size + 1
+            redraw_screen(render_quiz_page(entries, first_number, page_number, page_count, is_final, filter_text))
+
+            while True:
+                choice = input("\nEnter the number of the quiz you want to play (or a command): ").strip()
+                command, _, argument = choice.partition(" ")
+                command = command.lower()
+                argument = argument.strip()
+
+                if command == "b":
+                    return None
+
+                if command == "n":
+                    if pages.has_page(page_number + 1):
+                        page_number += 1
+                        break
+
+                    print(color_yellow(f"\n[INFO] This is the last page."))
+                    continue
+
+                if command == "p":
+                    if page_number > 0:
+                        page_number -= 1
+                        break
+
+                    print(color_yellow(f"\n[INFO] This is the first page."))
+                    continue
+
+                if command == "g":
+                    try:
+                        target_page = int(argument) - 1
+                    except ValueError:
+                        print(color_red(f"\n[ERROR] Write the page number after 'g' (example: g 3)."))
+                        continue
+
+                    if target_page >= 0 and pages.has_page(target_page):
+                        page_number = target_page
+                        break
+
+                    print(color_red(f"\n[ERROR] There is no page {argument}."))
+                    continue
+
+                if command == "f":
+                    # 'f' alone removes the filter
+                    filter_text = argument
+                    pages.close()
+                    pages = open_quiz_pages(filter_text)
+                    page_number = 0
+                    break
+
+                if command == "s":
+                    selected_filename = search_for_quiz()
+
+                    if selected_filename is not None:
+                        return selected_filename
+
+                    break
+
+                try:
+                    index = int(choice) - first_number
+
+                    if 0 <= index < len(entries):
+                        selected_filename = entries[index][0]
+                        print(color_green(f"\nYou selected: {selected_filename}"))
+
+                        return selected_filename
+                    else:
+                        print(color_red(f"\n[ERROR] Invalid number. Please choose from this page."))
+                except ValueError:
+                    print(color_red(f"\n[ERROR] Invalid input. Enter a number or one of the commands."))
+    finally:
+        pages.close()
+
+def search_for_quiz():
+    """
+    this function asks for some words and shows the quizzes whose title, questions, options or
+    explanations match them best (full-text search), then lets the user pick one
+
+    returns:
+        str or None: the filename of the selected quiz, or None to go back to the quiz list
+    """
+    query = input("\nSearch for (example: 'solar system'): ").strip()
+
+    if not query:
+        return None
 
-    if not available_quizzes:
-        print(color_yellow(f"\n[INFO] No valid quizzes found to play."))
-        print(f"\nPress Enter to return to the menu...")
+    results = search_quizzes(query)
 
+    if not results:
+        print(color_yellow(f"\n[INFO] No quizzes match '{query}'."))
         return None
-    
-    clear_screen()
-    print_header()
-    print(color_blue(f"\n--- SELECT QUIZ TO PLAY ---"))
 
-    # displays available quizzes
+    print(color_blue(f"\n--- SEARCH RESULTS ---"))
+
+    for i, result in enumerate(results):
+        print(f"{i + 1}. {result['title']} ({result['filename']})")
 
-    for i, filename in enumerate(available_quizzes):
-        print(f"{i + 1}. {filename}")
+        if result["question"] is not None:
+            print(color_cyan(f"     {result['question']}"))
 
     print(color_blue("-" * 35))
 
     while True:
-        choice = input("\nEnter the number of the quiz you want to play (or 'b' to go back): ").strip().lower()
+        choice = input("\nEnter the number of the quiz you want to play (Enter to go back): ").strip()
 
-        if choice == "b":
+        if not choice:
             return None
-        
+
         try:
             index = int(choice) - 1
 
-            if 0 <= index < len(available_quizzes):
-                selected_filename = available_quizzes[index]
+            if 0 <= index < len(results):
+                selected_filename = results[index]["filename"]
                 print(color_green(f"\nYou selected: {selected_filename}"))
 
                 return selected_filename
             else:
-                print(color_red(f"\n[ERROR] Invalid number. Please choose from the list."))
+                print(color_red(f"\n[ERROR] Invalid number. Please choose from the results."))
         except ValueError:
-            print(color_red(f"\n[ERROR] Invalid input. Enter a number or 'b'."))
+            print(color_red(f"\n[ERROR] Invalid input. Enter a number or press Enter."))
 
 def load_selected_quiz(filename):
     """
@@ -93,6 +209,137 @@ def load_selected_quiz(filename):
         
         return None
     
+def ask_numbers(prompt, maximum):
+    """
+    this function asks a list of numbers separated by commas (example: "1, 3") from a numbered list
+
+    args:
+        prompt (str): the question shown to the user
+        maximum (int): the highest valid number
+
+    returns:
+        list[int] or None: the chosen indexes (starting from 0), or None if the user pressed Enter
+    """
+    while True:
+        answer = input(prompt).strip()
+
+        if not answer:
+            return None
+
+        try:
+            numbers = [int(part) for part in answer.split(",") if part.strip()]
+        except ValueError:
+            numbers = []
+
+        if numbers and all(1 <= number <= maximum for number in numbers):
+            return [number - 1 for number in numbers]
+
+        print(color_red(f"\n[ERROR] Invalid input. Enter numbers from 1 to {maximum} separated by commas, or press Enter."))
+
+def select_custom_mix():
+    """
+    this function shows the categories and the difficulties of all the quizzes and builds a "custom mix"
+    quiz with the questions the user asks for (example: 15 random Science questions of the Hard quizzes)
+
+    returns:
+        dict or None: the quiz to play, or None if there are no matching questions
+    """
+    question_index = load_question_index()
+    quizzes_by_difficulty = group_by_difficulty(question_index)
+
+    if not question_index:
+        print(color_yellow(f"\n[INFO] No valid quizzes found to mix."))
+        return None
+
+    redraw_screen()
+    print(color_blue(f"\n--- CUSTOM MIX: DIFFICULTIES ---"))
+    difficulty_names = list(quizzes_by_difficulty)
+
+    for i, difficulty in enumerate(difficulty_names):
+        print(f"{i + 1}. {difficulty} ({len(quizzes_by_difficulty[difficulty])} quizzes)")
+
+    chosen = ask_numbers("\nChoose the difficulties (example: 1,2 - Enter for all): ", len(difficulty_names))
+    difficulties = {difficulty_names[i] for i in chosen} if chosen is not None else None
+
+    category_counts = count_categories(question_index, difficulties)
+    category_names = list(category_counts)
+
+    print(color_blue(f"\n--- CUSTOM MIX: CATEGORIES ---"))
+
+    for i, category in enumerate(category_names):
+        print(f"{i + 1}. {category} ({category_counts[category]} questions)")
+
+    chosen = ask_numbers("\nChoose the categories (example: 1,3 - Enter for all): ", len(category_names))
+    categories = {category_names[i] for i in chosen} if chosen is not None else None
+    available = sum(category_counts[category] for category in (categories or category_names))
+
+    while True:
+        answer = input(f"\nHow many questions do you want to play? (1-{available}, Enter for 10): ").strip()
+
+        try:
+            count = int(answer) if answer else 10
+        except ValueError:
+            count = 0
+
+        if count > 0:
+            break
+
+        print(color_red(f"\n[ERROR] Invalid input. Enter a number greater than zero."))
+
+    quiz_data = build_custom_mix(count, categories, difficulties, question_index=question_index)
+
+    if not quiz_data["questions"]:
+        print(color_yellow(f"\n[INFO] No questions match your choice."))
+        return None
+
+    return quiz_data
+
+def ask_draw_options(quiz_data):
+    """
+    this function asks how many questions to play: the user can play them all or draw only some of them
+    at random (optionally keeping the same mix of categories)
+
+    args:
+        quiz_data (dict): the loaded quiz
+
+    returns:
+        dict: the quiz to play (the same one, or a copy with only the drawn questions)
+    """
+    questions = quiz_data["questions"]
+    total = questions.count if isinstance(questions, QuestionStream) else len(questions)
+    total_text = total if total is not None else "all"
+
+    while True:
+        answer = input(f"\nHow many questions do you want to play? (Enter for all, {total_text}): ").strip()
+
+        if not answer:
+            return quiz_data
+
+        try:
+            count = int(answer)
+        except ValueError:
+            print(color_red(f"\n[ERROR] Invalid input. Enter a number or press Enter."))
+            continue
+
+        if count <= 0:
+            print(color_red(f"\n[ERROR] The number must be greater than zero."))
+            continue
+
+        if total is not None and count >= total:
+            return quiz_data
+
+        break
+
+    while True:
+        action = input(f"Keep the same mix of categories? (y/n): ").strip().lower()
+
+        if action in ("y", "n"):
+            break
+
+        print(color_red(f"\n[ERROR] Invalid input. Enter 'y' or 'n'."))
+
+    return draw_questions(quiz_data, count, stratify=action == "y")
+
 def handle_post_quiz_actions(quiz_title):
     """
     this function handles viewing the leaderboard after a quiz section
@@ -131,33 +378,39 @@ def main_application_loop():
     """
 
     ensure_data_directory("data")
-
-    available_quizzes = load_quiz_file()
+    # new, changed and deleted quizzes are picked up from the watcher, the folder is not read again
+    start_watching_data()
 
     while True:
         display_main_menu()
 
-        available_quizzes = load_quiz_file()
-
-        choice = input("\nEnter your choice (1-4): ").strip()
+        choice = input("\nEnter your choice (1-5): ").strip()
 
         if choice == "1":
             print(color_blue(f"\nStarting Quiz Creator..."))
             run_quiz_creator()
 
-            available_quizzes = load_quiz_file()
-
         elif choice == "2":
-            selected_file = select_quiz_to_play(available_quizzes)
+            selected_file = select_quiz_to_play()
 
             if selected_file:
-                quiz_data = load_quiz_data(selected_file)
+                # very large quizzes are read while playing (from their quiz pack, if it was exported),
+                # so the first question shows up right away. the others are kept in a compact question bank
+                quiz_data = load_quiz_data(selected_file, compact=True, stream=is_large_quiz_file(selected_file), use_pack=True)
 
                 if quiz_data:
-                    quiz_title = quiz_data["title"]
-                    print(color_blue(f"\nStarting Quiz: {quiz_title}"))
+                    # a quiz pack keeps its file mapped until it is closed, also when only some questions are drawn
+                    pack = quiz_data["questions"] if isinstance(quiz_data["questions"], QuizPack) else None
 
-                    match_status = run_quiz(quiz_data)
+                    try:
+                        quiz_data = ask_draw_options(quiz_data)
+                        quiz_title = quiz_data["title"]
+                        print(color_blue(f"\nStarting Quiz: {quiz_title}"))
+
+                        match_status = run_quiz(quiz_data)
+                    finally:
+                        if pack is not None:
+                            pack.close()
 
                     if match_status:
                         handle_post_quiz_actions(quiz_title)
@@ -165,8 +418,27 @@ def main_application_loop():
         elif choice == "3":
             print(color_blue(f"Starting AI Quiz Generation..."))
 
+            # imported only here, so the network code is loaded only by the users who need it
+            from src.ai_generator import ai_generator
+
             quiz_data_ai = ai_generator()
 
+            if quiz_data_ai is not None and not isinstance(quiz_data_ai["questions"], list):
+                # streaming mode: the quiz is played while the AI writes it, and saved only if it arrived whole
+                question_stream = quiz_data_ai["questions"]
+                print(color_blue(f"\nStarting Quiz: {quiz_data_ai['title']}"))
+
+                match_status = run_quiz(quiz_data_ai)
+
+                if match_status:
+                    handle_post_quiz_actions(quiz_data_ai["title"])
+
+                quiz_data_ai = question_stream.get_quiz_data()
+
+                # the error that stopped the questions was already shown by run_quiz
+                if quiz_data_ai is None:
+                    print(color_yellow(f"\n[WARN] The AI-generated quiz did not arrive whole, so it was not saved."))
+
             if quiz_data_ai is not None:
                 ai_quiz_title = sanitize_title_for_filename(quiz_data_ai["title"])
 
@@ -180,17 +452,50 @@ def main_application_loop():
 
         
         elif choice == "4":
+            quiz_data = select_custom_mix()
+
+            if quiz_data:
+                quiz_title = quiz_data["title"]
+                print(color_blue(f"\nStarting Quiz: {quiz_title}"))
+
+                match_status = run_quiz(quiz_data)
+
+                if match_status:
+                    handle_post_quiz_actions(quiz_title)
+
+        elif choice == "5":
             print(color_green(f"\nThank you for using the Quiz App. Goodbye!"))
             sys.exit(0)
 
         else:
-            print(color_red(f"[ERROR] Invalid choice. Please select 1, 2, 3, or 4."))
+            print(color_red(f"[ERROR] Invalid choice. Please select 1, 2, 3, 4, or 5."))
 
         input(f"\nPress Enter to return to the Main Menu")
 
-try:
-    ensure_data_directory("data")
-    main_application_loop()
-except KeyboardInterrupt:
-    print(color_red(f"\n\nApplication interrupted by user (Ctrl+C). Exiting."))
-    sys.exit(0)
\ No newline at end of file
+def main(argv=None):
+    """
+    this function starts the program: it runs the command given on the command line (see 'src/cli.py'),
+    or the interactive menu
+
+    args:
+        argv (list[str] or None): the arguments (None for the ones of the program)
+
+    returns:
+        int: the exit code (0 if everything went fine)
+    """
+    arguments = parse_arguments(argv)
+
+    if arguments.command is not None:
+        # the commands never clear the screen nor ask anything, so they can be scripted
+        return run_command(arguments)
+
+    try:
+        ensure_data_directory("data")
+        main_application_loop()
+    except KeyboardInterrupt:
+        print(color_red(f"\n\nApplication interrupted by user (Ctrl+C). Exiting."))
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
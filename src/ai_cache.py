@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import time
+from src.file_utils import atomic_write_json, get_project_data_directory
+
+CACHE_DIRECTORY = ".ai_cache" # inside the data folder
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".json"
+DEFAULT_TTL = 7 * 24 * 3600 # seconds a cached answer stays valid
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024 # the least recently used answers are removed above this size
+
+def get_cache_directory():
+    """
+    This function figures out the folder of the AI response cache
+
+    Returns:
+        A path object that points to 'data/.ai_cache' (QUIZ_ENGINE_DATA_DIR moves it with the data folder)
+    """
+    return get_project_data_directory() / CACHE_DIRECTORY
+
+def make_cache_key(model_name, system_instruction, prompt, generation_config, variant=None):
+    """
+    This function builds the key of a request: the same model, instruction, prompt and settings
+    always give the same key, any change gives another one
+
+    Args:
+        model_name: the name of the AI model
+        system_instruction: the system instruction sent to the model
+        prompt: the prompt sent to the model
+        generation_config: the dictionary with the generation settings
+        variant: a value that tells apart the answers of the same request sent more than once
+            (example: the number of a shard), None for a single request
+
+    Returns:
+        The SHA-256 of the request, as a hex string
+    """
+    parts = [model_name, system_instruction, prompt, generation_config]
+
+    # without a variant the key stays the one of the cache files written before
+    if variant is not None:
+        parts.append(variant)
+
+    request = json.dumps(parts, sort_keys=True, separators=(",", ":"))
+
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+def load_cached_response(key, ttl=DEFAULT_TTL, directory=None):
+    """
+    This function looks for the cached answer of a request
+
+    An answer older than 'ttl' is removed and not given back. A hit updates the modification time of
+    the file, which is the "last used" time of the LRU eviction
+
+    Args:
+        key: the key of the request (see make_cache_key)
+        ttl: the seconds an answer stays valid
+        directory: the cache folder (None for the default one)
+
+    Returns:
+        A dictionary with "raw" (the text of the model) and "quiz" (the validated quiz), or None if the
+        request is not cached
+    """
+    path = os.path.join(directory or get_cache_directory(), key + CACHE_SUFFIX)
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION or entry.get("key") != key:
+        return None
+
+    if time.time() - entry.get("created", 0) > ttl:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+        return None
+
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return entry
+
+def save_cached_response(key, raw_text, quiz_data, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+    """
+    This function saves the answer of a request into the cache, then removes the least recently used
+    answers if the cache is bigger than 'max_bytes'
+
+    Args:
+        key: the key of the request (see make_cache_key)
+        raw_text: the text given back by the model
+        quiz_data: the validated quiz
+        max_bytes: the highest size of the cache folder
+        directory: the cache folder (None for the default one)
+
+    Raises:
+        OSError: if the answer cannot be written
+    """
+    directory = directory or get_cache_directory()
+    os.makedirs(directory, exist_ok=True)
+
+    entry = {"version": CACHE_VERSION, "key": key, "created": time.time(), "raw": raw_text, "quiz": quiz_data}
+    atomic_write_json(os.path.join(directory, key + CACHE_SUFFIX), entry)
+
+    evict_cache_entries(max_bytes, directory)
+
+def evict_cache_entries(max_bytes=DEFAULT_MAX_BYTES, directory=None):
+    """
+    This function removes the least recently used answers until the cache fits into 'max_bytes'
+
+    Args:
+        max_bytes: the highest size of the cache folder
+        directory: the cache folder (None for the default one)
+
+    Returns:
+        The number of answers removed
+    """
+    files = []
+    total_size = 0
+
+    try:
+        with os.scandir(directory or get_cache_directory()) as entries:
+            for entry in entries:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+
+                try:
+                    file_stat = entry.stat()
+                except OSError:
+                    continue
+
+                files.append((file_stat.st_mtime_ns, file_stat.st_size, entry.path))
+                total_size += file_stat.st_size
+    except OSError:
+        return 0
+
+    removed = 0
+
+    for _, size, path in sorted(files):
+        if total_size <= max_bytes:
+            break
+
+        try:
+            os.remove(path)
+        except OSError: # another thread or process removed it first
+            pass
+
+        total_size -= size
+        removed += 1
+
+    return removed
@@ -1,23 +1,47 @@
 import os
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from src.colors import color_red, color_green, color_blue, color_yellow, color_magenta, color_cyan
-import requests
+from src.ai_cache import load_cached_response, make_cache_key, save_cached_response
+from src.ai_transport import DEFAULT_TIMEOUT, post_json
+from src.quiz_schema import format_error, validate_quiz
 
-def run_ai_quiz_generation(api_key, topic):
+MODEL_NAME = "gemini-2.5-flash-lite-preview-09-2025"
+AI_BASE_URL_ENV_VARIABLE = "QUIZ_ENGINE_AI_BASE_URL" # set it to use another server (example: a local stub)
+DEFAULT_AI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta"
+DEFAULT_CONCURRENCY = 4 # requests sent at the same time by the batch mode
+DEFAULT_QUESTION_COUNT = 12
+
+def get_model_url(method, api_key):
     """
-    This function generates a quiz using AI and returns the quiz data
+    This function builds the URL of a method of the AI model
+
+    The server is the Gemini API, unless the QUIZ_ENGINE_AI_BASE_URL environment variable points to
+    another one (example: "http://127.0.0.1:8000/v1beta" for a local stub server)
 
     Args:
-        api_key: The API key for the AI service
-        topic: The topic for the quiz to be generated
+        method: the method of the model (example: "generateContent")
+        api_key: the API key for the AI service
 
     Returns:
-        The validated quiz data as a dictionary, or None if an error occurs.
+        The full URL, with the API key
+    """
+    base_url = os.environ.get(AI_BASE_URL_ENV_VARIABLE) or DEFAULT_AI_BASE_URL
 
-    Raises:
-        ValueError: if JSON parsing fails or the structure is invalid
-        ConnectionError: if a network related error occurs during the request
+    return f"{base_url.rstrip('/')}/models/{MODEL_NAME}:{method}?key={api_key}"
+
+def build_quiz_request(topic, question_count=DEFAULT_QUESTION_COUNT, subtopic=None):
+    """
+    This function builds the request that asks the AI model for a quiz
+
+    Args:
+        topic: The topic for the quiz to be generated
+        question_count: the number of questions to ask for
+        subtopic: the part of the topic the questions must be about (None for the whole topic)
+
+    Returns:
+        A tuple containing (system_instruction, prompt, generation_config, payload)
     """
     example_structure = json.dumps({
         "title": "Syntax and basic Python concepts.",
@@ -44,14 +68,8 @@ def run_ai_quiz_generation(api_key, topic):
         f"Follow this exact JSON structure: {example_structure}"
     )
 
-    
-    model_name = "gemini-2.5-flash-lite-preview-09-2025" 
-    API_ENDPOINT = f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}:generateContent?key={api_key}"
-    HEADERS = {"Content-Type": "application/json"}
-
-
     prompt = (
-        f"Generate a quiz on the topic: '{topic}' with 12 multiple-choice questions. "
+        f"Generate a quiz on the topic: '{topic}' with {question_count} multiple-choice questions. "
         "Strictly output raw JSON matching this structure exactly. \n"
         f"Structure Example: {example_structure}\n\n"
         "Rules:\n"
@@ -61,6 +79,14 @@ def run_ai_quiz_generation(api_key, topic):
         "4. No Markdown, no code blocks, just JSON."
     )
 
+    if subtopic:
+        prompt += f"\n\nOnly ask about this part of the topic: '{subtopic}'."
+
+    generation_config = {
+        "temperature": 0.4,
+        "response_mime_type": "application/json" 
+    }
+
     payload = {
         "system_instruction": {
             "parts": [{"text": system_instruction}]
@@ -68,63 +94,191 @@ def run_ai_quiz_generation(api_key, topic):
         "contents": [{
             "parts": [{"text": prompt}]
         }],
-        "generationConfig": {
-            "temperature": 0.4,
-            "response_mime_type": "application/json" 
-        }
+        "generationConfig": generation_config
     }
+
+    return system_instruction, prompt, generation_config, payload
+
+def run_ai_quiz_generation(api_key, topic, use_cache=True):
+    """
+    This function generates a quiz using AI and returns the quiz data
+
+    The validated answers are kept in the AI response cache (src/ai_cache.py), keyed by the model,
+    the instruction, the prompt and the settings: the same request again is answered from the disk
+    without calling the AI service
+
+    Args:
+        api_key: The API key for the AI service
+        topic: The topic for the quiz to be generated
+        use_cache: False to always call the AI service (the new answer is still saved in the cache)
+
+    Returns:
+        The validated quiz data as a dictionary, or None if an error occurs.
+
+    Raises:
+        ValueError: if JSON parsing fails or the structure is invalid
+        ConnectionError: if a network related error occurs during the request
+    """
+    system_instruction, prompt, generation_config, payload = build_quiz_request(topic)
+    cache_key = make_cache_key(MODEL_NAME, system_instruction, prompt, generation_config)
+
+    if use_cache:
+        cached = load_cached_response(cache_key)
+
+        if cached is not None:
+            return cached["quiz"]
+
+    content_string = request_quiz_text(api_key, payload)
+
     try:
-        response = requests.post(API_ENDPOINT, headers=HEADERS, json=payload, timeout=30)
-
-        if response.status_code == 200:
-            api_response = response.json()
-            try:
-                content_string = api_response["candidates"][0]["content"]["parts"][0]["text"]
-            except (KeyError, IndexError) as e:
-                print(color_yellow(f"[DEBUG] Full Response: {response}"))
-                raise ValueError("Unexpected API response format (missing candidates/message)")
-
-            content_string = content_string.strip()
-            if content_string.startswith("```json"):
-                content_string = content_string[7:]
-            if content_string.startswith("```"):
-                content_string = content_string[3:]
-            if content_string.endswith("```"):
-                content_string = content_string[:-3]
-            
-            content_string = content_string.strip()
-
-            try:
-                quiz_data = json.loads(content_string)
-            except json.JSONDecodeError as e:
-                print(color_yellow(f"[DEBUG] Raw AI Output that failed parsing:\n{content_string}"))
-                raise ValueError(color_red(f"[ERROR] Failed to parse AI response as JSON: {str(e)}"))
-            
-            if validate_ai_quiz_structure(quiz_data):
-                return quiz_data
-            else:
-                raise ValueError(color_red("[ERROR] AI-generated quiz data has an invalid structure."))
-            
-        elif response.status_code in [401, 403]:
-            raise ValueError(color_red("[ERROR] Authentication failed. Please check your API key."))
-        else:
-            raise ValueError(color_red(f"[ERROR] Error in AI service server. Status code: {response.status_code}. Message: {response.text}"))
-    
-    except requests.exceptions.RequestException as e:
+        quiz_data = json.loads(content_string)
+    except json.JSONDecodeError as e:
+        print(color_yellow(f"[DEBUG] Raw AI Output that failed parsing:\n{content_string}"))
+        raise ValueError(color_red(f"[ERROR] Failed to parse AI response as JSON: {str(e)}"))
+
+    if validate_ai_quiz_structure(quiz_data):
+        try:
+            save_cached_response(cache_key, content_string, quiz_data)
+        except OSError:
+            pass # the cache only saves time, the quiz is fine without it
+
+        return quiz_data
+    else:
+        raise ValueError(color_red("[ERROR] AI-generated quiz data has an invalid structure."))
+
+def request_quiz_text(api_key, payload):
+    """
+    This function sends a quiz request to the AI model and returns the text it wrote
+
+    Args:
+        api_key: The API key for the AI service
+        payload: the request (see build_quiz_request)
+
+    Returns:
+        The text of the model, without the Markdown code fences
+
+    Raises:
+        ValueError: if the server answers with an error or an unexpected format
+        ConnectionError: if a network related error occurs during the request
+    """
+    API_ENDPOINT = get_model_url("generateContent", api_key)
+    HEADERS = {"Content-Type": "application/json"}
+
+    try:
+        status_code, response_text = post_json(API_ENDPOINT, HEADERS, payload, timeout=DEFAULT_TIMEOUT)
+    except ConnectionError as e:
         raise ConnectionError(color_red(f"[ERROR] Network/connection error: {str(e)}")) from e
-    
-    return None
 
+    if status_code in [401, 403]:
+        raise ValueError(color_red("[ERROR] Authentication failed. Please check your API key."))
+    elif status_code != 200:
+        raise ValueError(color_red(f"[ERROR] Error in AI service server. Status code: {status_code}. Message: {response_text}"))
+
+    try:
+        api_response = json.loads(response_text)
+        content_string = api_response["candidates"][0]["content"]["parts"][0]["text"]
+    except (ValueError, KeyError, IndexError, TypeError) as e:
+        print(color_yellow(f"[DEBUG] Full Response: {response_text}"))
+        raise ValueError("Unexpected API response format (missing candidates/message)")
+
+    content_string = content_string.strip()
+    if content_string.startswith("```json"):
+        content_string = content_string[7:]
+    if content_string.startswith("```"):
+        content_string = content_string[3:]
+    if content_string.endswith("```"):
+        content_string = content_string[:-3]
+
+    return content_string.strip()
+
+def _generate_for_batch(api_key, topic, use_cache):
+    """
+    This function generates the quiz of one topic inside a worker thread of the batch mode
+
+    Args:
+        api_key: The API key for the AI service
+        topic: The topic for the quiz to be generated
+        use_cache: False to skip the AI response cache
+
+    Returns:
+        A dictionary with "topic", "quiz" (None if it failed), "error", "saved_path" and "seconds"
+    """
+    start_time = time.perf_counter()
+    result = {"topic": topic, "quiz": None, "error": None, "saved_path": None, "seconds": 0.0}
+
+    try:
+        result["quiz"] = run_ai_quiz_generation(api_key, topic, use_cache)
+    except (ValueError, ConnectionError) as e:
+        result["error"] = str(e)
+    except Exception as e:
+        result["error"] = f"Unknown error: {str(e)}"
+
+    result["seconds"] = time.perf_counter() - start_time
+
+    return result
+
+def run_batch_generation(api_key, topics, concurrency=DEFAULT_CONCURRENCY, save_quiz=None, use_cache=True):
+    """
+    This function generates one quiz for every topic, sending up to 'concurrency' requests at the same time
+
+    The requests run on a pool of threads (they only wait for the network), so the whole batch takes
+    about as long as the slowest requests instead of the sum of all of them. Every quiz is validated by
+    run_ai_quiz_generation and saved with 'save_quiz' as soon as it is ready, from the calling thread
+
+    Args:
+        api_key: The API key for the AI service
+        topics: the list of topics
+        concurrency: the highest number of requests sent at the same time
+        save_quiz: the function that saves a quiz and returns its path or None (example: save_quiz_to_file),
+                   None to keep the quizzes only in the results
+        use_cache: False to skip the AI response cache
+
+    Returns:
+        A list with one dictionary per topic, in the order they finished: "topic", "quiz" (None if it
+        failed), "error", "saved_path" and "seconds" (the time of its request)
+    """
+    results = []
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        futures = [executor.submit(_generate_for_batch, api_key, topic, use_cache) for topic in topics]
+
+        for future in as_completed(futures):
+            result = future.result()
+
+            if result["quiz"] is None:
+                print(color_red(f"[ERROR] '{result['topic']}' failed after {result['seconds']:.1f}s: {result['error']}"))
+            else:
+                print(color_green(f"[SUCCESS] '{result['topic']}' generated in {result['seconds']:.1f}s"))
+
+                if save_quiz is not None:
+                    result["saved_path"] = save_quiz(result["quiz"])
+
+            results.append(result)
+
+    return results
 
 def ai_generator():
     """
     This function is the main entry point for the AI quiz generation module
 
+    The user can choose to play the quiz while it is generated: the questions are then streamed (see
+    src/ai_stream.py) and the first one shows up after a few seconds
+
     Returns: 
         The generated quiz data as a dictionary, or None if generation fails.
+        In streaming mode "questions" is an AIQuestionStream, to be played with run_quiz
     """
     try:
         key, topic = _get_api_key_from_user()
+        play_now = input("Play the quiz while it is being generated? (y/N): ").strip().lower() == "y"
+
+        if play_now:
+            from src.ai_stream import open_ai_quiz_stream
+
+            print(color_blue(f"Generating quiz on '{topic}'... The first question comes in a few seconds."))
+
+            return open_ai_quiz_stream(key, topic)
+
         print(color_blue(f"Generating quiz on '{topic}'... This may take up to a minute."))
 
         quiz_data = run_ai_quiz_generation(key, topic)
@@ -173,63 +327,18 @@ def validate_ai_quiz_structure(quiz_data):
     """
     This function validates the structure of the AI-generated quiz data.
 
+    The rules are the same used for the quiz files (QUIZ_SCHEMA in src/quiz_schema.py).
+    Every error found is printed with its path (example: "questions[2].points: must be of type integer").
+
     Args:
         quiz_data: the data returned by the AI service
 
     Returns:
         True if the structure is valid, False otherwise
     """
-    
-    if type(quiz_data) is not dict:
-        print(color_yellow("[DEBUG Validation] Root is not a dictionary."))
-        return False
-    
-    if "title" not in quiz_data or not isinstance(quiz_data["title"], str):
-        print(color_yellow("[DEBUG Validation] Missing or invalid 'title'."))
-        return False
-    
-    if "difficulty" not in quiz_data or not isinstance(quiz_data["difficulty"], str):
-        print(color_yellow("[DEBUG Validation] Missing or invalid 'difficulty'."))
-        return False
-    
-    if "questions" not in quiz_data or not isinstance(quiz_data["questions"], list) or not quiz_data["questions"]:
-        print(color_yellow("[DEBUG Validation] 'questions' list is missing, empty, or not a list."))
-        return False
-    
-    required_keys = ["question", "options", "id", "correctOption", "explanation", "points", "penalty", "time_limit", "category"]
+    errors = validate_quiz(quiz_data)
 
-    for i, question in enumerate(quiz_data["questions"]):
-        if not isinstance(question, dict):
-            print(color_yellow(f"[DEBUG Validation] Item at index {i} in questions is not a dict."))
-            return False
+    for error in errors:
+        print(color_yellow(f"[DEBUG Validation] {format_error(error)}"))
 
-        missing_keys = [key for key in required_keys if key not in question]
-        if missing_keys:
-            print(color_yellow(f"[DEBUG Validation] Question {i} missing keys: {missing_keys}"))
-            return False
-        
-        if not isinstance(question["question"], str):
-            print(color_yellow(f"[DEBUG] Question {i}: 'question' is not str"))
-            return False
-        
-        if not isinstance(question["options"], list) or len(question["options"]) < 2:
-            print(color_yellow(f"[DEBUG] Question {i}: 'options' invalid (must be list >= 2)"))
-            return False
-            
-        if not isinstance(question["correctOption"], int):
-            print(color_yellow(f"[DEBUG] Question {i}: 'correctOption' is not int"))
-            return False
-
-        if not (0 <= question["correctOption"] < len(question["options"])):
-            print(color_yellow(f"[DEBUG] Question {i}: 'correctOption' index out of range"))
-            return False
-
-        if not isinstance(question["points"], int):
-            print(color_yellow(f"[DEBUG] Question {i}: 'points' is not int"))
-            return False
-
-        if not isinstance(question["id"], int):
-            print(color_yellow(f"[DEBUG] Question {i}: 'id' is not int"))
-            return False
-
-    return True
\ No newline at end of file
+    return not errors
\ No newline at end of file
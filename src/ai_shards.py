@@ -0,0 +1,333 @@
+import math
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.ai_cache import load_cached_response, make_cache_key, save_cached_response
+from src.ai_generator import DEFAULT_CONCURRENCY, DEFAULT_QUESTION_COUNT, MODEL_NAME, build_quiz_request, request_quiz_text
+from src.colors import color_green, color_red, color_yellow
+from src.quiz_schema import validate_question
+from src.quiz_stream import QuizStreamParser
+
+SHARD_SIZE = DEFAULT_QUESTION_COUNT # questions asked in one request, the size the model answers reliably
+MAX_ROUNDS = 3 # the rounds after the first one ask again for the questions still missing
+DUPLICATE_SIMILARITY = 0.8 # two questions sharing this fraction of their words are the same question
+SALVAGE_PIECE_SIZE = 512 # characters given to the parser at a time when a text is salvaged
+DEFAULT_POINTS = 10
+DEFAULT_PENALTY = 5
+DEFAULT_TIME_LIMIT = 20
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+def plan_shards(question_count, shard_size=SHARD_SIZE):
+    """
+    This function splits a number of questions into requests of at most 'shard_size' questions
+
+    Args:
+        question_count: the number of questions to generate
+        shard_size: the highest number of questions of one request
+
+    Returns:
+        The list with the number of questions of every request, as even as possible
+        (example: 30 questions of 12 -> [10, 10, 10])
+    """
+    shard_count = max(1, math.ceil(question_count / shard_size))
+    base, extra = divmod(question_count, shard_count)
+
+    return [base + 1 if i < extra else base for i in range(shard_count)]
+
+def salvage_questions(text):
+    """
+    This function reads the questions of a quiz written by the model even if the JSON is cut off or
+    broken: every question completed before the problem is kept
+
+    Args:
+        text: the text of the model
+
+    Returns:
+        A tuple containing (fields, questions, complete): the top level fields (title, difficulty...),
+        the list of the questions read, and True if the whole text was valid
+    """
+    parser = QuizStreamParser()
+    events = []
+    complete = True
+
+    try:
+        for start in range(0, len(text), SALVAGE_PIECE_SIZE):
+            events.extend(parser.feed(text[start:start + SALVAGE_PIECE_SIZE]))
+
+        events.extend(parser.close())
+    except ValueError:
+        # the events completed in the same piece before the error are still kept
+        events.extend(parser.last_events)
+        complete = False
+
+    fields = {event[1]: event[2] for event in events if event[0] == "field"}
+    questions = [event[2] for event in events if event[0] == "question"]
+
+    return fields, questions, complete
+
+def _as_integer(value):
+    """
+    This function turns a number written as text or as a float (example: "10" or 10.0) into an int
+
+    Returns:
+        The int, or the value itself if it is not a whole number
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+        return int(value.strip())
+
+    return value
+
+def repair_question(question, category):
+    """
+    This function fixes the small mistakes the model makes in a question, so one bad field does not
+    cost the whole question
+
+    The numbers written as text become numbers, a 'correctOption' given as a letter ("B") or as the text
+    of the answer becomes its index, the missing points, penalty, time limit, explanation and category
+    get a default, and the texts lose the spaces at the start and at the end
+
+    Args:
+        question: a question written by the model
+        category: the category for the questions without one (example: the topic)
+
+    Returns:
+        The repaired question, or None if it cannot be played (example: no question text or options)
+    """
+    if not isinstance(question, dict) or not isinstance(question.get("options"), list):
+        return None
+
+    # an option that is not a text cannot be dropped without moving the index of the right answer
+    if not all(isinstance(option, (str, int, float)) for option in question["options"]):
+        return None
+
+    repaired = dict(question)
+    options = [str(option).strip() for option in question["options"]]
+    repaired["options"] = options
+
+    for field in ("question", "explanation", "category"):
+        if isinstance(repaired.get(field), str):
+            repaired[field] = repaired[field].strip()
+
+    repaired.setdefault("explanation", "")
+
+    if not repaired.get("category"):
+        repaired["category"] = category
+
+    for field, default in (("points", DEFAULT_POINTS), ("penalty", DEFAULT_PENALTY), ("time_limit", DEFAULT_TIME_LIMIT)):
+        repaired[field] = _as_integer(repaired[field]) if field in repaired else default
+
+    correct_option = _as_integer(repaired.get("correctOption"))
+
+    if isinstance(correct_option, str):
+        answer = correct_option.strip()
+
+        if len(answer) == 1 and answer.isalpha() and ord(answer.upper()) - ord("A") < len(options):
+            correct_option = ord(answer.upper()) - ord("A")
+        elif answer in options:
+            correct_option = options.index(answer)
+
+    repaired["correctOption"] = correct_option
+    repaired["id"] = _as_integer(repaired.get("id", 0))
+
+    if validate_question(repaired, fail_fast=True):
+        return None
+
+    return repaired
+
+def _question_words(question):
+    """
+    This function gives back the set of the words of a question text, used to find near-duplicates
+    """
+    text = question["question"].casefold()
+
+    return frozenset(_WORD_PATTERN.findall(text)) or frozenset([text])
+
+def merge_questions(questions, limit=None):
+    """
+    This function merges the questions of all the requests: the near-duplicates are dropped (the
+    first one is kept) and the ids are renumbered from 0
+
+    Two questions are near-duplicates when their texts share at least DUPLICATE_SIMILARITY of their
+    words (Jaccard similarity). To avoid comparing every pair, the words of every question are sorted
+    from the rarest and only the first ones are indexed (prefix filtering): two questions that similar
+    always share one of those words, while the common words ("what", "is"...) are never looked up
+
+    Args:
+        questions: the questions, in order of preference
+        limit: the highest number of questions to keep (None for all)
+
+    Returns:
+        A tuple containing (merged_questions, duplicates_dropped)
+    """
+    question_words = [_question_words(question) for question in questions]
+    frequency = Counter(word for words in question_words for word in words)
+    merged = []
+    kept_words = []
+    prefix_index = {}
+    duplicates = 0
+
+    for question, words in zip(questions, question_words):
+        if limit is not None and len(merged) >= limit:
+            break
+
+        prefix_length = len(words) - math.ceil(DUPLICATE_SIMILARITY * len(words)) + 1
+        prefix = sorted(words, key=lambda word: (frequency[word], word))[:prefix_length]
+        candidates = set()
+
+        for word in prefix:
+            candidates.update(prefix_index.get(word, ()))
+
+        if any(len(words & kept_words[i]) / len(words | kept_words[i]) >= DUPLICATE_SIMILARITY for i in candidates):
+            duplicates += 1
+            continue
+
+        for word in prefix:
+            prefix_index.setdefault(word, []).append(len(kept_words))
+
+        kept_words.append(words)
+        merged.append(dict(question, id=len(merged)))
+
+    return merged, duplicates
+
+def _generate_shard(api_key, topic, question_count, subtopic, shard_number, use_cache):
+    """
+    This function asks the model for one part of a big quiz, inside a worker thread
+
+    The text of the model is salvaged question by question (see salvage_questions and repair_question)
+    and kept in the AI cache under the number of the shard: many shards send the same prompt, and each
+    one must keep its own answer, so asking again for the same part costs nothing
+
+    Returns:
+        A dictionary with "label" (the request and its subtopic), "questions" (the repaired ones), "fields",
+        "received", "repaired", "dropped", "complete", "error" and "seconds"
+    """
+    start_time = time.perf_counter()
+    label = f"request {shard_number + 1}" if subtopic is None else f"request {shard_number + 1} ({subtopic})"
+    result = {"label": label, "questions": [], "fields": {}, "received": 0, "repaired": 0, "dropped": 0, "complete": False, "error": None, "seconds": 0.0}
+    system_instruction, prompt, generation_config, payload = build_quiz_request(topic, question_count, subtopic)
+    cache_key = make_cache_key(MODEL_NAME, system_instruction, prompt, generation_config, variant=shard_number)
+    cached = load_cached_response(cache_key) if use_cache else None
+
+    try:
+        text = cached["raw"] if cached is not None else request_quiz_text(api_key, payload)
+    except (ValueError, ConnectionError) as e:
+        result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start_time
+        return result
+
+    fields, questions, complete = salvage_questions(text)
+
+    for question in questions:
+        repaired = repair_question(question, topic)
+
+        if repaired is None:
+            result["dropped"] += 1
+            continue
+
+        if repaired != question:
+            result["repaired"] += 1
+
+        result["questions"].append(repaired)
+
+    result.update(fields=fields, received=len(questions), complete=complete, seconds=time.perf_counter() - start_time)
+
+    if cached is None and result["questions"]:
+        try:
+            save_cached_response(cache_key, text, dict(fields, questions=result["questions"]))
+        except OSError:
+            pass
+
+    return result
+
+def run_sharded_generation(api_key, topic, question_count, concurrency=DEFAULT_CONCURRENCY, subtopics=None, use_cache=True):
+    """
+    This function generates a big quiz with many small requests sent at the same time
+
+    The questions are split into requests of SHARD_SIZE (one sub-topic each, when they are given),
+    every question is repaired or dropped on its own, the near-duplicates are removed and the ids are
+    renumbered. When some questions are still missing, new requests ask for them (up to MAX_ROUNDS)
+
+    Args:
+        api_key: The API key for the AI service
+        topic: The topic for the quiz to be generated
+        question_count: the number of questions of the quiz
+        concurrency: the highest number of requests sent at the same time
+        subtopics: the parts of the topic given to the requests in turn (None to split only by number)
+        use_cache: False to skip the AI response cache
+
+    Returns:
+        A tuple containing (quiz_data, report): the quiz (None if no question was generated) and a
+        dictionary with "requests", "failed", "received", "repaired", "dropped", "duplicates",
+        "questions" and "seconds"
+    """
+    start_time = time.perf_counter()
+    report = {"requests": 0, "failed": 0, "received": 0, "repaired": 0, "dropped": 0, "duplicates": 0, "questions": 0, "seconds": 0.0}
+    collected = []
+    difficulties = Counter()
+    merged = []
+    asked = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        for _ in range(MAX_ROUNDS):
+            missing = question_count - len(merged)
+
+            if missing <= 0:
+                break
+
+            # after the first round, ask for more than the missing questions (as many as the yield so far
+            # needs, and at least a whole request: a few questions alone are often all duplicates)
+            request_count = missing if asked == 0 else max(SHARD_SIZE, math.ceil(missing / max(0.25, len(merged) / asked)))
+            shards = plan_shards(request_count)
+            futures = []
+
+            for count in shards:
+                # the prompt has only what the user asked for, the shard number keeps the cache entries apart
+                shard_number = report["requests"] + len(futures)
+                subtopic = subtopics[shard_number % len(subtopics)] if subtopics else None
+                futures.append(executor.submit(_generate_shard, api_key, topic, count, subtopic, shard_number, use_cache))
+
+            report["requests"] += len(futures)
+            asked += request_count
+
+            for future in as_completed(futures):
+                result = future.result()
+
+                if result["error"] is not None:
+                    report["failed"] += 1
+                    print(color_red(f"[ERROR] '{result['label']}' failed after {result['seconds']:.1f}s: {result['error']}"))
+                    continue
+
+                message = f"'{result['label']}': {len(result['questions'])} questions in {result['seconds']:.1f}s ({result['repaired']} repaired, {result['dropped']} dropped)"
+                print(color_green(f"[SUCCESS] {message}") if result["complete"] else color_yellow(f"[WARN] {message}, the answer was cut off"))
+
+                for field in ("received", "repaired", "dropped"):
+                    report[field] += result[field]
+
+                if isinstance(result["fields"].get("difficulty"), str):
+                    difficulties[result["fields"]["difficulty"]] += 1
+
+            # merged in the order of the requests, so the same answers always give the same quiz
+            for future in futures:
+                collected.extend(future.result()["questions"])
+
+            merged, report["duplicates"] = merge_questions(collected, question_count)
+
+    report["questions"] = len(merged)
+    report["seconds"] = time.perf_counter() - start_time
+
+    if not merged:
+        return None, report
+
+    quiz_data = {
+        "title": f"{topic}: {len(merged)} questions",
+        "difficulty": difficulties.most_common(1)[0][0] if difficulties else "Medium",
+        "questions": merged
+    }
+
+    return quiz_data, report
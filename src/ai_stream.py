@@ -0,0 +1,207 @@
+import json
+from src.ai_cache import load_cached_response, make_cache_key, save_cached_response
+from src.ai_generator import MODEL_NAME, build_quiz_request, get_model_url
+from src.ai_transport import stream_post_json
+from src.colors import color_red
+from src.quiz_schema import validate_quiz
+from src.quiz_stream import QuestionSource, QuizStreamParser
+
+def iter_sse_texts(lines):
+    """
+    This function reads the server-sent events of 'streamGenerateContent' and gives back the pieces of
+    text written by the model, in order
+
+    Args:
+        lines: the lines of the answer (see stream_post_json)
+
+    Yields:
+        The pieces of the text of the first candidate
+
+    Raises:
+        ValueError: if an event is not valid JSON or the server sends an error
+    """
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+
+        data = line[5:].strip()
+
+        if not data or data == "[DONE]":
+            continue
+
+        try:
+            event = json.loads(data)
+        except ValueError as e:
+            raise ValueError(color_red(f"[ERROR] Invalid event from the AI service: {str(e)}")) from None
+
+        if "error" in event:
+            raise ValueError(color_red(f"[ERROR] The AI service stopped: {event['error'].get('message')}"))
+
+        for candidate in event.get("candidates", [])[:1]:
+            for part in candidate.get("content", {}).get("parts", []):
+                if part.get("text"):
+                    yield part["text"]
+
+class AIQuestionStream(QuestionSource):
+    """
+    The questions of a quiz that the AI model is still writing, given to run_quiz as soon as each of
+    them is complete (run_quiz plays a QuestionSource one question at a time)
+
+    The text goes through QuizStreamParser and every question is validated when its closing '}'
+    arrives: the invalid ones are skipped and counted in 'skipped'. The total ('count') is None until
+    the model is done. A network error in the middle ends the questions early and is kept in 'error'
+    """
+
+    def __init__(self, texts, cache_key=None):
+        super().__init__()
+        self.fields = {}
+        self._texts = iter(texts)
+        self._parser = QuizStreamParser()
+        self._pending = []
+        self._questions = []
+        self._raw_parts = []
+        self._cache_key = cache_key
+        self._complete = False
+
+    def _read_events(self):
+        """
+        This function reads the next piece of text and gives back its events
+
+        Returns:
+            The list of events, or None when the text is over
+        """
+        text = next(self._texts, None)
+
+        if text is None:
+            return None if self._parser.done else self._parser.close()
+
+        self._raw_parts.append(text)
+
+        return self._parser.feed(text)
+
+    def read_header(self):
+        """
+        This function waits for the title of the quiz (or for the first question, if the model writes
+        the title later), so the game can start
+
+        Raises:
+            ValueError: if the text is not a valid quiz JSON object
+            ConnectionError: if the connection fails
+        """
+        while "title" not in self.fields and not any(event[0] == "question" for event in self._pending):
+            events = self._read_events()
+
+            if events is None:
+                break
+
+            for event in events:
+                if event[0] == "field":
+                    self.fields[event[1]] = event[2]
+                else:
+                    self._pending.append(event)
+
+    def __iter__(self):
+        try:
+            while True:
+                events, self._pending = self._pending, []
+
+                for event in events:
+                    if event[0] == "field":
+                        self.fields[event[1]] = event[2]
+                        continue
+
+                    _, position, question, _, _ = event
+
+                    if self._accept(question, position):
+                        self._questions.append(question)
+                        yield question
+
+                if self._complete:
+                    break
+
+                events = self._read_events()
+
+                if events is None:
+                    self._finish()
+                else:
+                    self._pending = events
+        except (ValueError, ConnectionError) as e:
+            self.error = str(e)
+
+    def _finish(self):
+        """
+        This function marks the stream as complete and saves the whole quiz in the AI cache, if it is valid
+        """
+        self._complete = True
+        self.count = len(self._questions)
+        quiz_data = self.get_quiz_data()
+
+        if quiz_data is not None and self._cache_key is not None:
+            try:
+                save_cached_response(self._cache_key, "".join(self._raw_parts), quiz_data)
+            except OSError:
+                pass
+
+    def get_quiz_data(self):
+        """
+        This function gives back the quiz written by the model, with only the valid questions
+
+        Returns:
+            The quiz data as a dictionary, or None if the model did not finish it or it is not valid
+        """
+        if not self._complete or self.skipped:
+            return None
+
+        quiz_data = dict(self.fields)
+        quiz_data["questions"] = list(self._questions)
+
+        return quiz_data if not validate_quiz(quiz_data) else None
+
+def open_ai_quiz_stream(api_key, topic, use_cache=True):
+    """
+    This function starts the generation of a quiz with 'streamGenerateContent' and gives it back as
+    soon as its title arrived: the questions come while the quiz is played
+
+    A quiz already in the AI cache is streamed from the disk, and a quiz received whole is saved in the
+    cache (the request is the same of run_ai_quiz_generation, so they share the cache)
+
+    Args:
+        api_key: The API key for the AI service
+        topic: The topic for the quiz to be generated
+        use_cache: False to always call the AI service
+
+    Returns:
+        The quiz data as a dictionary, with "title", "difficulty" and "questions" (an AIQuestionStream)
+
+    Raises:
+        ValueError: if the server answers with an error or the text is not a quiz
+        ConnectionError: if a network related error occurs during the request
+    """
+    system_instruction, prompt, generation_config, payload = build_quiz_request(topic)
+    cache_key = make_cache_key(MODEL_NAME, system_instruction, prompt, generation_config)
+    cached = load_cached_response(cache_key) if use_cache else None
+
+    if cached is not None:
+        stream = AIQuestionStream([cached["raw"]])
+    else:
+        url = get_model_url("streamGenerateContent", api_key) + "&alt=sse"
+
+        try:
+            status_code, lines = stream_post_json(url, {"Content-Type": "application/json"}, payload)
+        except ConnectionError as e:
+            raise ConnectionError(color_red(f"[ERROR] Network/connection error: {str(e)}")) from e
+
+        if status_code in [401, 403]:
+            raise ValueError(color_red("[ERROR] Authentication failed. Please check your API key."))
+        elif status_code != 200:
+            raise ValueError(color_red(f"[ERROR] Error in AI service server. Status code: {status_code}. Message: {lines}"))
+
+        stream = AIQuestionStream(iter_sse_texts(lines), cache_key)
+
+    stream.read_header()
+
+    return {
+        "title": stream.fields.get("title") or topic,
+        "difficulty": stream.fields.get("difficulty", "Medium"),
+        "questions": stream
+    }
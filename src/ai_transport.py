@@ -0,0 +1,543 @@
+import http.client
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_TIMEOUT = 30 # seconds for one attempt
+DEFAULT_DEADLINE = 120 # seconds for a request, retries included
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 0.5 # seconds before the first retry, doubled at every retry
+BACKOFF_CAP = 16.0 # the longest wait between two attempts
+RETRY_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+BREAKER_THRESHOLD = 5 # failed requests in a row that open the circuit
+BREAKER_COOLDOWN = 30.0 # seconds the circuit stays open before a trial request
+POOL_SIZE = 8 # idle keep-alive connections kept for every server
+LATENCY_SAMPLES = 1000 # latencies kept for the percentiles of get_transport_stats
+
+_requests_module = None
+_requests_checked = False
+_session = None
+_session_lock = threading.Lock()
+
+class CircuitOpenError(ConnectionError):
+    """
+    The error raised without calling the server while its circuit is open (too many failed requests)
+    """
+
+def _get_requests():
+    """
+    This function imports the 'requests' package the first time it is needed
+
+    Returns:
+        The 'requests' module, or None if it is not installed
+    """
+    global _requests_module, _requests_checked
+
+    if not _requests_checked:
+        _requests_checked = True
+        try:
+            import requests
+            _requests_module = requests
+        except ImportError:
+            _requests_module = None
+
+    return _requests_module
+
+def _get_session(requests):
+    """
+    This function gives back the 'requests' session shared by all the threads, so the connections to
+    the AI service are kept alive and used again instead of being opened for every request
+
+    Args:
+        requests: the 'requests' module
+
+    Returns:
+        The shared requests.Session
+    """
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+
+    return _session
+
+class ConnectionPool:
+    """
+    A pool of keep-alive http.client connections, used when 'requests' is not installed
+
+    The idle connections are kept for every server (scheme, host and port) and given to the next
+    request to the same server, so the TCP and TLS handshakes happen only once
+    """
+
+    def __init__(self, max_idle=POOL_SIZE):
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def _take(self, scheme, netloc, timeout):
+        """
+        This function gives back an idle connection to the server, or a new one
+
+        Returns:
+            A tuple containing (connection, reused)
+        """
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+
+            if idle:
+                connection = idle.pop()
+                connection.timeout = timeout
+
+                if connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+
+                return connection, True
+
+        connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+
+        return connection_class(netloc, timeout=timeout), False
+
+    def _give_back(self, scheme, netloc, connection):
+        """
+        This function keeps a connection for the next request, or closes it if the pool is full
+        """
+        with self._lock:
+            idle = self._idle.setdefault((scheme, netloc), [])
+
+            if len(idle) < self.max_idle:
+                idle.append(connection)
+                return
+
+        connection.close()
+
+    def post(self, url, headers, body, timeout, stream=False):
+        """
+        This function sends an HTTP POST on a pooled connection
+
+        A kept connection may have been closed by the server in the meantime: in that case the request
+        is sent once more on a new connection
+
+        Returns:
+            A tuple containing (status_code, response_text, response_headers). With 'stream' and the
+            status code 200, response_text is an iterator over the lines of the answer instead
+
+        Raises:
+            OSError or http.client.HTTPException: if the request fails
+        """
+        parts = urlsplit(url)
+        path = parts.path + ("?" + parts.query if parts.query else "")
+
+        while True:
+            connection, reused = self._take(parts.scheme, parts.netloc, timeout)
+
+            try:
+                connection.request("POST", path, body=body, headers=headers)
+                response = connection.getresponse()
+
+                if stream and response.status == 200:
+                    return response.status, self._iter_lines(parts.scheme, parts.netloc, connection, response), response.headers
+
+                text = response.read().decode("utf-8", errors="replace")
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                connection.close()
+
+                if reused:
+                    continue
+
+                raise
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                raise
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._give_back(parts.scheme, parts.netloc, connection)
+
+            return response.status, text, response.headers
+
+    def _iter_lines(self, scheme, netloc, connection, response):
+        """
+        This function gives back the lines of a streamed answer as they arrive (without the line end).
+        The connection goes back to the pool only if the whole answer was read
+
+        Raises:
+            ConnectionError: if the connection fails in the middle of the answer
+        """
+        finished = False
+
+        try:
+            while True:
+                line = response.readline()
+
+                if not line:
+                    break
+
+                yield line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+            finished = True
+        except (http.client.HTTPException, OSError) as e:
+            raise ConnectionError(str(e)) from e
+        finally:
+            if finished and not response.will_close:
+                self._give_back(scheme, netloc, connection)
+            else:
+                connection.close()
+
+    def close(self):
+        """
+        This function closes every idle connection
+        """
+        with self._lock:
+            for idle in self._idle.values():
+                for connection in idle:
+                    connection.close()
+
+            self._idle.clear()
+
+_pool = ConnectionPool()
+
+class CircuitBreaker:
+    """
+    The health of one server: after 'threshold' failed requests in a row the circuit opens and the
+    requests fail at once, without waiting for the server. After 'cooldown' seconds one trial request
+    is let through: if it works the circuit closes again, otherwise it stays open for another cooldown
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        This function tells if a request can be sent now
+
+        Returns:
+            "closed" if the circuit is closed, "trial" if this is the trial request after the cooldown
+            (it must end with record_success, record_failure or end_trial), None if it cannot be sent
+        """
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+
+            if self._trial_running or time.monotonic() - self.opened_at < self.cooldown:
+                return None
+
+            self._trial_running = True
+
+            return "trial"
+
+    def end_trial(self):
+        """
+        This function lets another trial request through if the current one stopped without an answer
+        (example: an exception that is not a network error)
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        """
+        This function counts a failed request
+
+        Returns:
+            True if this failure opened the circuit
+        """
+        with self._lock:
+            self.failures += 1
+            was_closed = self.opened_at is None
+
+            if self._trial_running or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+            self._trial_running = False
+
+            return was_closed and self.opened_at is not None
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def _get_breaker(url):
+    """
+    This function gives back the circuit breaker of the server of a URL
+    """
+    parts = urlsplit(url)
+
+    with _breakers_lock:
+        return _breakers.setdefault((parts.scheme, parts.netloc), CircuitBreaker())
+
+_stats_lock = threading.Lock()
+_stats = {}
+_latencies = deque(maxlen=LATENCY_SAMPLES)
+
+def reset_transport_stats():
+    """
+    This function sets every counter of the transport back to zero
+    """
+    with _stats_lock:
+        _stats.update({
+            "requests": 0, # calls to post_json
+            "attempts": 0, # HTTP requests really sent
+            "retries": 0,
+            "failures": 0, # calls that ended with an error or an error status code
+            "circuit_opened": 0,
+            "short_circuited": 0, # calls refused because the circuit was open
+            "latency_total": 0.0 # seconds spent in the attempts
+        })
+        _latencies.clear()
+
+reset_transport_stats()
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+def get_transport_stats():
+    """
+    This function gives back the counters of the transport, to tune the retries and the timeouts
+
+    Returns:
+        A dictionary with "requests", "attempts", "retries", "failures", "circuit_opened",
+        "short_circuited", "latency_total" and the latency of the last attempts in seconds:
+        "latency_average", "latency_p50", "latency_p95" and "latency_max"
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+        latencies = sorted(_latencies)
+
+    if latencies:
+        stats["latency_average"] = sum(latencies) / len(latencies)
+        stats["latency_p50"] = latencies[len(latencies) // 2]
+        stats["latency_p95"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        stats["latency_max"] = latencies[-1]
+    else:
+        stats["latency_average"] = stats["latency_p50"] = stats["latency_p95"] = stats["latency_max"] = 0.0
+
+    return stats
+
+def _parse_retry_after(value):
+    """
+    This function reads the Retry-After header (seconds, or an HTTP date)
+
+    Returns:
+        The seconds to wait, or None if the header is missing or not valid
+    """
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+def get_backoff_delay(attempt, retry_after=None):
+    """
+    This function gives back the wait before the next attempt: exponential backoff with full jitter
+    (a random time up to BACKOFF_BASE * 2^attempt), but never less than the time asked by the server
+    with Retry-After
+
+    Args:
+        attempt: the number of the failed attempt (0 for the first one)
+        retry_after: the seconds asked by the server, or None
+
+    Returns:
+        The seconds to wait
+    """
+    delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+    # the server knows best: never retry earlier than it asked (the deadline decides if it is too late)
+    return delay if retry_after is None else max(retry_after, delay)
+
+def _iter_response_lines(requests, response):
+    """
+    This function gives back the lines of a streamed 'requests' answer as they arrive
+
+    Raises:
+        ConnectionError: if the connection fails in the middle of the answer
+    """
+    try:
+        for line in response.iter_lines():
+            yield line.decode("utf-8", errors="replace")
+    except requests.exceptions.RequestException as e:
+        raise ConnectionError(str(e)) from e
+    finally:
+        response.close()
+
+def _send_once(url, headers, body, timeout, stream=False):
+    """
+    This function sends one attempt, with 'requests' when it is installed and with the http.client
+    connection pool otherwise
+
+    Returns:
+        A tuple containing (status_code, response_text, response_headers). With 'stream' and the status
+        code 200, response_text is an iterator over the lines of the answer instead
+
+    Raises:
+        ConnectionError: if a network related error occurs during the request
+    """
+    requests = _get_requests()
+
+    if requests is not None:
+        try:
+            response = _get_session(requests).post(url, headers=headers, data=body, timeout=timeout, stream=stream)
+
+            if stream and response.status_code == 200:
+                return response.status_code, _iter_response_lines(requests, response), response.headers
+
+            return response.status_code, response.text, response.headers
+        except requests.exceptions.RequestException as e:
+            raise ConnectionError(str(e)) from e
+
+    try:
+        return _pool.post(url, headers, body, timeout, stream)
+    except (http.client.HTTPException, socket.timeout, OSError) as e:
+        raise ConnectionError(str(e)) from e
+
+def post_json(url, headers, payload, timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE):
+    """
+    This function sends a JSON payload with an HTTP POST and returns the answer of the server
+
+    The connections are pooled and kept alive. Network errors and the status codes in
+    RETRY_STATUS_CODES (429, 503, ...) are retried with exponential backoff and jitter, following the
+    Retry-After header when the server sends it, until MAX_ATTEMPTS or the deadline. While the server
+    keeps failing its circuit is open and the requests fail at once (see CircuitBreaker)
+
+    Args:
+        url: the endpoint to call
+        headers: a dictionary with the HTTP headers
+        payload: the data to send, encoded as JSON
+        timeout: the maximum number of seconds to wait for the server in one attempt
+        deadline: the maximum number of seconds for the whole request, retries included
+
+    Returns:
+        A tuple containing (status_code, response_text) of the last attempt
+
+    Raises:
+        CircuitOpenError: if the circuit of the server is open
+        ConnectionError: if a network related error occurs in the last attempt
+    """
+    return _request(url, headers, payload, timeout, deadline, stream=False)
+
+def stream_post_json(url, headers, payload, timeout=DEFAULT_TIMEOUT, deadline=DEFAULT_DEADLINE):
+    """
+    This function sends a JSON payload like post_json, but gives back the answer a line at a time
+    while the server is still writing it (example: the server-sent events of a streaming API)
+
+    The retries, the deadline and the circuit breaker work like in post_json until the server starts
+    answering; after that 'timeout' is the longest wait for the next piece of the answer
+
+    Args:
+        url: the endpoint to call
+        headers: a dictionary with the HTTP headers
+        payload: the data to send, encoded as JSON
+        timeout: the maximum number of seconds to wait for the server in one attempt
+        deadline: the maximum number of seconds to get the start of the answer, retries included
+
+    Returns:
+        A tuple containing (status_code, lines): with the status code 200 'lines' is an iterator over the
+        lines of the answer (it raises ConnectionError if the connection fails in the middle), otherwise
+        it is the text of the answer
+
+    Raises:
+        CircuitOpenError: if the circuit of the server is open
+        ConnectionError: if a network related error occurs in the last attempt
+    """
+    return _request(url, headers, payload, timeout, deadline, stream=True)
+
+def _request(url, headers, payload, timeout, deadline, stream):
+    """
+    This function sends a request with the retries, the deadline and the circuit breaker of post_json
+    """
+    _count("requests")
+    breaker = _get_breaker(url)
+    # encoded before asking the breaker, so a payload that cannot be sent never takes the trial request
+    body = json.dumps(payload).encode("utf-8")
+    permit = breaker.allow()
+
+    if not permit:
+        _count("short_circuited")
+        raise CircuitOpenError(f"The AI service is failing, requests are paused for up to {breaker.cooldown:.0f}s")
+
+    try:
+        return _send_with_retries(url, headers, body, timeout, deadline, stream, breaker)
+    finally:
+        # record_success and record_failure already ended the trial, unless something else stopped it
+        if permit == "trial":
+            breaker.end_trial()
+
+def _send_with_retries(url, headers, body, timeout, deadline, stream, breaker):
+    """
+    This function sends the attempts of a request until one is not retryable, MAX_ATTEMPTS or the
+    deadline, and tells the circuit breaker how it went
+    """
+    end_time = time.monotonic() + deadline
+    attempt = 0
+
+    while True:
+        remaining = end_time - time.monotonic()
+        start_time = time.perf_counter()
+        error = None
+        status_code = None
+
+        _count("attempts")
+
+        try:
+            status_code, response_text, response_headers = _send_once(url, headers, body, max(0.1, min(timeout, remaining)), stream)
+        except ConnectionError as e:
+            error = e
+
+        latency = time.perf_counter() - start_time
+
+        with _stats_lock:
+            _stats["latency_total"] += latency
+            _latencies.append(latency)
+
+        retryable = error is not None or status_code in RETRY_STATUS_CODES
+
+        if not retryable:
+            breaker.record_success()
+
+            if status_code >= 400:
+                _count("failures")
+
+            return status_code, response_text
+
+        delay = get_backoff_delay(attempt, None if error else _parse_retry_after(response_headers.get("Retry-After")))
+        attempt += 1
+
+        if attempt >= MAX_ATTEMPTS or time.monotonic() + delay >= end_time:
+            _count("failures")
+
+            if breaker.record_failure():
+                _count("circuit_opened")
+
+            if error is not None:
+                raise error
+
+            return status_code, response_text
+
+        _count("retries")
+        time.sleep(delay)
@@ -0,0 +1,144 @@
+from array import array
+from src.engine import RAPID_RESPONSE_BONUS, calculate_score
+
+_numpy_module = None
+_numpy_checked = False
+
+def _get_numpy():
+    """
+    this function imports NumPy the first time it is needed
+
+    returns:
+        module or None: the numpy module, or None if it is not installed
+    """
+    global _numpy_module, _numpy_checked
+
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = None
+
+    return _numpy_module
+
+def score_batch(base_points, time_taken, time_limit, correct, penalty, session_ids=None, with_messages=False, use_numpy=None):
+    """
+    this function scores many answers at once, with the same rules of calculate_score (correct answers)
+    and of the penalty branch of run_quiz (wrong answers)
+
+    the inputs are parallel arrays: the item number i of every array describes the same answer. the times
+    must already be rounded like run_quiz does (one decimal). a time limit of 0 means no limit
+
+    args:
+        base_points (sequence[int]): the points of the answered question
+        time_taken (sequence[float]): the time spent answering in seconds
+        time_limit (sequence[int]): the time limit of the question in seconds
+        correct (sequence[bool]): true if the answer was right
+        penalty (sequence[int]): the penalty of the question
+        session_ids (sequence[int] or None): the session of every answer, to get one total per session
+        with_messages (bool): if true the feedback message of calculate_score is built for every right answer
+        use_numpy (bool or None): true to use NumPy, false to use the 'array' module, None to use NumPy
+                                  only if it is installed
+
+    returns:
+        dict: "points" (the points change of every answer, an array), "total" (the sum of all the points),
+              "session_totals" (a dictionary session_id -> total, or None without session_ids) and
+              "messages" (a list with a message or None for every answer, or None without with_messages)
+    """
+    numpy = _get_numpy() if use_numpy is not False else None
+
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy is not installed")
+
+    if numpy is not None:
+        points = _score_with_numpy(numpy, base_points, time_taken, time_limit, correct, penalty)
+        total = int(points.sum())
+        session_totals = _session_totals_with_numpy(numpy, points, session_ids) if session_ids is not None else None
+    else:
+        points = _score_with_array(base_points, time_taken, time_limit, correct, penalty)
+        total = sum(points)
+        session_totals = _session_totals_with_array(points, session_ids) if session_ids is not None else None
+
+    messages = None
+
+    if with_messages:
+        messages = [
+            calculate_score(base_points[i], time_taken[i], time_limit[i])[1] if correct[i] else None
+            for i in range(len(points))
+        ]
+
+    return {"points": points, "total": total, "session_totals": session_totals, "messages": messages}
+
+def _score_with_array(base_points, time_taken, time_limit, correct, penalty):
+    """
+    this function scores the answers with a plain loop, storing the points in an 'array' of 64 bit integers
+
+    returns:
+        array: the points change of every answer
+    """
+    points = array("q", bytes(8 * len(base_points)))
+    bonus = RAPID_RESPONSE_BONUS
+
+    for i, (base, taken, limit, is_correct, wrong_penalty) in enumerate(zip(base_points, time_taken, time_limit, correct, penalty)):
+        if not is_correct:
+            points[i] = -wrong_penalty
+        elif not limit:
+            points[i] = base
+        elif taken > limit:
+            points[i] = 0
+        elif taken <= limit / 2:
+            points[i] = base + bonus
+        else:
+            points[i] = base
+
+    return points
+
+def _score_with_numpy(numpy, base_points, time_taken, time_limit, correct, penalty):
+    """
+    this function scores the answers with NumPy vector operations (no python loop)
+
+    returns:
+        numpy.ndarray: the points change of every answer
+    """
+    base_points = numpy.asarray(base_points, dtype=numpy.int64)
+    time_taken = numpy.asarray(time_taken, dtype=numpy.float64)
+    time_limit = numpy.asarray(time_limit, dtype=numpy.float64)
+    correct = numpy.asarray(correct, dtype=bool)
+    penalty = numpy.asarray(penalty, dtype=numpy.int64)
+
+    has_limit = time_limit != 0
+    too_slow = has_limit & (time_taken > time_limit)
+    rapid = has_limit & ~too_slow & (time_taken <= time_limit / 2)
+
+    correct_points = numpy.where(too_slow, 0, base_points + rapid * RAPID_RESPONSE_BONUS)
+
+    return numpy.where(correct, correct_points, -penalty)
+
+def _session_totals_with_array(points, session_ids):
+    """
+    this function sums the points of every session with a plain loop
+
+    returns:
+        dict: session_id -> total points
+    """
+    session_totals = {}
+
+    for session_id, answer_points in zip(session_ids, points):
+        session_totals[session_id] = session_totals.get(session_id, 0) + answer_points
+
+    return session_totals
+
+def _session_totals_with_numpy(numpy, points, session_ids):
+    """
+    this function sums the points of every session with NumPy
+
+    returns:
+        dict: session_id -> total points
+    """
+    unique_ids, positions = numpy.unique(numpy.asarray(session_ids), return_inverse=True)
+    totals = numpy.zeros(len(unique_ids), dtype=numpy.int64)
+    numpy.add.at(totals, positions, points)
+
+    return {session_id.item(): int(total) for session_id, total in zip(unique_ids, totals)}
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from src.catalog import add_catalog_entries, make_catalog_entry
+from src.colors import color_blue, color_green, color_red, color_yellow
+from src.file_utils import atomic_write_bytes
+from src.quiz_schema import format_error, validate_quiz
+from src import sqlite_backend
+
+def normalize_quiz(quiz_data):
+    """
+    this function gives back a clean copy of a valid quiz: the fields are always in the same order, the
+    texts have no spaces at the start or at the end and the fields the app does not know are dropped
+
+    args:
+        quiz_data (dict): a valid quiz
+
+    returns:
+        dict: the normalized quiz
+    """
+    return {
+        "title": quiz_data["title"].strip(),
+        "difficulty": quiz_data["difficulty"].strip(),
+        "questions": [
+            {
+                "id": question["id"],
+                "question": question["question"].strip(),
+                "category": question["category"].strip(),
+                "options": [option.strip() for option in question["options"]],
+                "correctOption": question["correctOption"],
+                "explanation": question["explanation"].strip(),
+                "points": question["points"],
+                "penalty": question["penalty"],
+                "time_limit": question["time_limit"]
+            }
+            for question in quiz_data["questions"]
+        ]
+    }
+
+def import_quiz_file(source_path, destination_directory, write_file=True):
+    """
+    this function validates, normalizes and saves one quiz file (it runs inside a worker process)
+
+    the quiz is checked with the same rules of is_valid_quiz. with 'write_file' it is written into the
+    destination folder (atomically, with the same name) and its catalog entry is built right away,
+    otherwise the normalized quiz is given back so the main process can save it (example: into SQLite)
+
+    args:
+        source_path (str): the quiz file to import
+        destination_directory (str): the quiz folder (example: "data")
+        write_file (bool): true to write the quiz file, false to give back the quiz
+
+    returns:
+        dict: "source", "filename", "questions" (how many), "errors" (list of messages, empty if the quiz
+              was imported), "catalog_entry" and "quiz" (only one of the two, as asked by 'write_file')
+    """
+    filename = os.path.basename(source_path)
+    result = {"source": source_path, "filename": filename, "questions": 0, "errors": [], "catalog_entry": None, "quiz": None}
+
+    try:
+        with open(source_path, "rb") as f:
+            data = json.loads(f.read())
+    except OSError as e:
+        result["errors"].append(f"cannot read the file: {e}")
+        return result
+    except ValueError as e:
+        result["errors"].append(f"not valid JSON: {e}")
+        return result
+
+    errors = validate_quiz(data)
+
+    if errors:
+        result["errors"] = [format_error(error) for error in errors]
+        return result
+
+    quiz_data = normalize_quiz(data)
+    result["questions"] = len(quiz_data["questions"])
+
+    if not write_file:
+        result["quiz"] = quiz_data
+        return result
+
+    destination_path = os.path.join(destination_directory, filename)
+    raw_content = json.dumps(quiz_data, indent=4).encode("utf-8")
+
+    try:
+        atomic_write_bytes(destination_path, raw_content)
+        file_stat = os.stat(destination_path)
+    except OSError as e:
+        result["errors"].append(f"cannot write {destination_path}: {e}")
+        return result
+
+    result["catalog_entry"] = make_catalog_entry(file_stat, hashlib.sha256(raw_content).hexdigest(), quiz_data)
+
+    return result
+
+def _import_quiz_files(arguments):
+    """
+    this function unpacks the arguments of import_quiz_file (executor.map passes a single value)
+    """
+    return import_quiz_file(*arguments)
+
+def list_quiz_sources(source_directory):
+    """
+    this function lists the JSON files of a folder, sorted by name (the leaderboard is skipped)
+
+    args:
+        source_directory (str): the folder to import
+
+    returns:
+        list[str]: the paths of the files
+    """
+    with os.scandir(source_directory) as entries:
+        return sorted(entry.path for entry in entries if entry.is_file() and entry.name.endswith(".json") and entry.name != "leaderboard.json")
+
+def import_quiz_directory(source_directory, destination_directory="data", workers=None):
+    """
+    this function imports every quiz file of a folder in parallel (ProcessPoolExecutor) and prints the
+    errors of every file and a summary with the throughput
+
+    the files are validated, normalized and written by the worker processes. the main process only
+    collects the results, adds the new quizzes to the catalog (so they are not parsed again when the app
+    starts) and, with the SQLite backend, saves them into the database
+
+    args:
+        source_directory (str): the folder with the quiz files to import
+        destination_directory (str): the quiz folder of the app
+        workers (int or None): the number of worker processes (None for one per CPU)
+
+    returns:
+        dict: the summary: "files", "imported", "failed", "questions", "seconds", "files_per_second" and
+              "questions_per_second"
+    """
+    start_time = time.perf_counter()
+    sources = list_quiz_sources(source_directory)
+    use_database = sqlite_backend.is_enabled()
+    os.makedirs(destination_directory, exist_ok=True)
+
+    imported = 0
+    failed = 0
+    questions = 0
+    catalog_entries = {}
+
+    print(color_blue(f"Importing {len(sources)} quiz files from {source_directory}..."))
+
+    if sources:
+        worker_count = workers or os.cpu_count() or 1
+        # big chunks keep the cost of sending the work to the processes low with thousands of small files
+        chunk_size = max(1, len(sources) // (worker_count * 8))
+        work = ((source, destination_directory, not use_database) for source in sources)
+
+        with ProcessPoolExecutor(max_workers=worker_count) as executor:
+            for result in executor.map(_import_quiz_files, work, chunksize=chunk_size):
+                if result["errors"]:
+                    failed += 1
+                    print(color_red(f"[ERROR] {result['source']}:"))
+
+                    for message in result["errors"]:
+                        print(f"    {message}")
+
+                    continue
+
+                if use_database:
+                    sqlite_backend.save_quiz(result["filename"], result["quiz"])
+                else:
+                    catalog_entries[result["filename"]] = result["catalog_entry"]
+
+                imported += 1
+                questions += result["questions"]
+
+    if catalog_entries:
+        add_catalog_entries(destination_directory, catalog_entries)
+
+    elapsed = time.perf_counter() - start_time
+    summary = {
+        "files": len(sources),
+        "imported": imported,
+        "failed": failed,
+        "questions": questions,
+        "seconds": elapsed,
+        "files_per_second": len(sources) / elapsed if elapsed else 0.0,
+        "questions_per_second": questions / elapsed if elapsed else 0.0
+    }
+
+    color = color_green if failed == 0 else color_yellow
+    print(color(f"\nImported {imported} of {len(sources)} files ({failed} with errors), {questions} questions in {elapsed:.2f}s"))
+    print(f"Throughput: {summary['files_per_second']:.1f} files/s, {summary['questions_per_second']:.1f} questions/s")
+
+    return summary
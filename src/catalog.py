@@ -0,0 +1,383 @@
+import hashlib
+import json
+import os
+from src.file_utils import atomic_write_json
+from src.quiz_schema import validate_question
+from src.quiz_stream import LARGE_QUIZ_SIZE, iter_quiz_events
+from src.watcher import open_watcher
+
+CATALOG_FILENAME = ".catalog"
+CATALOG_VERSION = 2
+
+_catalog_cache = {} # catalog path -> (mtime_ns, size, entries) of the last catalog read or written
+
+def _get_catalog_path(directory):
+    """
+    this function gives back the path of the catalog index file inside a quiz folder
+
+    args:
+        directory (str): the folder that holds the quiz files (example: "data")
+
+    returns:
+        str: the path of the catalog file (example: "data/.catalog")
+    """
+    return os.path.join(directory, CATALOG_FILENAME)
+
+def load_catalog(directory):
+    """
+    this function loads the catalog index saved inside the quiz folder
+
+    if the file is missing, broken, or was written by an older catalog version, an empty catalog is
+    returned so that every quiz file gets parsed again. the entries stay in memory and the file is
+    parsed again only when it changes
+
+    args:
+        directory (str): the folder that holds the quiz files
+
+    returns:
+        dict: a dictionary that maps every filename to its catalog entry
+    """
+    catalog_path = _get_catalog_path(directory)
+
+    try:
+        catalog_stat = os.stat(catalog_path)
+    except OSError:
+        return {}
+
+    cached = _catalog_cache.get(catalog_path)
+
+    if cached is not None and cached[0] == catalog_stat.st_mtime_ns and cached[1] == catalog_stat.st_size:
+        # the file did not change since it was last read or written: no need to parse it again
+        return cached[2]
+
+    try:
+        with open(catalog_path, "r", encoding="utf-8") as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(catalog, dict) or catalog.get("version") != CATALOG_VERSION:
+        return {}
+
+    entries = catalog.get("entries")
+
+    if not isinstance(entries, dict):
+        return {}
+
+    _catalog_cache[catalog_path] = (catalog_stat.st_mtime_ns, catalog_stat.st_size, entries)
+
+    return entries
+
+def save_catalog(directory, entries):
+    """
+    this function writes the catalog index inside the quiz folder
+
+    the index is written atomically, so a reader never sees a half written catalog
+
+    args:
+        directory (str): the folder that holds the quiz files
+        entries (dict): a dictionary that maps every filename to its catalog entry
+    """
+    catalog_path = _get_catalog_path(directory)
+
+    try:
+        atomic_write_json(catalog_path, {"version": CATALOG_VERSION, "entries": entries})
+        catalog_stat = os.stat(catalog_path)
+    except OSError:
+        # the catalog is only a cache: if it cannot be written the next refresh simply parses again
+        _catalog_cache.pop(catalog_path, None)
+        return
+
+    _catalog_cache[catalog_path] = (catalog_stat.st_mtime_ns, catalog_stat.st_size, entries)
+
+def make_catalog_entry(file_stat, content_hash, quiz_data=None):
+    """
+    this function builds the catalog entry of a quiz file
+
+    args:
+        file_stat (os.stat_result): the stat result of the quiz file
+        content_hash (str): the sha256 hash of the raw content
+        quiz_data (dict or None): the quiz, already checked to be valid (None for an invalid file)
+
+    returns:
+        dict: the catalog entry with title, difficulty, question count and validity
+    """
+    entry = {
+        "mtime_ns": file_stat.st_mtime_ns,
+        "size": file_stat.st_size,
+        "sha256": content_hash,
+        "valid": quiz_data is not None,
+        "title": None,
+        "difficulty": None,
+        "question_count": 0
+    }
+
+    if quiz_data is not None:
+        entry["title"] = quiz_data["title"]
+        entry["difficulty"] = quiz_data["difficulty"]
+        entry["question_count"] = len(quiz_data["questions"])
+
+    return entry
+
+def _build_catalog_entry(raw_content, file_stat, content_hash, validator):
+    """
+    this function parses the content of a quiz file and builds its catalog entry
+
+    args:
+        raw_content (bytes): the raw content of the quiz file
+        file_stat (os.stat_result): the stat result of the quiz file
+        content_hash (str): the sha256 hash of the raw content
+        validator (callable): the function used to check the quiz structure (example: is_valid_quiz)
+
+    returns:
+        dict: the catalog entry with title, difficulty, question count and validity
+    """
+    try:
+        data = json.loads(raw_content)
+    except ValueError:
+        data = None
+
+    return make_catalog_entry(file_stat, content_hash, data if validator(data) else None)
+
+def _build_streamed_catalog_entry(file_path, file_stat, content_hash):
+    """
+    this function builds the catalog entry of a large quiz file, reading it a piece at a time
+
+    the questions are checked one by one with validate_question and never kept together in memory, the
+    rest of the file follows the same rules as QUIZ_SCHEMA (text title and difficulty, at least one question)
+
+    args:
+        file_path (str): the path of the quiz file
+        file_stat (os.stat_result): the stat result of the quiz file
+        content_hash (str): the sha256 hash of the raw content
+
+    returns:
+        dict: the catalog entry with title, difficulty, question count and validity
+    """
+    entry = make_catalog_entry(file_stat, content_hash)
+    fields = {}
+    question_count = 0
+
+    try:
+        for event in iter_quiz_events(file_path):
+            if event[0] == "field":
+                fields[event[1]] = event[2]
+            elif validate_question(event[2], fail_fast=True):
+                return entry
+            else:
+                question_count += 1
+    except (OSError, ValueError):
+        return entry
+
+    # a "questions" field event means the questions are not a list
+    if question_count and "questions" not in fields and isinstance(fields.get("title"), str) and isinstance(fields.get("difficulty"), str):
+        entry.update(valid=True, title=fields["title"], difficulty=fields["difficulty"], question_count=question_count)
+
+    return entry
+
+def add_catalog_entries(directory, entries):
+    """
+    this function adds entries to the saved catalog (example: the quizzes just written by an import, so
+    they are not parsed again the next time the folder is read)
+
+    args:
+        directory (str): the folder that holds the quiz files
+        entries (dict): filename -> catalog entry
+    """
+    if not entries:
+        return
+
+    new_entries = dict(load_catalog(directory))
+    new_entries.update(entries)
+    save_catalog(directory, new_entries)
+
+def _update_catalog_entry(file_path, file_stat, entry, validator):
+    """
+    this function brings the catalog entry of one quiz file up to date
+
+    the file is parsed and validated again only if it changed: a file whose mtime and size did not change
+    is trusted as it is, and a file that was touched but has the same content hash keeps its old entry.
+    a file bigger than LARGE_QUIZ_SIZE is hashed and parsed a piece at a time, never read whole
+
+    args:
+        file_path (str): the path of the quiz file
+        file_stat (os.stat_result): the stat result of the quiz file
+        entry (dict or None): its old catalog entry (None for a new file)
+        validator (callable): the function used to check the quiz structure (example: is_valid_quiz)
+
+    returns:
+        tuple[dict or None, bool]: the entry (None if the file cannot be read) and true if it changed
+    """
+    if entry is not None and entry.get("mtime_ns") == file_stat.st_mtime_ns and entry.get("size") == file_stat.st_size:
+        return entry, False
+
+    raw_content = None
+
+    try:
+        with open(file_path, "rb") as f:
+            if file_stat.st_size > LARGE_QUIZ_SIZE:
+                content_hash = hashlib.file_digest(f, "sha256").hexdigest()
+            else:
+                raw_content = f.read()
+                content_hash = hashlib.sha256(raw_content).hexdigest()
+    except OSError:
+        return None, False
+
+    if entry is not None and entry.get("sha256") == content_hash:
+        # only the timestamp changed, the parsed data is still good
+        entry["mtime_ns"] = file_stat.st_mtime_ns
+        entry["size"] = file_stat.st_size
+        return entry, True
+
+    if raw_content is None:
+        return _build_streamed_catalog_entry(file_path, file_stat, content_hash), True
+
+    return _build_catalog_entry(raw_content, file_stat, content_hash, validator), True
+
+def iter_catalog(directory, validator):
+    """
+    this function goes through the JSON files inside the quiz folder and gives back their catalog entries
+    one at a time, while the folder is being read
+
+    only new or changed files are parsed and validated again (see _update_catalog_entry). the caller can
+    stop early (example: a menu that shows only the first page): the catalog is saved again, without the
+    entries of deleted files, only when the whole folder was read
+
+    args:
+        directory (str): the folder that holds the quiz files
+        validator (callable): the function used to check the quiz structure (example: is_valid_quiz)
+
+    yields:
+        tuple[str, dict]: the filename and its catalog entry, in directory listing order
+    """
+    old_entries = load_catalog(directory)
+    new_entries = {}
+    changed = False
+
+    with os.scandir(directory) as directory_entries:
+        for directory_entry in directory_entries:
+            filename = directory_entry.name
+
+            if not filename.endswith(".json") or filename == "leaderboard.json":
+                continue
+
+            try:
+                file_stat = directory_entry.stat()
+            except OSError:
+                continue
+
+            entry, entry_changed = _update_catalog_entry(directory_entry.path, file_stat, old_entries.get(filename), validator)
+
+            if entry is None:
+                continue
+
+            changed = changed or entry_changed
+            new_entries[filename] = entry
+            yield filename, entry
+
+    if changed or old_entries.keys() != new_entries.keys():
+        save_catalog(directory, new_entries)
+
+def apply_catalog_events(directory, entries, events, validator):
+    """
+    this function updates a catalog with the changes found by a watcher (see src/watcher.py), without
+    reading the whole folder again: only the files named in the events are looked at
+
+    args:
+        directory (str): the folder that holds the quiz files
+        entries (dict): the catalog to update (it is not modified)
+        events (list[tuple[str, str]]): ("changed", filename) or ("deleted", filename) events
+        validator (callable): the function used to check the quiz structure (example: is_valid_quiz)
+
+    returns:
+        tuple[dict, bool]: the updated catalog and true if something changed
+    """
+    new_entries = dict(entries)
+    changed = False
+
+    for kind, filename in events:
+        file_path = os.path.join(directory, filename)
+
+        try:
+            file_stat = os.stat(file_path) if kind != "deleted" else None
+        except OSError:
+            file_stat = None
+
+        entry = None
+
+        if file_stat is not None:
+            entry, entry_changed = _update_catalog_entry(file_path, file_stat, new_entries.get(filename), validator)
+            changed = changed or entry_changed
+
+        if entry is not None:
+            new_entries[filename] = entry
+        elif new_entries.pop(filename, None) is not None:
+            changed = True
+
+    return new_entries, changed
+
+def refresh_catalog(directory, validator):
+    """
+    this function brings the catalog index up to date with the JSON files inside the quiz folder (see
+    iter_catalog)
+
+    args:
+        directory (str): the folder that holds the quiz files
+        validator (callable): the function used to check the quiz structure (example: is_valid_quiz)
+
+    returns:
+        dict: a dictionary that maps every quiz filename (in directory listing order) to its catalog entry
+    """
+    return dict(iter_catalog(directory, validator))
+
+class WatchedCatalog:
+    """
+    the catalog of a quiz folder kept up to date by a watcher (see src/watcher.py)
+
+    the folder is read once when the watch starts, then only the files reported by the watcher are looked
+    at. the catalog stays in memory and is written to the disk by save() (or close()), not at every change
+    """
+
+    def __init__(self, directory, validator, watcher=None):
+        self.directory = directory
+        self.validator = validator
+        # the watcher starts before the scan, so a file that changes during the scan is not missed
+        self.watcher = watcher if watcher is not None else open_watcher(directory)
+        self._entries = refresh_catalog(directory, validator)
+        self._unsaved = False
+
+    def refresh(self):
+        """
+        this function applies the changes reported by the watcher since the last call
+
+        returns:
+            dict: a dictionary that maps every quiz filename to its catalog entry
+        """
+        events = self.watcher.poll()
+
+        if any(kind == "rescan" for kind, _ in events):
+            # some changes were lost (or the folder was replaced): watch it again and read it all once
+            self.watcher.close()
+            self.watcher = open_watcher(self.directory)
+            self._entries = refresh_catalog(self.directory, self.validator)
+            self._unsaved = False
+        elif events:
+            self._entries, changed = apply_catalog_events(self.directory, self._entries, events, self.validator)
+            self._unsaved = self._unsaved or changed
+
+        return self._entries
+
+    def save(self):
+        """
+        this function writes the catalog to the disk, if it changed since it was last written
+        """
+        if self._unsaved:
+            save_catalog(self.directory, self._entries)
+            self._unsaved = False
+
+    def close(self):
+        """
+        this function writes the catalog and stops the watcher
+        """
+        self.save()
+        self.watcher.close()
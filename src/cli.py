@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from src.colors import color_blue, color_red, color_yellow
+from src.data_manager import is_valid_quiz, iter_quiz_entries, load_quiz_data
+from src.quiz_schema import format_error, validate_quiz
+
+API_KEY_ENV_VARIABLE = "GEMINI_API_KEY" # read by 'generate' when --api-key is not given
+DEFAULT_ANSWER_TIME = 1.0 # seconds, for the answers of an answers file that have no time
+
+def build_parser():
+    """
+    this function describes the command line of the program
+
+    returns:
+        argparse.ArgumentParser: the parser ("command" is None when no command is given)
+    """
+    parser = argparse.ArgumentParser(prog="main.py", description="Quiz Engine: without a command the interactive menu starts.")
+    commands = parser.add_subparsers(dest="command")
+
+    play_parser = commands.add_parser("play", help="play a quiz with the answers read from a file")
+    play_parser.add_argument("--quiz", required=True, help="the quiz file in 'data/' (example: python_basics.json)")
+    play_parser.add_argument("--answers-file", required=True, help="one answer per line, in the order of the quiz ('B' or 'B 3.5' with the seconds taken), '-' for the standard input")
+    play_parser.add_argument("--username", default=None, help="save the score on the leaderboard with this name")
+
+    commands.add_parser("list", help="list the valid quizzes")
+
+    leaderboard_parser = commands.add_parser("leaderboard", help="show the best scores of a quiz")
+    leaderboard_parser.add_argument("--quiz", required=True, help="the title of the quiz")
+    leaderboard_parser.add_argument("--limit", type=int, default=10, help="number of scores to show")
+
+    create_parser = commands.add_parser("create", help="save a new quiz from a JSON file")
+    create_parser.add_argument("--from-json", required=True, help="the JSON file with the quiz")
+
+    generate_parser = commands.add_parser("generate", help="generate quizzes with the AI service and save them")
+    generate_parser.add_argument("--topic", action="append", default=[], help="the topic of a quiz (it can be repeated)")
+    generate_parser.add_argument("--topics-file", default=None, help="a file with one topic per line")
+    generate_parser.add_argument("--concurrency", type=int, default=None, help="requests sent at the same time (default: 4)")
+    generate_parser.add_argument("--api-key", default=None, help=f"the API key of the AI service (default: ${API_KEY_ENV_VARIABLE})")
+    generate_parser.add_argument("--no-cache", action="store_true", help="always call the AI service, even for a request already answered")
+    generate_parser.add_argument("--questions", type=int, default=None, help="questions of every quiz (default: 12, more are asked with many requests at the same time)")
+    generate_parser.add_argument("--subtopic", action="append", default=[], help="a part of the topic for the requests of a big quiz (it can be repeated)")
+
+    import_parser = commands.add_parser("import", help="validate, normalize and copy every quiz file of a folder into 'data/'")
+    import_parser.add_argument("directory", help="the folder with the quiz files")
+    import_parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+
+    return parser
+
+def parse_arguments(argv=None):
+    """
+    this function reads the command line
+
+    args:
+        argv (list[str] or None): the arguments (None for the ones of the program)
+
+    returns:
+        argparse.Namespace: the parsed arguments ("command" is None for the interactive menu)
+    """
+    return build_parser().parse_args(argv)
+
+def read_answers_file(path):
+    """
+    this function reads the answers of a scripted game
+
+    every line has an answer (a letter like 'B', or the index of the option) and optionally the seconds
+    taken to answer. empty lines and lines starting with '#' are skipped
+
+    args:
+        path (str): the file to read ('-' for the standard input)
+
+    returns:
+        tuple[list[str], list[float]]: the answers and the time taken for every answer
+
+    raises:
+        ValueError: if a time is not a number
+    """
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+
+    answers = []
+    response_times = []
+
+    for line_number, line in enumerate(lines, 1):
+        parts = line.split()
+
+        if not parts or parts[0].startswith("#"):
+            continue
+
+        answer = parts[0]
+        answers.append(int(answer) if answer.isdigit() else answer)
+
+        try:
+            response_times.append(float(parts[1]) if len(parts) > 1 else DEFAULT_ANSWER_TIME)
+        except ValueError:
+            raise ValueError(f"line {line_number}: '{parts[1]}' is not a number of seconds")
+
+    return answers, response_times
+
+def command_play(arguments):
+    """
+    this function plays a quiz with the answers of a file, in the order of the quiz, and prints the results
+
+    the scoring rules are the ones of the interactive game, but the screen is never cleared and nothing
+    is asked. the score is saved only when a username is given
+    """
+    # imported only here, the other commands do not need the game code
+    from src.simulation import make_scripted_answer_source, simulate_session
+    from src.storage import record_score
+
+    filename = arguments.quiz if arguments.quiz.endswith(".json") else arguments.quiz + ".json"
+
+    try:
+        quiz_data = load_quiz_data(filename, use_pack=True)
+        answers, response_times = read_answers_file(arguments.answers_file)
+    except (OSError, ValueError) as e:
+        print(color_red(f"[ERROR] {e}"))
+        return 1
+
+    if isinstance(quiz_data["questions"], list) and not is_valid_quiz(quiz_data):
+        print(color_red(f"[ERROR] {filename} is not a valid quiz."))
+        return 1
+
+    match_status = simulate_session(quiz_data, make_scripted_answer_source(answers, response_times))
+    total_questions = match_status["total_questions"]
+
+    print(f"Quiz: {quiz_data['title']}")
+    print(f"- Total Score: {match_status['score']}")
+    print(f"- Correct Answers: {match_status['correct_answers']}/{total_questions}")
+    print(f"- Incorrect Answers: {match_status['incorrect_answers']}/{total_questions}")
+
+    if len(answers) != total_questions:
+        print(color_yellow(f"[WARN] {len(answers)} answers for {total_questions} questions."))
+
+    if arguments.username:
+        score_record = {
+            "username": arguments.username,
+            "score": match_status["score"],
+            "quiz_name": quiz_data["title"],
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+        if not record_score(score_record):
+            return 1
+
+    return 0
+
+def command_list(arguments):
+    """
+    this function prints the valid quizzes, one per line: filename, title, difficulty and questions
+    """
+    for filename, entry in iter_quiz_entries():
+        print(f"{filename}\t{entry['title']}\t{entry['difficulty']}\t{entry['question_count']}")
+
+    return 0
+
+def command_leaderboard(arguments):
+    """
+    this function prints the best scores of a quiz, one per line
+    """
+    from src.storage import load_top_scores
+
+    top_scores = load_top_scores(arguments.quiz, arguments.limit)
+
+    if not top_scores:
+        print(f"No results found on the Leaderboard.")
+
+    for index, record in enumerate(top_scores):
+        print(f"{index + 1}\t{record['username']}\t{record['score']}\t{record['date']}")
+
+    return 0
+
+def command_create(arguments):
+    """
+    this function checks a quiz written in a JSON file and saves it like the quiz creator does
+    """
+    from src.creator import save_quiz_to_file
+
+    try:
+        with open(arguments.from_json, "r", encoding="utf-8") as f:
+            quiz_data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(color_red(f"[ERROR] Could not read {arguments.from_json}: {e}"))
+        return 1
+
+    errors = validate_quiz(quiz_data)
+
+    if errors:
+        print(color_red(f"[ERROR] {arguments.from_json} is not a valid quiz:"))
+
+        for error in errors:
+            print(f"    {format_error(error)}")
+
+        return 1
+
+    return 0 if save_quiz_to_file(quiz_data) is not None else 1
+
+def command_generate(arguments):
+    """
+    this function generates one quiz for every topic with the AI service and saves them, without asking
+    anything. the topics are generated at the same time (see run_batch_generation), while the quizzes with
+    more questions than one request can give are generated one at a time, each with many requests at the
+    same time (see run_sharded_generation)
+    """
+    topics = list(arguments.topic)
+
+    if arguments.topics_file:
+        try:
+            with open(arguments.topics_file, "r", encoding="utf-8") as f:
+                topics.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+        except OSError as e:
+            print(color_red(f"[ERROR] Could not read {arguments.topics_file}: {e}"))
+            return 1
+
+    if not topics:
+        print(color_red(f"[ERROR] No topics: use --topic or --topics-file."))
+        return 1
+
+    api_key = arguments.api_key or os.environ.get(API_KEY_ENV_VARIABLE)
+
+    if not api_key:
+        print(color_red(f"[ERROR] No API key: use --api-key or set {API_KEY_ENV_VARIABLE}."))
+        return 1
+
+    # imported only here, so the network code is loaded only when it is needed
+    from src.ai_generator import DEFAULT_CONCURRENCY, DEFAULT_QUESTION_COUNT, run_batch_generation
+    from src.ai_transport import get_transport_stats
+    from src.creator import save_quiz_to_file
+
+    concurrency = arguments.concurrency or DEFAULT_CONCURRENCY
+    question_count = arguments.questions or DEFAULT_QUESTION_COUNT
+    start_time = time.perf_counter()
+
+    if question_count != DEFAULT_QUESTION_COUNT or arguments.subtopic:
+        from src.ai_shards import run_sharded_generation
+
+        saved = 0
+
+        for topic in topics:
+            print(color_blue(f"Generating '{topic}' with {question_count} questions, {concurrency} requests at a time..."))
+            quiz_data, report = run_sharded_generation(api_key, topic, question_count, concurrency, arguments.subtopic, not arguments.no_cache)
+            print(f"{report['questions']} of {question_count} questions from {report['requests']} requests ({report['failed']} failed): {report['repaired']} repaired, {report['dropped']} dropped, {report['duplicates']} duplicates removed")
+
+            if quiz_data is not None and save_quiz_to_file(quiz_data) is not None:
+                saved += 1
+
+        print(f"\nSaved {saved} of {len(topics)} quizzes in {time.perf_counter() - start_time:.1f}s")
+    else:
+        print(color_blue(f"Generating {len(topics)} quizzes, {concurrency} at a time..."))
+
+        results = run_batch_generation(api_key, topics, concurrency, save_quiz_to_file, not arguments.no_cache)
+        elapsed = time.perf_counter() - start_time
+
+        saved = sum(1 for result in results if result["saved_path"] is not None)
+        print(f"\nSaved {saved} of {len(topics)} quizzes in {elapsed:.1f}s (the requests took {sum(result['seconds'] for result in results):.1f}s in total)")
+
+    stats = get_transport_stats()
+
+    if stats["attempts"]:
+        print(f"HTTP: {stats['attempts']} requests, {stats['retries']} retries, {stats['failures']} failed, latency p50 {stats['latency_p50']:.1f}s p95 {stats['latency_p95']:.1f}s")
+
+    return 0 if saved == len(topics) else 1
+
+def command_import(arguments):
+    """
+    this function imports a folder of quiz files (see src/bulk_import.py)
+    """
+    # imported only here, so the other commands do not load the multiprocessing code
+    from src.bulk_import import import_quiz_directory
+
+    try:
+        summary = import_quiz_directory(arguments.directory, workers=arguments.workers)
+    except OSError as e:
+        print(color_red(f"[ERROR] Cannot import from {arguments.directory}: {e}"))
+        return 1
+
+    return 0 if summary["failed"] == 0 else 1
+
+COMMANDS = {
+    "play": command_play,
+    "list": command_list,
+    "leaderboard": command_leaderboard,
+    "create": command_create,
+    "generate": command_generate,
+    "import": command_import
+}
+
+def run_command(arguments):
+    """
+    this function runs the command of the command line
+
+    args:
+        arguments (argparse.Namespace): the parsed arguments, with a command
+
+    returns:
+        int: the exit code (0 if everything went fine)
+    """
+    return COMMANDS[arguments.command](arguments)
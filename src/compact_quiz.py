@@ -0,0 +1,230 @@
+import sys
+from array import array
+from collections.abc import Mapping, Sequence
+
+# the keys of a question, in the order they are written by the quiz creator
+QUESTION_KEYS = ("id", "question", "category", "options", "correctOption", "explanation", "points", "penalty", "time_limit")
+
+class CompactQuestion(Mapping):
+    """
+    a read-only view over one question of a CompactQuestionBank
+
+    it behaves like the question dictionary (question["points"], question.get("time_limit", 0),
+    "options" in question...), but the values are read from the columns of the bank only when asked
+    """
+    __slots__ = ("_bank", "_index")
+
+    def __init__(self, bank, index):
+        self._bank = bank
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._bank._get_value(self._index, key)
+
+    def __iter__(self):
+        yield from QUESTION_KEYS
+        yield from self._bank._extras.get(self._index, ())
+
+    def __len__(self):
+        return len(QUESTION_KEYS) + len(self._bank._extras.get(self._index, ()))
+
+    def __repr__(self):
+        return f"CompactQuestion({dict(self)!r})"
+
+class CompactQuestionBank(Sequence):
+    """
+    a compact, struct-of-arrays store for the questions of a quiz
+
+    the integer fields live in 'array' columns, every category string is stored once, and the texts
+    (question, explanation, options) are kept as UTF-8 bytes in a single buffer with an offset table,
+    so a question does not need a dictionary with nine keys and a list of separate strings.
+    items are CompactQuestion views, decoded only when they are read
+    """
+    __slots__ = ("_ids", "_points", "_penalties", "_time_limits", "_correct_options", "_category_codes",
+                 "_categories", "_text", "_text_offsets", "_first_text", "_extras", "_category_index")
+
+    def __init__(self, questions):
+        self._ids = array("q")
+        self._points = array("q")
+        self._penalties = array("q")
+        self._time_limits = array("q")
+        self._correct_options = array("q")
+        self._category_codes = array("I")
+        self._categories = []
+        self._text_offsets = array("Q", [0])
+        self._first_text = array("Q", [0])
+        self._extras = {}
+        self._category_index = None
+
+        category_codes = {}
+        text_pieces = []
+        text_size = 0
+
+        for index, question in enumerate(questions):
+            self._ids.append(question["id"])
+            self._points.append(question["points"])
+            self._penalties.append(question["penalty"])
+            self._time_limits.append(question["time_limit"])
+            self._correct_options.append(question["correctOption"])
+
+            category = question["category"]
+            code = category_codes.get(category)
+
+            if code is None:
+                code = category_codes[category] = len(self._categories)
+                self._categories.append(sys.intern(category))
+
+            self._category_codes.append(code)
+
+            # texts of a question: the question, the explanation, then every option
+            for text in (question["question"], question["explanation"], *question["options"]):
+                encoded = text.encode("utf-8")
+                text_pieces.append(encoded)
+                text_size += len(encoded)
+                self._text_offsets.append(text_size)
+
+            self._first_text.append(len(self._text_offsets) - 1)
+
+            extras = {key: value for key, value in question.items() if key not in QUESTION_KEYS}
+
+            if extras:
+                self._extras[index] = extras
+
+        self._text = b"".join(text_pieces)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [CompactQuestion(self, i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+
+        return CompactQuestion(self, index)
+
+    def copy(self):
+        """
+        this function gives back a normal list with a view of every question (like list.copy())
+
+        returns:
+            list[CompactQuestion]: the question views, that can be shuffled without touching the bank
+        """
+        return [CompactQuestion(self, i) for i in range(len(self))]
+
+    def to_list(self):
+        """
+        this function expands the bank back into a list of question dictionaries (for example to save it as JSON)
+
+        returns:
+            list[dict]: the questions
+        """
+        return [dict(CompactQuestion(self, i)) for i in range(len(self))]
+
+    def category_index(self):
+        """
+        this function gives back the positions of the questions of every category (built once, from the
+        category column, then kept)
+
+        returns:
+            dict: category -> an array with the positions of its questions
+        """
+        if self._category_index is None:
+            positions = [array("I") for _ in self._categories]
+
+            for index, code in enumerate(self._category_codes):
+                positions[code].append(index)
+
+            self._category_index = dict(zip(self._categories, positions))
+
+        return self._category_index
+
+    def _get_text(self, text_number):
+        """
+        this function decodes one of the texts stored in the buffer
+
+        args:
+            text_number (int): the position of the text in the offset table
+
+        returns:
+            str: the decoded text
+        """
+        return self._text[self._text_offsets[text_number]:self._text_offsets[text_number + 1]].decode("utf-8")
+
+    def _get_value(self, index, key):
+        """
+        this function reads one field of one question from the columns
+
+        args:
+            index (int): the position of the question
+            key (str): the field to read (example: "points")
+
+        returns:
+            any: the value of the field
+
+        raises:
+            KeyError: if the question has no such field
+        """
+        if key == "points":
+            return self._points[index]
+        if key == "time_limit":
+            return self._time_limits[index]
+        if key == "correctOption":
+            return self._correct_options[index]
+        if key == "penalty":
+            return self._penalties[index]
+        if key == "id":
+            return self._ids[index]
+        if key == "category":
+            return self._categories[self._category_codes[index]]
+
+        first_text = self._first_text[index]
+
+        if key == "question":
+            return self._get_text(first_text)
+        if key == "explanation":
+            return self._get_text(first_text + 1)
+        if key == "options":
+            return [self._get_text(text_number) for text_number in range(first_text + 2, self._first_text[index + 1])]
+
+        return self._extras.get(index, {})[key]
+
+def compact_quiz(quiz_data):
+    """
+    this function gives back a copy of the quiz where the list of questions is a CompactQuestionBank
+
+    run_quiz, display_question and the validators can use the returned quiz like the original one
+
+    args:
+        quiz_data (dict): a valid quiz with "title", "difficulty" and "questions"
+
+    returns:
+        dict: the same quiz, with the questions stored in compact form
+
+    raises:
+        KeyError, TypeError, ValueError, OverflowError: if a question does not have the expected fields and types
+    """
+    compact_data = dict(quiz_data)
+    compact_data["questions"] = CompactQuestionBank(quiz_data["questions"])
+
+    return compact_data
+
+def to_quiz_dict(quiz_data):
+    """
+    this function gives back a copy of the quiz with plain question dictionaries (the opposite of compact_quiz)
+
+    args:
+        quiz_data (dict): a quiz, with compact or normal questions
+
+    returns:
+        dict: the quiz with a list of question dictionaries, ready to be saved as JSON
+    """
+    plain_data = dict(quiz_data)
+    questions = quiz_data["questions"]
+    plain_data["questions"] = questions.to_list() if isinstance(questions, CompactQuestionBank) else [dict(question) for question in questions]
+
+    return plain_data
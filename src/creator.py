@@ -1,7 +1,9 @@
-import json
+import sqlite3
 from pathlib import Path
+from src import sqlite_backend
 from src.colors import color_red, color_green, color_yellow, color_blue
-from src.ui_terminal import clear_screen, print_header
+from src.file_utils import atomic_write_json
+from src.ui_terminal import redraw_screen
 from src.data_manager import ensure_data_directory
 
 difficulty_map = {
@@ -25,8 +27,7 @@ def run_quiz_creator():
     dict or None:   a dictionary with all the quiz data if saving is confirmed and works well.
                     it returns None if the user chooses to not to save the quiz
     """
-    clear_screen()
-    print_header()
+    redraw_screen()
     print(color_blue("\n-") + color_blue("-") *34)
     print(color_green(f"Welcome into the Quiz Creator CLI!"))
     print(color_blue("-" * 35))
@@ -78,8 +79,7 @@ def run_quiz_creator():
     # question adding
     quiz_complete = add_questions(new_quiz_data)
 
-    clear_screen()
-    print_header()
+    redraw_screen()
 
     quiz_title = new_quiz_data.get("title")
     num_questions = len(new_quiz_data["questions"])
@@ -425,14 +425,26 @@ def save_quiz_to_file(quiz_data):
     # generate a secure filename
     filename = sanitize_title_for_filename(title)
 
+    if sqlite_backend.is_enabled():
+        try:
+            sqlite_backend.save_quiz(filename, quiz_data)
+        except sqlite3.Error as e:
+            print(color_red(f"\n[CRITICAL ERROR] Could not save quiz {filename} into the database."))
+            print(f"\nDetails: {e}")
+
+            return None
+
+        print(color_green(f"\n[SUCCESS] Quiz saved to the database as: {filename}"))
+
+        return filename
+
     # create a complete path
     file_path = Path("data") / filename
 
     try: 
-        # opens the file in writing with utf-8 decoding
-        with open(file_path, "w", encoding="utf-8") as f:
-            # saves the dictionary as JSON formatted
-            json.dump(quiz_data, f, indent=4)
+        # saves the dictionary as JSON formatted into a temporary file, then renames it over the old one,
+        # so a crash never leaves a truncated quiz behind
+        atomic_write_json(file_path, quiz_data, indent=4)
 
         print(color_green(f"\n[SUCCESS] Quiz saved to: {file_path}"))
 
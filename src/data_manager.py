@@ -1,71 +1,345 @@
+import atexit
 import json
 import os
 from src.colors import color_blue, color_cyan, color_green, color_magenta, color_red, color_yellow
+from src.catalog import WatchedCatalog, iter_catalog, refresh_catalog
+from src import sqlite_backend
+from src.compact_quiz import compact_quiz
+from src.quiz_schema import validate_quiz
+from src.quiz_stream import LARGE_QUIZ_SIZE, QuestionStream, open_quiz_stream
+from src.quiz_pack import get_pack_path, open_pack_if_up_to_date, quiz_data_from_pack
+from src.question_index import refresh_question_index, sample_question_refs
+from src.file_utils import get_project_data_directory
+from src.search_index import SEARCH_INDEX_FILENAME, refresh_search_index
+
+_search_index = None # the search index of the last search, reused while no quiz changes
+_watched_catalog = None # the catalog kept up to date by a watcher, once start_watching_data was called
+
+def start_watching_data():
+    """
+    this function starts watching the 'data' folder for new, changed and deleted quizzes (with inotify, or
+    by polling the folder where inotify is missing, see 'src/watcher.py')
+
+    the catalog is brought up to date once now; from then on load_catalog_entries only looks at the files
+    the watcher reports, so quizzes created by the app or by other programs show up without reading the
+    whole folder again. the catalog is written to 'data/.catalog' when the watch stops (at the latest when
+    the program exits). it does nothing with the SQLite backend
+    """
+    global _watched_catalog
+
+    if _watched_catalog is not None or sqlite_backend.is_enabled():
+        return
+
+    ensure_data_directory("data")
+    _watched_catalog = WatchedCatalog("data", is_valid_quiz)
+    atexit.register(stop_watching_data)
+
+def stop_watching_data():
+    """
+    this function saves the catalog and stops the watcher started by start_watching_data
+    """
+    global _watched_catalog
+
+    if _watched_catalog is not None:
+        _watched_catalog.close()
+        _watched_catalog = None
+
+def load_catalog_entries():
+    """
+    this function gives back the catalog of the 'data' folder, up to date
+
+    while the folder is watched only the changes reported by the watcher are applied to the catalog,
+    otherwise the whole folder is read again (and only new or changed files are parsed)
+
+    returns:
+        dict: filename -> catalog entry ("valid", "title", "difficulty", "question_count", "sha256", ...)
+    """
+    ensure_data_directory("data")
+
+    if _watched_catalog is not None:
+        return _watched_catalog.refresh()
+
+    return refresh_catalog("data", is_valid_quiz)
 
 def load_quiz_file():
     """
     this function looks inside the 'data' folder and gives back a list of names for the JSON files that 
     are valid quizzes 
 
-    first it makes sure the 'data' folder exists. if a JSON file is not correct (eiter the structure is bad),
-    the function skips it and prints a helpful message
+    first it makes sure the 'data' folder exists. the folder is read through the catalog index ('data/.catalog'),
+    so only new or changed files are parsed and validated again (only the files reported by the watcher,
+    once start_watching_data was called). if a JSON file is not correct (eiter the 
+    structure is bad), the function skips it and prints a helpful message
 
     returns:
         list[str]: a list of strings with the names of the valid JSON files found (example: ["quiz1.json", "quiz2.json"]) 
     """
-    directory = "data"
-
     quiz_files = []
 
     ensure_data_directory("data")
 
-    all_files = os.listdir(directory)
+    if sqlite_backend.is_enabled():
+        # the database only contains quizzes that were validated when they were imported
+        return sqlite_backend.list_quiz_filenames()
 
-    for filename in all_files:
-        if filename.endswith(".json"):
-            if filename == "leaderboard.json":
-                continue
+    catalog_entries = load_catalog_entries()
 
-            data = load_quiz_data(filename)
-            is_valid = is_valid_quiz(data)
-            
-            if is_valid:
-                quiz_files.append(filename)
-            else:
-                info = color_cyan("[INFO]")
-                message = f"Skipping invalid quiz file: {filename}"
-                print(f"{info} {message}")
+    for filename, entry in catalog_entries.items():
+        if entry["valid"]:
+            quiz_files.append(filename)
+        else:
+            info = color_cyan("[INFO]")
+            message = f"Skipping invalid quiz file: {filename}"
+            print(f"{info} {message}")
 
     return quiz_files # restituisce i file json (in una lista) nella cartella dati
 
-def load_quiz_data(filename):
+def iter_quiz_entries():
+    """
+    this function goes through the valid quizzes one at a time, reading the 'data' folder (through the
+    catalog) or the database only as far as the caller goes
+
+    a menu that shows the first page of quizzes does not have to wait for the whole folder: the time to
+    show it does not depend on how many quizzes there are. invalid files are skipped
+
+    yields:
+        tuple[str, dict]: the filename and its catalog entry ("title", "difficulty", "question_count", ...)
+    """
+    ensure_data_directory("data")
+
+    if sqlite_backend.is_enabled():
+        yield from sqlite_backend.iter_quiz_summaries()
+        return
+
+    # while the folder is watched the catalog is already up to date, otherwise it is read lazily
+    catalog_entries = load_catalog_entries().items() if _watched_catalog is not None else iter_catalog("data", is_valid_quiz)
+
+    for filename, entry in catalog_entries:
+        if entry["valid"]:
+            yield filename, entry
+
+def load_quiz_data(filename, compact=False, stream=False, use_pack=False):
     """
     this function loads the JSON content from a specific file in the 'data' folder
 
     args:
         filename (str): the name of the JSON file to load (it must be in 'data/')
+        compact (bool): if true and the quiz is valid, the questions are stored in a CompactQuestionBank,
+                        which uses much less memory for large quizzes
+        stream (bool): if true only the title and the difficulty are read now, and "questions" is a
+                       QuestionStream that reads the questions from the file while they are played
+                       (it has no effect with the SQLite backend)
+        use_pack (bool): if true and the quiz was exported to a quiz pack ('data/<name>.qpk') after its last
+                         change, the pack is opened instead: "questions" is then a QuizPack that decodes a
+                         question only when it is read (the caller closes it after the game)
     
     returns:
         dict: the content of the JSON file loaded as a python dictionary
     """
-    file_path = os.path.join("data", filename)
+    if sqlite_backend.is_enabled():
+        data = sqlite_backend.load_quiz(filename)
+    else:
+        file_path = os.path.join("data", filename)
+        pack = open_pack_if_up_to_date(get_pack_path(file_path), file_path) if use_pack else None
+
+        if pack is not None:
+            return quiz_data_from_pack(pack)
+
+        if stream:
+            return open_quiz_stream(file_path)
 
-    with open(file_path, "r") as file:
-        data = json.load(file)
+        with open(file_path, "r") as file:
+            data = json.load(file)
+
+    if compact and is_valid_quiz(data):
+        return compact_quiz(data)
+
+    return data # restituisce i dati da un file dalla lista precedente
+
+def is_large_quiz_file(filename):
+    """
+    this function tells if a quiz file is big enough to be streamed instead of loaded all at once
 
-        return data # restituisce i dati da un file dalla lista precedente
+    args:
+        filename (str): the name of the JSON file (it must be in 'data/')
+
+    returns:
+        bool: true if the file is bigger than LARGE_QUIZ_SIZE (always false with the SQLite backend)
+    """
+    if sqlite_backend.is_enabled():
+        return False
+
+    try:
+        return os.path.getsize(os.path.join("data", filename)) > LARGE_QUIZ_SIZE
+    except OSError:
+        return False
     
+def _load_quiz_in_file_order(filename):
+    """
+    this function loads a quiz for the question index: the questions must come in file order (the index
+    saves their positions), and large files are read as a stream so they are never fully in memory
+
+    args:
+        filename (str): the name of the JSON file (it must be in 'data/')
+
+    returns:
+        dict: the quiz
+    """
+    if is_large_quiz_file(filename):
+        return open_quiz_stream(os.path.join("data", filename), shuffle=False)
+
+    return load_quiz_data(filename, use_pack=True)
+
+def load_question_index():
+    """
+    this function gives back the question index of all the quizzes (category -> questions, difficulty
+    -> quizzes), see 'src/question_index.py'
+
+    the index is saved in 'data/.question_index' and refreshed from the catalog: only the quizzes that
+    changed since the last time are read again. with the SQLite backend it is read from the database
+
+    returns:
+        dict: filename -> index entry ("title", "difficulty", "categories": category -> positions)
+    """
+    if sqlite_backend.is_enabled():
+        return sqlite_backend.build_question_index()
+
+    catalog_entries = load_catalog_entries()
+
+    return refresh_question_index("data", catalog_entries, _load_quiz_in_file_order)
+
+def load_search_index():
+    """
+    this function gives back the full-text search index of all the quizzes, see 'src/search_index.py'
+
+    the index is saved in 'data/.search' (next to the database, with the SQLite backend) and refreshed
+    from the catalog: only the quizzes that changed since the last time are read again. the index stays in
+    memory between two searches, and a new session only maps the file
+
+    returns:
+        SearchIndex: the search index
+    """
+    global _search_index
+
+    if sqlite_backend.is_enabled():
+        # the content hash written by save_quiz tells which quizzes changed since the last search
+        catalog_entries = {filename: {"valid": True, "sha256": summary["sha256"]} for filename, summary in sqlite_backend.iter_quiz_summaries()}
+        index_path = os.path.join(get_project_data_directory(), sqlite_backend.DATABASE_FILENAME + SEARCH_INDEX_FILENAME)
+        load_quiz = load_quiz_data
+    else:
+        catalog_entries = load_catalog_entries()
+        index_path = os.path.join("data", SEARCH_INDEX_FILENAME)
+        load_quiz = _load_quiz_in_file_order
+
+    old_index = _search_index if _search_index is not None and _search_index.file_path == index_path else None
+    _search_index, _ = refresh_search_index(index_path, catalog_entries, load_quiz, old_index)
+
+    return _search_index
+
+def search_quizzes(query, limit=10):
+    """
+    this function finds the quizzes that best match a query (BM25 ranking, the last letters of a word
+    can be left out: "photosyn" also finds "photosynthesis")
+
+    args:
+        query (str): the searched words
+        limit (int): the highest number of results
+
+    returns:
+        list[dict]: the results, best first: "filename", "title", "score" and "question" (the text of the
+                    best matching question, or None if the best match is the title)
+    """
+    results = load_search_index().search(query, limit)
+
+    # the texts of the questions are saved in the index, no quiz is opened
+    for result in results:
+        del result["position"]
+
+    return results
+
+def load_questions_at(filename, positions):
+    """
+    this function loads only some questions of a quiz, by their position in the file
+
+    the questions are read from the database, from the quiz pack, by jumping inside a large file with its
+    offset index, or (for a normal file) from the whole quiz
+
+    args:
+        filename (str): the name of the JSON file (it must be in 'data/')
+        positions (list[int]): the positions of the questions
+
+    returns:
+        list[dict]: the questions, in the order of the positions
+    """
+    if sqlite_backend.is_enabled():
+        return sqlite_backend.load_questions_at(filename, positions)
+
+    file_path = os.path.join("data", filename)
+    pack = open_pack_if_up_to_date(get_pack_path(file_path), file_path)
+
+    if pack is not None:
+        with pack:
+            return [pack[position] for position in positions]
+
+    if is_large_quiz_file(filename):
+        return QuestionStream(file_path, shuffle=False).read_questions(positions)
+
+    questions = load_quiz_data(filename)["questions"]
+
+    return [questions[position] for position in positions]
+
+def build_custom_mix(count, categories=None, difficulties=None, rng=None, question_index=None):
+    """
+    this function assembles a "custom mix" quiz with random questions taken from all the quizzes
+
+    only the drawn questions are read: the choice is made on the question index
+
+    args:
+        count (int): the number of questions of the mix
+        categories (collection[str] or None): only questions of these categories (None for all)
+        difficulties (collection[str] or None): only questions of quizzes with these difficulties (None for all)
+        rng (random.Random or None): the random generator
+        question_index (dict or None): an index already loaded with load_question_index
+
+    returns:
+        dict: the quiz, with "title", "difficulty" and "questions" (empty if nothing matches)
+    """
+    if question_index is None:
+        question_index = load_question_index()
+
+    positions_by_file = {}
+
+    for filename, position in sample_question_refs(question_index, count, categories, difficulties, rng):
+        positions_by_file.setdefault(filename, []).append(position)
+
+    questions = []
+
+    for filename, positions in positions_by_file.items():
+        questions.extend(load_questions_at(filename, positions))
+
+    title = "Custom Mix"
+
+    if categories:
+        title += f" ({', '.join(sorted(categories))})"
+
+    return {
+        "title": title,
+        "difficulty": ", ".join(sorted(difficulties)) if difficulties else "Mixed",
+        "questions": questions
+    }
+
 def is_valid_quiz(data):
 
     """
     this function checks if the structure of the loaded dictionary matches what is expected for a quiz
 
-    it checks:
-    - that the data is actually a dictionary
-    - that it has the key 'title' (which must be a text string) and 'questions' (which must be a list)
-    - that every item in the "questions" list is a dictionary with the basic structure (it must have 'question', 'options', and 'correctOption')
-    - that 'options' is a list with at least 2 items 
-    - that 'correctOption' is a valid index number for the options' list
+    the rules are the ones of QUIZ_SCHEMA (in 'src/quiz_schema.py'), shared with the AI generator:
+    - the data must be a dictionary with 'title' and 'difficulty' (text strings) and a non-empty 'questions' list
+    - every question must have all the fields of QUESTION_SCHEMA with the right type
+    - 'options' must be a list of at least 2 strings and 'correctOption' a valid index of it
+    - 'time_limit' can not be negative
+
+    the check stops at the first error. use validate_quiz to get the list of errors with their path
 
     args:
         data(any): the data loaded ffrom the JSON file
@@ -74,90 +348,7 @@ def is_valid_quiz(data):
         bool: true if the structure is correct, false if it is not
     """
 
-    if type(data) is not dict:
-        return False
-    
-    if "title" not in data:
-        return False
-    
-    if "difficulty" not in data or not isinstance(data["title"], str):
-        return False
-    
-    if "questions" not in data:
-        return False
-    
-    if not isinstance(data["questions"], list):
-        return False
-    
-    # check for every single question
-    for question in data["questions"]:
-        if not isinstance(question, dict):
-            return False
-            
-        if "question" not in question:
-            return False
-
-        if not isinstance(question["question"], str):
-            return False
-
-        if "options" not in question:
-            return False
-
-        if not isinstance(question["options"], list):
-            return False
-        
-        if not (len(question["options"]) >= 2):
-            return False
-        
-        if "correctOption" not in question:
-            return False
-        
-        if not isinstance(question["correctOption"], int):
-            return False
-        
-        if not (0 <= question["correctOption"] < len(question["options"])):
-            return False
-        
-        if "id" not in question:
-            return False
-        
-        if not isinstance(question["id"], int):
-            return False
-        
-        if "explanation" not in question:
-            return False
-        
-        if not isinstance(question["explanation"], str):
-            return False
-        
-        if "points" not in question:
-            return False
-        
-        if not isinstance(question["points"], int):
-            return False
-        
-        if "penalty" not in question:
-            return False
-        
-        if not isinstance(question["penalty"], int):
-            return False
-        
-        if "time_limit" not in question:
-            return False
-        
-        if not isinstance(question["time_limit"], int):
-            return False
-        
-        if question["time_limit"] < 0:
-            return False
-        
-        if "category" not in question:
-            return False
-        
-        if not isinstance(question["category"], str):
-            return False
-    
-    return True
+    return not validate_quiz(data, fail_fast=True)
 
 def ensure_data_directory(directory_name):
     """
@@ -1,13 +1,83 @@
-from src.ui_terminal import display_question, get_answer, clear_screen, print_header, get_username
+from src.ui_terminal import display_question, get_answer, redraw_screen, get_username
 import string
 from datetime import datetime
-from src.storage import save_leaderboard, load_leaderboard
+from src.storage import record_score
 from src.colors import color_blue, color_green, color_magenta, color_red
-from src.ui_terminal import print_header, clear_screen
+from src.quiz_stream import QuestionSource
 import time
 import random 
 
-def run_quiz(quiz_data):
+RAPID_RESPONSE_BONUS = 10 # points added to a correct answer given within half of the time limit
+
+def terminal_answer_source(question, valid_options):
+    """
+    this function is the answer source used when a person plays: it asks the answer in the terminal and
+    measures how long the user takes to give it
+
+    args:
+        question (dict): the question being answered
+        valid_options (list[str]): the valid answer letters shown on the screen
+
+    returns:
+        tuple[int, float]: a pair containing (user_index, time_taken_in_seconds). the index is -1 if
+                           the answer could not be converted
+    """
+    # time measurement
+    start_time = time.perf_counter()
+    user_answer = get_answer(valid_options) # takes user input 
+    end_time = time.perf_counter()
+
+    # conversion of the answer
+    try:
+        user_index = string.ascii_uppercase.index(user_answer)
+    except ValueError:
+        user_index = -1 # as invalid format
+
+    return user_index, end_time - start_time
+
+def score_answer(question, user_index, time_taken):
+    """
+    this function applies the scoring rules of the game to one answer: calculate_score for a correct
+    answer, and the question penalty for a wrong one
+
+    args:
+        question (dict): the answered question (it needs "points" and "correctOption")
+        user_index (int): the index of the chosen option (-1 for an invalid answer)
+        time_taken (float): the time the user spent answering in seconds, already rounded to one decimal
+
+    returns:
+        tuple[int, bool, str or None]: (points_change, is_correct, feedback_message). the points change is
+                                       negative for a wrong answer and the message is None in that case
+    """
+    if user_index == question["correctOption"]:
+        points_gained, feedback_message = calculate_score(question["points"], time_taken, question.get("time_limit", 0))
+        return (points_gained, True, feedback_message)
+
+    return (-question.get("penalty", 0), False, None)
+
+def iter_random_order(count, rng=None):
+    """
+    this function gives back the numbers from 0 to count - 1 in a random order, one at a time
+
+    it is a Fisher-Yates shuffle done step by step: only the swapped positions are remembered, so the
+    first number comes right away and the memory used grows only with the numbers already given back
+
+    args:
+        count (int): how many positions to shuffle
+        rng (random.Random or None): the random generator
+
+    yields:
+        int: the next position
+    """
+    randrange = (rng or random).randrange
+    swapped = {}
+
+    for i in range(count):
+        j = randrange(i, count)
+        yield swapped.get(j, j)
+        swapped[j] = swapped.pop(i, i)
+
+def run_quiz(quiz_data, answer_source=None):
     """
     this function runs the main part of the quiz: it shows the questions in a mixed order, manages how long
     the user takes to answer, calculates the points, and records the final result
@@ -15,11 +85,17 @@ def run_quiz(quiz_data):
     args:
         quiz_data (dict):   a dictionary containing the quiz structure, including the title and the list
                             of questions
+        answer_source (callable or None): the function that gives the answer to every question, called as
+                            answer_source(question, valid_options) and returning (user_index, time_taken).
+                            None means terminal_answer_source (a person playing)
             
     returns:
         dict or None:       the final match status (score, correct/incorrect answers)
-                            it returns none if the process stops early (even though the current plan doesn't seem to allow for an easy stop)
+                            it returns none if the questions stop early (an error of the question source, or no question to play)
     """
+    if answer_source is None:
+        answer_source = terminal_answer_source
+
     match_status = {
 
         "score": 0,
@@ -29,19 +105,22 @@ def run_quiz(quiz_data):
         "current_question_index": 0
     }
 
-    total_questions = len(quiz_data["questions"])
-    match_status["total_questions"] = total_questions
-
     question_list_original = quiz_data["questions"]
 
-    question_to_shuffle = question_list_original.copy()
-
-    random.shuffle(question_to_shuffle)
+    if isinstance(question_list_original, QuestionSource):
+        # the questions are read while playing (from a file, from the AI...), already in a mixed order.
+        # the total is None until the source knows it (example: the first time a file is read)
+        total_questions = question_list_original.count
+        question_to_shuffle = question_list_original
+    else:
+        # only the positions are shuffled: a question is read (and decoded, for a quiz pack) when it is shown
+        total_questions = len(question_list_original)
+        question_to_shuffle = (question_list_original[position] for position in iter_random_order(total_questions))
 
     for i, question in enumerate(question_to_shuffle):
         question_number = i + 1
-        clear_screen()
-        print_header()
+        match_status["total_questions"] = question_number
+        redraw_screen()
         valid_options =display_question(question, question_number, total_questions)
 
         base_points = question["points"]
@@ -50,27 +129,17 @@ def run_quiz(quiz_data):
 
         option_list = question["options"]
 
-        # time measurement
-        start_time = time.perf_counter()
-        user_answer = get_answer(valid_options) # takes user input 
-        end_time = time.perf_counter()
-
-        time_taken_raw = end_time - start_time
+        user_index, time_taken_raw = answer_source(question, valid_options)
         time_taken_rounded = round(time_taken_raw, 1)
-        
-        # conversion of the answer
-        try:
-            user_index = string.ascii_uppercase.index(user_answer)
-        except ValueError:
-            user_index = -1 # as invalid format
 
         correct_answer = question["correctOption"]
 
-        if user_index == correct_answer:
-            # correct answer
-            points_gained, feedback_message = calculate_score(base_points, time_taken_rounded, time_limit)
-            match_status["score"] += points_gained
+        points_change, is_correct, feedback_message = score_answer(question, user_index, time_taken_rounded)
+        match_status["score"] += points_change
 
+        if is_correct:
+            # correct answer
+            points_gained = points_change
             match_status["correct_answers"] += 1
 
             if points_gained > base_points:
@@ -84,11 +153,21 @@ def run_quiz(quiz_data):
         else:
             # wrong answer
             match_status["incorrect_answers"] += 1
-            penalty = question.get("penalty", 0)
-            match_status["score"] -= penalty
 
             print(color_magenta(f"Too bad! Your answer wasn't correct! It was the option '{option_list[correct_answer]}'"))
 
+    # a source that stopped early (example: the AI connection dropped) is not a completed quiz, so no score is recorded
+    stream_error = question_list_original.error if isinstance(question_list_original, QuestionSource) else None
+
+    if stream_error or match_status["total_questions"] == 0:
+        print(color_red(f"\n[ERROR] The quiz stopped after {match_status['total_questions']} questions, the score was not recorded."))
+
+        if stream_error:
+            print(stream_error)
+
+        input("\nPress Enter to proceed...")
+        return None
+
     input("\nPress Enter to proceed...")
     show_results(match_status)
 
@@ -103,10 +182,7 @@ def run_quiz(quiz_data):
         "date": current_date_str
     }
 
-    all_leaderboard_data = load_leaderboard()
-
-    all_leaderboard_data.append(score_record)
-    save_leaderboard(all_leaderboard_data)
+    record_score(score_record)
 
     return match_status
 
@@ -119,8 +195,7 @@ def show_results(match_status):
     args:
         match_status (dict): a dictionary containing score, correct_answers, incorrect_answers, and total_questions
     """
-    clear_screen()
-    print_header()
+    redraw_screen()
     print(color_blue("\n-") + color_blue("-") *34)
     print("Quiz Completed!")
     print(color_blue("-") * 35)
@@ -169,7 +244,7 @@ def calculate_score(base_points, time_taken, time_limit):
     bonus_time_threshold = time_limit / 2
 
     if time_taken <= bonus_time_threshold:
-        bonus_points = 10
+        bonus_points = RAPID_RESPONSE_BONUS
         final_points = base_points + bonus_points
         message = f"Rapid response! You got a bonus of {bonus_points} points."
         return (final_points, message)
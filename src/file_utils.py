@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError: # windows has no fcntl, locking is skipped there
+    fcntl = None
+
+DATA_DIR_ENV_VARIABLE = "QUIZ_ENGINE_DATA_DIR" # set it to keep leaderboard and database in another folder
+
+def get_project_data_directory():
+    """
+    this function figures out the folder that holds the leaderboard and database files
+
+    by default it is the 'data' folder of the main project (two levels up from this current file). the
+    QUIZ_ENGINE_DATA_DIR environment variable can point it somewhere else (useful for benchmarks)
+
+    returns:
+        path: a path object that points to the data folder
+    """
+    override = os.environ.get(DATA_DIR_ENV_VARIABLE)
+
+    if override:
+        return Path(override).resolve()
+
+    return Path(__file__).resolve().parent.parent / "data"
+
+def atomic_write_bytes(path, data):
+    """
+    this function replaces the content of a file without ever leaving it half written
+
+    the data is written into a temporary file of the same folder, flushed to the disk with fsync and then
+    renamed over the target. a reader sees either the old content or the new one, never a mix
+
+    args:
+        path (str or path): the file to write
+        data (bytes): the new content of the file
+    """
+    path = Path(path)
+    file_descriptor, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+
+    try:
+        with os.fdopen(file_descriptor, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_name, path)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except OSError:
+            pass
+        raise
+
+    _fsync_directory(path.parent)
+
+def atomic_write_text(path, text):
+    """
+    this function saves a text (UTF-8) using atomic_write_bytes
+
+    args:
+        path (str or path): the file to write
+        text (str): the new content of the file
+    """
+    atomic_write_bytes(path, text.encode("utf-8"))
+
+def atomic_write_json(path, data, indent=None):
+    """
+    this function saves python data as JSON using atomic_write_text
+
+    args:
+        path (str or path): the file to write
+        data (any): the data to save
+        indent (int or None): the indentation of the JSON text (None for the compact form)
+    """
+    atomic_write_text(path, json.dumps(data, indent=indent))
+
+def _fsync_directory(directory):
+    """
+    this function flushes a folder to the disk, so a rename done inside it survives a crash
+
+    args:
+        directory (path): the folder to flush
+    """
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+
+    try:
+        directory_descriptor = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+
+    try:
+        os.fsync(directory_descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(directory_descriptor)
+
+@contextmanager
+def locked(lock_path):
+    """
+    this function holds an exclusive advisory lock (fcntl.flock) on a lock file for a read-modify-write cycle
+
+    every process (and thread) that uses the same lock file waits for its turn. the lock is not
+    reentrant: code that already holds it must not ask for it again
+
+    args:
+        lock_path (str or path): the lock file (it is created if missing)
+
+    yields:
+        None
+    """
+    lock_path = Path(lock_path)
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with lock_path.open("a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,73 @@
+PAGE_SIZE = 20
+
+class LazyPages:
+    """
+    the pages of a list that is read only when it is needed
+
+    the items come from an iterator (example: the quizzes read from the catalog) and are kept after they
+    are read, so going back to a page costs nothing and showing page n reads at most the first n pages
+    (plus one item, to know if there is a next page)
+    """
+
+    def __init__(self, items, page_size=PAGE_SIZE):
+        self._items = iter(items)
+        self._loaded = []
+        self.page_size = page_size
+        self.exhausted = False
+
+    def _load_until(self, count):
+        """
+        this function reads items from the iterator until 'count' items are loaded (or there are no more)
+        """
+        while len(self._loaded) < count and not self.exhausted:
+            try:
+                self._loaded.append(next(self._items))
+            except StopIteration:
+                self.exhausted = True
+
+    def get_page(self, page_number):
+        """
+        this function gives back the items of a page
+
+        args:
+            page_number (int): the number of the page, starting from 0
+
+        returns:
+            list: the items of the page (empty if the page does not exist)
+        """
+        start = page_number * self.page_size
+        self._load_until(start + self.page_size + 1)
+
+        return self._loaded[start:start + self.page_size]
+
+    def has_page(self, page_number):
+        """
+        this function tells if a page exists (it reads the items up to the first one of that page)
+
+        args:
+            page_number (int): the number of the page, starting from 0
+
+        returns:
+            bool: true if the page has at least one item (page 0 always exists, even if it is empty)
+        """
+        self._load_until(page_number * self.page_size + 1)
+
+        return page_number == 0 or len(self._loaded) > page_number * self.page_size
+
+    def known_page_count(self):
+        """
+        this function gives back the number of pages seen so far
+
+        returns:
+            tuple[int, bool]: the number of pages already read, and true if it is the final number
+        """
+        return max(1, -(-len(self._loaded) // self.page_size)), self.exhausted
+
+    def close(self):
+        """
+        this function stops reading the items (example: it lets the catalog scan close its folder)
+        """
+        close = getattr(self._items, "close", None)
+
+        if close is not None:
+            close()
@@ -0,0 +1,198 @@
+import bisect
+import json
+import os
+import random
+from src.file_utils import atomic_write_json
+
+INDEX_FILENAME = ".question_index"
+INDEX_VERSION = 1
+
+def _get_index_path(directory):
+    """
+    this function gives back the path of the question index file inside a quiz folder
+
+    args:
+        directory (str): the folder that holds the quiz files (example: "data")
+
+    returns:
+        str: the path of the index file (example: "data/.question_index")
+    """
+    return os.path.join(directory, INDEX_FILENAME)
+
+def load_question_index(directory):
+    """
+    this function loads the question index saved inside the quiz folder
+
+    args:
+        directory (str): the folder that holds the quiz files
+
+    returns:
+        dict: filename -> index entry ("sha256", "title", "difficulty" and "categories", a dictionary
+              category -> positions of its questions). empty if the file is missing or out of date
+    """
+    try:
+        with open(_get_index_path(directory), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION or not isinstance(index.get("files"), dict):
+        return {}
+
+    return index["files"]
+
+def save_question_index(directory, files):
+    """
+    this function writes the question index inside the quiz folder (atomically)
+
+    args:
+        directory (str): the folder that holds the quiz files
+        files (dict): filename -> index entry
+    """
+    try:
+        atomic_write_json(_get_index_path(directory), {"version": INDEX_VERSION, "files": files})
+    except OSError:
+        # the index is only a cache: if it cannot be written the next refresh builds it again
+        pass
+
+def build_index_entry(quiz_data, content_hash=None):
+    """
+    this function builds the index entry of one quiz
+
+    args:
+        quiz_data (dict): a valid quiz
+        content_hash (str or None): the sha256 of the quiz file, used to know when the entry is out of date
+
+    returns:
+        dict: the index entry
+    """
+    categories = {}
+
+    for position, question in enumerate(quiz_data["questions"]):
+        categories.setdefault(question["category"], []).append(position)
+
+    return {"sha256": content_hash, "title": quiz_data["title"], "difficulty": quiz_data["difficulty"], "categories": categories}
+
+def refresh_question_index(directory, catalog_entries, load_quiz):
+    """
+    this function brings the question index up to date with the quiz catalog
+
+    only the quizzes whose content hash changed since the last refresh are loaded again, the entries of
+    deleted or invalid quizzes are dropped
+
+    args:
+        directory (str): the folder that holds the quiz files
+        catalog_entries (dict): filename -> catalog entry (see refresh_catalog)
+        load_quiz (callable): the function that loads a quiz by filename (example: load_quiz_data)
+
+    returns:
+        dict: filename -> index entry, for every valid quiz
+    """
+    old_files = load_question_index(directory)
+    files = {}
+    changed = False
+
+    for filename, entry in catalog_entries.items():
+        if not entry["valid"]:
+            continue
+
+        old_entry = old_files.get(filename)
+
+        if old_entry is not None and old_entry.get("sha256") == entry["sha256"]:
+            files[filename] = old_entry
+            continue
+
+        try:
+            files[filename] = build_index_entry(load_quiz(filename), entry["sha256"])
+        except (OSError, ValueError):
+            continue
+
+        changed = True
+
+    if changed or old_files.keys() != files.keys():
+        save_question_index(directory, files)
+
+    return files
+
+def count_categories(files, difficulties=None):
+    """
+    this function counts the questions of every category across all the quizzes
+
+    args:
+        files (dict): the question index
+        difficulties (collection[str] or None): only count the quizzes with one of these difficulties
+
+    returns:
+        dict: category -> number of questions, sorted by category name
+    """
+    counts = {}
+
+    for entry in files.values():
+        if difficulties and entry["difficulty"] not in difficulties:
+            continue
+
+        for category, positions in entry["categories"].items():
+            counts[category] = counts.get(category, 0) + len(positions)
+
+    return dict(sorted(counts.items()))
+
+def group_by_difficulty(files):
+    """
+    this function lists the quizzes of every difficulty
+
+    args:
+        files (dict): the question index
+
+    returns:
+        dict: difficulty -> list of quiz filenames, sorted by difficulty name
+    """
+    quizzes = {}
+
+    for filename, entry in files.items():
+        quizzes.setdefault(entry["difficulty"], []).append(filename)
+
+    return dict(sorted(quizzes.items()))
+
+def sample_question_refs(files, count, categories=None, difficulties=None, rng=None):
+    """
+    this function picks random questions among all the quizzes, as (filename, position) references
+
+    the matching questions are never listed one by one: the groups (one per quiz and category) are
+    numbered one after the other, 'count' numbers are drawn with random.sample and every number is
+    found in its group with a binary search
+
+    args:
+        files (dict): the question index
+        count (int): the number of questions to pick (all of them if fewer match)
+        categories (collection[str] or None): only these categories (None for all)
+        difficulties (collection[str] or None): only the quizzes with these difficulties (None for all)
+        rng (random.Random or None): the random generator
+
+    returns:
+        list[tuple[str, int]]: the chosen (filename, position) references
+    """
+    rng = rng or random
+    groups = []
+    group_starts = []
+    total = 0
+
+    for filename, entry in files.items():
+        if difficulties and entry["difficulty"] not in difficulties:
+            continue
+
+        for category, positions in entry["categories"].items():
+            if categories and category not in categories:
+                continue
+
+            group_starts.append(total)
+            groups.append((filename, positions))
+            total += len(positions)
+
+    refs = []
+
+    for number in rng.sample(range(total), min(count, total)):
+        group = bisect.bisect_right(group_starts, number) - 1
+        filename, positions = groups[group]
+        refs.append((filename, positions[number - group_starts[group]]))
+
+    return refs
@@ -0,0 +1,431 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from collections.abc import Sequence
+from src.colors import color_green, color_red
+from src.file_utils import atomic_write_bytes, atomic_write_json
+from src.quiz_schema import format_error, validate_quiz
+
+PACK_EXTENSION = ".qpk"
+PACK_MAGIC = b"QZPK"
+PACK_VERSION = 2
+
+# header: magic, version, flags, question count, metadata size, record table offset, text blob offset
+_HEADER = struct.Struct("<4sHHQQQQ")
+# one record per question: id, points, penalty, time limit, correct option, category code,
+# option count, flags, offset and size of the question texts inside the blob
+_RECORD = struct.Struct("<qqqqqIHHQQ")
+# the lengths of the texts of a question, before the texts themselves
+_LENGTH = struct.Struct("<I")
+# one entry of the category index: the position of a question
+_POSITION = struct.Struct("<I")
+
+_RECORD_HAS_EXTRAS = 1 # the last text of the question is a JSON object with the fields not in the record
+
+_RECORD_KEYS = ("id", "question", "category", "options", "correctOption", "explanation", "points", "penalty", "time_limit")
+
+def _align(size, alignment=8):
+    """
+    this function rounds a size up to a multiple of 'alignment' (records are read at aligned offsets)
+    """
+    return (size + alignment - 1) // alignment * alignment
+
+def build_quiz_pack(quiz_data, source_stat=None):
+    """
+    this function encodes a quiz into the quiz pack binary format
+
+    the pack is made of a fixed header, a JSON metadata block (title, difficulty, categories...), a table
+    with one fixed size record per question, the category index (the positions of the questions of every
+    category, one category after the other) and a blob with the UTF-8 texts. a question can be read by
+    position without decoding any other question
+
+    args:
+        quiz_data (dict): a valid quiz (with normal or compact questions)
+        source_stat (os.stat_result or None): the stat of the JSON file the quiz comes from, saved to know
+                                              later if the pack is still up to date
+
+    returns:
+        bytes: the content of the pack file
+    """
+    questions = quiz_data["questions"]
+    metadata = {key: value for key, value in quiz_data.items() if key != "questions"}
+    categories = []
+    category_codes = {}
+    category_positions = []
+    records = []
+    blob_pieces = []
+    blob_size = 0
+
+    for question in questions:
+        category = question["category"]
+        code = category_codes.get(category)
+
+        if code is None:
+            code = category_codes[category] = len(categories)
+            categories.append(category)
+            category_positions.append([])
+
+        category_positions[code].append(len(records))
+        texts = [question["question"], question["explanation"], *question["options"]]
+        extras = {key: question[key] for key in question if key not in _RECORD_KEYS}
+        flags = 0
+
+        if extras:
+            texts.append(json.dumps(extras))
+            flags |= _RECORD_HAS_EXTRAS
+
+        encoded_texts = [text.encode("utf-8") for text in texts]
+        block = b"".join(_LENGTH.pack(len(encoded)) for encoded in encoded_texts) + b"".join(encoded_texts)
+
+        records.append(_RECORD.pack(question["id"], question["points"], question["penalty"], question["time_limit"],
+                                    question["correctOption"], code, len(question["options"]), flags, blob_size, len(block)))
+        blob_pieces.append(block)
+        blob_size += len(block)
+
+    metadata["categories"] = categories
+    metadata["category_counts"] = [len(positions) for positions in category_positions]
+
+    if source_stat is not None:
+        metadata["source_size"] = source_stat.st_size
+        metadata["source_mtime_ns"] = source_stat.st_mtime_ns
+
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    table_offset = _align(_HEADER.size + len(metadata_bytes))
+    blob_offset = table_offset + (_RECORD.size + _POSITION.size) * len(records)
+    header = _HEADER.pack(PACK_MAGIC, PACK_VERSION, 0, len(records), len(metadata_bytes), table_offset, blob_offset)
+    padding = b"\0" * (table_offset - _HEADER.size - len(metadata_bytes))
+    category_index = b"".join(struct.pack(f"<{len(positions)}I", *positions) for positions in category_positions)
+
+    return b"".join([header, metadata_bytes, padding, *records, category_index, *blob_pieces])
+
+def write_quiz_pack(file_path, quiz_data, source_stat=None):
+    """
+    this function checks a quiz and saves it as a quiz pack file (atomically)
+
+    args:
+        file_path (str): the path of the pack file to write (example: "data/big_quiz.qpk")
+        quiz_data (dict): the quiz to save
+        source_stat (os.stat_result or None): the stat of the JSON file the quiz comes from
+
+    raises:
+        ValueError: if the quiz does not follow the quiz schema
+        OSError: if the file can not be written
+    """
+    errors = validate_quiz(quiz_data, fail_fast=True)
+
+    if errors:
+        raise ValueError(f"Invalid quiz: {format_error(errors[0])}")
+
+    atomic_write_bytes(file_path, build_quiz_pack(quiz_data, source_stat))
+
+class QuizPack(Sequence):
+    """
+    the questions of a quiz pack file, read through a memory map
+
+    opening a pack only reads the header and the metadata: the operating system loads the pages of the
+    file when they are touched, and a question is decoded into a dictionary only when it is asked for
+    (pack[i]), so even a bank with millions of questions opens almost instantly
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+        with open(file_path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if hasattr(self._map, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+            # questions are read in random order: no need to read ahead the pages around them
+            self._map.madvise(mmap.MADV_RANDOM)
+
+        try:
+            if len(self._map) < _HEADER.size:
+                raise ValueError(f"{file_path} is not a quiz pack")
+
+            magic, version, _, count, metadata_size, table_offset, blob_offset = _HEADER.unpack_from(self._map, 0)
+
+            if magic != PACK_MAGIC:
+                raise ValueError(f"{file_path} is not a quiz pack")
+            if version != PACK_VERSION:
+                raise ValueError(f"Unsupported quiz pack version {version} in {file_path}")
+            if blob_offset != table_offset + count * (_RECORD.size + _POSITION.size) or blob_offset > len(self._map):
+                raise ValueError(f"Damaged quiz pack: {file_path}")
+
+            self.metadata = json.loads(self._map[_HEADER.size:_HEADER.size + metadata_size])
+        except BaseException:
+            self._map.close()
+            raise
+
+        self._count = count
+        self._table_offset = table_offset
+        self._blob_offset = blob_offset
+        self._categories = self.metadata.get("categories", [])
+
+    def category_index(self):
+        """
+        this function gives back the positions of the questions of every category, read from the index
+        saved inside the pack (nothing is decoded or copied)
+
+        returns:
+            dict: category -> a sequence with the positions of its questions
+        """
+        index = {}
+        start = self._table_offset + self._count * _RECORD.size
+
+        for category, count in zip(self._categories, self.metadata.get("category_counts", [])):
+            index[category] = _PackPositions(self._map, start, count)
+            start += count * _POSITION.size
+
+        return index
+
+    def close(self):
+        """
+        this function releases the memory map
+        """
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError("question index out of range")
+
+        return self._decode_question(index)
+
+    def _decode_question(self, index):
+        """
+        this function decodes one question from its record and its texts
+
+        args:
+            index (int): the position of the question
+
+        returns:
+            dict: the question, with the same keys of the JSON format
+        """
+        (question_id, points, penalty, time_limit, correct_option, category_code,
+         option_count, flags, text_offset, text_size) = _RECORD.unpack_from(self._map, self._table_offset + index * _RECORD.size)
+
+        text_count = 2 + option_count + (1 if flags & _RECORD_HAS_EXTRAS else 0)
+        block_start = self._blob_offset + text_offset
+        lengths = struct.unpack_from(f"<{text_count}I", self._map, block_start)
+        position = block_start + text_count * _LENGTH.size
+        texts = []
+
+        for length in lengths:
+            texts.append(self._map[position:position + length].decode("utf-8"))
+            position += length
+
+        question = {
+            "id": question_id,
+            "question": texts[0],
+            "category": self._categories[category_code],
+            "options": texts[2:2 + option_count],
+            "correctOption": correct_option,
+            "explanation": texts[1],
+            "points": points,
+            "penalty": penalty,
+            "time_limit": time_limit
+        }
+
+        if flags & _RECORD_HAS_EXTRAS:
+            question.update(json.loads(texts[-1]))
+
+        return question
+
+class _PackPositions(Sequence):
+    """
+    the positions of the questions of one category, read from the memory map of a pack when asked
+    """
+    __slots__ = ("_map", "_start", "_count")
+
+    def __init__(self, pack_map, start, count):
+        self._map = pack_map
+        self._start = start
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+
+        if index < 0:
+            index += self._count
+
+        if not 0 <= index < self._count:
+            raise IndexError("position index out of range")
+
+        return _POSITION.unpack_from(self._map, self._start + index * _POSITION.size)[0]
+
+def open_quiz_pack(file_path):
+    """
+    this function opens a quiz pack for playing
+
+    args:
+        file_path (str): the path of the pack file
+
+    returns:
+        dict: the quiz, with "title", "difficulty" (and the other top level fields) and "questions" (a QuizPack)
+
+    raises:
+        OSError: if the file can not be opened
+        ValueError: if the file is not a valid quiz pack
+    """
+    return quiz_data_from_pack(QuizPack(file_path))
+
+def quiz_data_from_pack(pack):
+    """
+    this function builds the quiz to play from a pack that is already open
+
+    args:
+        pack (QuizPack): the open pack (it is closed by whoever plays the quiz)
+
+    returns:
+        dict: the quiz, with "title", "difficulty" (and the other top level fields) and "questions" (the pack)
+    """
+    quiz_data = {key: value for key, value in pack.metadata.items() if key not in ("categories", "category_counts", "source_size", "source_mtime_ns")}
+    quiz_data["questions"] = pack
+
+    return quiz_data
+
+def pack_to_quiz_dict(file_path):
+    """
+    this function reads a whole quiz pack back into the JSON quiz structure
+
+    args:
+        file_path (str): the path of the pack file
+
+    returns:
+        dict: the quiz, with a list of question dictionaries
+    """
+    quiz_data = open_quiz_pack(file_path)
+
+    with quiz_data["questions"] as pack:
+        quiz_data["questions"] = list(pack)
+
+    return quiz_data
+
+def get_pack_path(json_path):
+    """
+    this function gives back the path of the pack that goes with a JSON quiz file
+
+    args:
+        json_path (str): the path of the JSON quiz (example: "data/big_quiz.json")
+
+    returns:
+        str: the path of the pack (example: "data/big_quiz.qpk")
+    """
+    return os.path.splitext(json_path)[0] + PACK_EXTENSION
+
+def open_pack_if_up_to_date(pack_path, json_path):
+    """
+    this function opens the pack of a JSON quiz file, if it was exported from the current version of it
+
+    the pack is mapped only once: the same open pack is compared with the JSON file and given back
+
+    args:
+        pack_path (str): the path of the pack file
+        json_path (str): the path of the JSON quiz file
+
+    returns:
+        QuizPack or None: the open pack (the caller closes it), or None if there is no pack or the JSON
+                          file changed since the export
+    """
+    try:
+        json_stat = os.stat(json_path)
+        pack = QuizPack(pack_path)
+    except (OSError, ValueError):
+        return None
+
+    if pack.metadata.get("source_size") == json_stat.st_size and pack.metadata.get("source_mtime_ns") == json_stat.st_mtime_ns:
+        return pack
+
+    pack.close()
+
+    return None
+
+def export_quiz_pack(json_path, pack_path=None):
+    """
+    this function converts a JSON quiz file into a quiz pack
+
+    args:
+        json_path (str): the path of the JSON quiz file
+        pack_path (str or None): the path of the pack to write (None for the same name with '.qpk')
+
+    returns:
+        str: the path of the written pack
+
+    raises:
+        OSError: if a file can not be read or written
+        ValueError: if the JSON is not a valid quiz
+    """
+    pack_path = pack_path or get_pack_path(json_path)
+    source_stat = os.stat(json_path)
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        quiz_data = json.load(f)
+
+    write_quiz_pack(pack_path, quiz_data, source_stat)
+
+    return pack_path
+
+def import_quiz_pack(pack_path, json_path=None):
+    """
+    this function converts a quiz pack back into a JSON quiz file (written like the quiz creator does)
+
+    args:
+        pack_path (str): the path of the pack file
+        json_path (str or None): the path of the JSON file to write (None for the same name with '.json')
+
+    returns:
+        str: the path of the written JSON file
+    """
+    json_path = json_path or os.path.splitext(pack_path)[0] + ".json"
+    atomic_write_json(json_path, pack_to_quiz_dict(pack_path), indent=4)
+
+    return json_path
+
+def main():
+    """
+    this function is the command line entry point of the module:
+    'python -m src.quiz_pack export data/quiz.json' and 'python -m src.quiz_pack import data/quiz.qpk'
+    """
+    parser = argparse.ArgumentParser(description="Convert quizzes between JSON and the quiz pack binary format.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export_parser = subparsers.add_parser("export", help="write a .qpk pack from a JSON quiz")
+    export_parser.add_argument("source", help="the JSON quiz file")
+    export_parser.add_argument("target", nargs="?", default=None, help="the pack to write (default: same name, .qpk)")
+    import_parser = subparsers.add_parser("import", help="write a JSON quiz from a .qpk pack")
+    import_parser.add_argument("source", help="the pack file")
+    import_parser.add_argument("target", nargs="?", default=None, help="the JSON file to write (default: same name, .json)")
+    arguments = parser.parse_args()
+
+    try:
+        if arguments.command == "export":
+            target = export_quiz_pack(arguments.source, arguments.target)
+        else:
+            target = import_quiz_pack(arguments.source, arguments.target)
+    except (OSError, ValueError) as e:
+        print(color_red(f"[ERROR] Could not convert {arguments.source}: {e}"))
+        sys.exit(1)
+
+    print(color_green(f"[SUCCESS] Written {target}"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+from collections import namedtuple
+from src.compact_quiz import CompactQuestion, CompactQuestionBank
+
+# one problem found by the validator: 'path' tells where (example: "questions[3].correctOption")
+SchemaError = namedtuple("SchemaError", ["path", "message"])
+
+# the python types accepted for every schema type
+TYPE_CHECKS = {
+    "object": (dict, CompactQuestion),
+    "array": (list, CompactQuestionBank),
+    "string": (str,),
+    "integer": (int,)
+}
+
+# the single description of a valid question, shared by the quiz files and the AI generator
+QUESTION_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "question": {"type": "string"},
+        "options": {"type": "array", "min_items": 2, "items": {"type": "string"}},
+        "id": {"type": "integer"},
+        "correctOption": {"type": "integer", "index_of": "options"},
+        "explanation": {"type": "string"},
+        "points": {"type": "integer"},
+        "penalty": {"type": "integer"},
+        "time_limit": {"type": "integer", "minimum": 0},
+        "category": {"type": "string"}
+    }
+}
+
+QUIZ_SCHEMA = {
+    "type": "object",
+    "fields": {
+        "title": {"type": "string"},
+        "difficulty": {"type": "string"},
+        "questions": {"type": "array", "min_items": 1, "items": QUESTION_SCHEMA}
+    }
+}
+
+def _join_path(path, key):
+    """
+    this function adds a key or an index to an error path (it is only called when an error is found)
+
+    args:
+        path (str or _LazyPath): the path of the container ("" for the root)
+        key (str or int or None): the key of an object field, the index of an array item, or None
+
+    returns:
+        str: the joined path (example: "questions[3].points")
+    """
+    path = str(path)
+
+    if key is None:
+        return path
+    if isinstance(key, int):
+        return f"{path}[{key}]"
+
+    return f"{path}.{key}" if path else key
+
+class _LazyPath:
+    """
+    the path of a container, turned into a string only if one of its children has an error
+    """
+    __slots__ = ("_path", "_key")
+
+    def __init__(self, path, key):
+        self._path = path
+        self._key = key
+
+    def __str__(self):
+        return _join_path(self._path, self._key)
+
+def _compile_field(schema):
+    """
+    this function prepares one field of an object schema
+
+    scalar fields are checked inline by the object (no function call per field), the other fields get
+    their own compiled check
+
+    args:
+        schema (dict): the schema of the field
+
+    returns:
+        tuple: (accepted_types, type_message, minimum, check), where check is None for scalar fields
+    """
+    check = compile_schema(schema) if schema["type"] in ("object", "array") else None
+
+    return (TYPE_CHECKS[schema["type"]], f"must be of type {schema['type']}", schema.get("minimum"), check)
+
+def compile_schema(schema):
+    """
+    this function turns a declarative schema into a validation function, once
+
+    every rule of the schema becomes a small closure, so validating a value never reads the schema
+    dictionaries again and the error paths are turned into strings only when an error is found
+
+    args:
+        schema (dict): the schema, with "type" and optionally "fields", "items", "min_items", "minimum", "index_of"
+
+    returns:
+        callable: a function check(value, path, key, errors, fail_fast) that appends the SchemaError
+                  found to 'errors' and returns true if the value is valid
+    """
+    schema_type = schema["type"]
+    accepted_types = TYPE_CHECKS[schema_type]
+    type_message = f"must be of type {schema_type}"
+
+    if schema_type == "object":
+        field_schemas = schema.get("fields", {})
+        fields = [(key,) + _compile_field(field_schema) for key, field_schema in field_schemas.items()]
+        index_checks = [(key, field_schema["index_of"]) for key, field_schema in field_schemas.items() if "index_of" in field_schema]
+
+        def check_object(value, path, key, errors, fail_fast):
+            if not isinstance(value, accepted_types):
+                errors.append(SchemaError(_join_path(path, key), type_message))
+                return False
+
+            object_path = None
+            valid = True
+
+            for field_key, field_types, field_message, minimum, check_field in fields:
+                try:
+                    field_value = value[field_key]
+                except KeyError:
+                    object_path = object_path or _LazyPath(path, key)
+                    errors.append(SchemaError(_join_path(object_path, field_key), "is missing"))
+                else:
+                    if check_field is None:
+                        if isinstance(field_value, field_types):
+                            if minimum is None or field_value >= minimum:
+                                continue
+
+                            field_message = f"must be at least {minimum}"
+
+                        object_path = object_path or _LazyPath(path, key)
+                        errors.append(SchemaError(_join_path(object_path, field_key), field_message))
+                    else:
+                        object_path = object_path or _LazyPath(path, key)
+
+                        if check_field(field_value, object_path, field_key, errors, fail_fast):
+                            continue
+
+                valid = False
+
+                if fail_fast:
+                    return False
+
+            # cross-field rules, checked only when the fields themselves are fine
+            if valid:
+                for field_key, list_key in index_checks:
+                    if not 0 <= value[field_key] < len(value[list_key]):
+                        object_path = object_path or _LazyPath(path, key)
+                        errors.append(SchemaError(_join_path(object_path, field_key), f"must be a valid index of '{list_key}'"))
+                        valid = False
+
+                        if fail_fast:
+                            return False
+
+            return valid
+
+        return check_object
+
+    if schema_type == "array":
+        min_items = schema.get("min_items", 0)
+        length_message = f"must contain at least {min_items} items"
+        item_schema = schema.get("items")
+        check_item = compile_schema(item_schema) if item_schema is not None else None
+        # arrays of plain values (like the options) are first checked with a single fast loop
+        scalar_types = TYPE_CHECKS[item_schema["type"]] if item_schema is not None and item_schema["type"] not in ("object", "array") and "minimum" not in item_schema else None
+
+        def check_array(value, path, key, errors, fail_fast):
+            if not isinstance(value, accepted_types):
+                errors.append(SchemaError(_join_path(path, key), type_message))
+                return False
+
+            valid = True
+
+            if len(value) < min_items:
+                errors.append(SchemaError(_join_path(path, key), length_message))
+
+                if fail_fast:
+                    return False
+
+                valid = False
+
+            if check_item is None:
+                return valid
+
+            if scalar_types is not None:
+                for item in value:
+                    if not isinstance(item, scalar_types):
+                        break
+                else:
+                    return valid
+
+            array_path = _LazyPath(path, key)
+
+            for index, item in enumerate(value):
+                if not check_item(item, array_path, index, errors, fail_fast):
+                    valid = False
+
+                    if fail_fast:
+                        return False
+
+            return valid
+
+        return check_array
+
+    minimum = schema.get("minimum")
+
+    def check_scalar(value, path, key, errors, fail_fast):
+        if not isinstance(value, accepted_types):
+            errors.append(SchemaError(_join_path(path, key), type_message))
+            return False
+
+        if minimum is not None and value < minimum:
+            errors.append(SchemaError(_join_path(path, key), f"must be at least {minimum}"))
+            return False
+
+        return True
+
+    return check_scalar
+
+_check_quiz = compile_schema(QUIZ_SCHEMA)
+_check_question = compile_schema(QUESTION_SCHEMA)
+
+def _finish_errors(errors):
+    """
+    this function turns the lazy paths of the errors into plain strings
+
+    args:
+        errors (list[SchemaError]): the errors collected by a compiled check
+
+    returns:
+        list[SchemaError]: the same errors, with string paths
+    """
+    return [SchemaError(str(error.path) or "$", error.message) for error in errors]
+
+def validate_quiz(data, fail_fast=False):
+    """
+    this function checks a whole quiz against QUIZ_SCHEMA in a single pass
+
+    args:
+        data (any): the quiz to check (usually the dictionary loaded from a JSON file)
+        fail_fast (bool): if true the check stops at the first error, otherwise every error is collected
+
+    returns:
+        list[SchemaError]: the errors found, with their path. an empty list means the quiz is valid
+    """
+    errors = []
+    _check_quiz(data, "", None, errors, fail_fast)
+
+    return _finish_errors(errors)
+
+def validate_question(question, path="question", fail_fast=False):
+    """
+    this function checks a single question against QUESTION_SCHEMA
+
+    args:
+        question (any): the question to check
+        path (str): the path used in the error messages (example: "questions[3]")
+        fail_fast (bool): if true the check stops at the first error, otherwise every error is collected
+
+    returns:
+        list[SchemaError]: the errors found, with their path. an empty list means the question is valid
+    """
+    errors = []
+    _check_question(question, path, None, errors, fail_fast)
+
+    return _finish_errors(errors)
+
+def format_error(error):
+    """
+    this function builds a readable message for one validation error
+
+    args:
+        error (SchemaError): the error
+
+    returns:
+        str: the message (example: "questions[3].points: must be of type integer")
+    """
+    return f"{error.path}: {error.message}"
@@ -0,0 +1,609 @@
+import codecs
+import json
+import os
+import random
+import re
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from src.file_utils import atomic_write_bytes
+from src.quiz_schema import format_error, validate_question
+
+LARGE_QUIZ_SIZE = 32 * 1024 * 1024 # quiz files bigger than this are streamed instead of loaded whole
+STREAM_CHUNK_SIZE = 64 * 1024 # bytes read from the file at a time
+MAX_ITEM_SIZE = 16 * 1024 * 1024 # the biggest single value (a question) the parser keeps waiting for
+SHUFFLE_WINDOW = 256 # questions kept in memory to mix the order of a file read for the first time
+
+OFFSETS_SUFFIX = ".offsets"
+OFFSETS_VERSION = 1
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+class QuizStreamParser:
+    """
+    a push-based, incremental parser for the JSON text of a quiz
+
+    the text is given in pieces with feed() (they can be cut anywhere) and the parser gives back events
+    as soon as they are complete:
+    - ("field", key, value) for every top level field that is not the questions list (title, difficulty...)
+    - ("question", index, question, start_byte, end_byte) for every item of the "questions" list
+
+    only the piece of text that is not parsed yet is kept in memory, so a quiz of any size is read with a
+    small window. the byte positions are counted in UTF-8, so they can be used to seek inside the file.
+    any text before the first '{' is skipped (for example the ```json fence of an AI answer).
+    'last_events' has the events completed by the last feed() or close(), also when it raised ValueError
+    """
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._byte_offset = 0 # UTF-8 offset of buffer[_position] from the start of the stream
+        self._state = "start"
+        self._key = None
+        self._question_index = 0
+        self.last_events = []
+
+    @property
+    def done(self):
+        """
+        true when the closing '}' of the quiz was parsed
+        """
+        return self._state == "done"
+
+    def feed(self, text):
+        """
+        this function adds a piece of text and parses as much of it as possible
+
+        args:
+            text (str): the next piece of the JSON text
+
+        returns:
+            list[tuple]: the events completed by this piece
+
+        raises:
+            ValueError: if the text is not a valid quiz JSON object
+        """
+        self._buffer = self._buffer[self._position:] + text
+        self._position = 0
+
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        this function tells the parser that the text is over
+
+        returns:
+            list[tuple]: the last events
+
+        raises:
+            ValueError: if the JSON text is incomplete
+        """
+        events = self._parse(final=True)
+
+        if self._state != "done":
+            raise ValueError("Unexpected end of the quiz data")
+
+        return events
+
+    def _advance(self, new_position):
+        """
+        this function moves the parse position forward, counting the UTF-8 bytes that were passed
+        """
+        segment = self._buffer[self._position:new_position]
+        self._byte_offset += len(segment) if segment.isascii() else len(segment.encode("utf-8"))
+        self._position = new_position
+
+    def _skip_whitespace(self):
+        """
+        this function moves the parse position after the spaces and the newlines (they are all 1 byte)
+        """
+        end = _WHITESPACE.match(self._buffer, self._position).end()
+        self._byte_offset += end - self._position
+        self._position = end
+
+    def _decode_value(self, final):
+        """
+        this function decodes the JSON value that starts at the parse position
+
+        args:
+            final (bool): true if no more text will come
+
+        returns:
+            tuple or None: (value, end_position), or None if the value is not complete yet
+        """
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._position)
+        except json.JSONDecodeError as e:
+            if final:
+                raise ValueError(f"Invalid quiz data at byte {self._byte_offset}: {e.msg}") from None
+            if len(self._buffer) - self._position > MAX_ITEM_SIZE:
+                raise ValueError(f"A value of the quiz data is bigger than {MAX_ITEM_SIZE} bytes") from None
+            return None
+
+        # a number at the very end of the text could still go on in the next piece
+        if end == len(self._buffer) and not final and isinstance(value, (int, float)):
+            return None
+
+        return value, end
+
+    def _parse(self, final):
+        """
+        this function runs the parser state machine over the buffered text
+
+        args:
+            final (bool): true if no more text will come
+
+        returns:
+            list[tuple]: the completed events
+        """
+        events = self.last_events = []
+        buffer = self._buffer
+
+        while self._position < len(buffer):
+            state = self._state
+
+            if state == "done":
+                break
+
+            if state == "start":
+                start = buffer.find("{", self._position)
+
+                if start < 0:
+                    self._advance(len(buffer))
+                    break
+
+                self._advance(start + 1)
+                self._state = "key"
+                continue
+
+            self._skip_whitespace()
+
+            if self._position >= len(buffer):
+                break
+
+            character = buffer[self._position]
+
+            if state == "key":
+                if character == "}":
+                    self._advance(self._position + 1)
+                    self._state = "done"
+                elif character == ",":
+                    self._advance(self._position + 1)
+                elif character == '"':
+                    decoded = self._decode_value(final)
+
+                    if decoded is None:
+                        break
+
+                    self._key, end = decoded
+                    self._advance(end)
+                    self._state = "colon"
+                else:
+                    raise ValueError(f"Invalid quiz data at byte {self._byte_offset}: expected a key")
+
+            elif state == "colon":
+                if character != ":":
+                    raise ValueError(f"Invalid quiz data at byte {self._byte_offset}: expected ':'")
+
+                self._advance(self._position + 1)
+                self._state = "value"
+
+            elif state == "value":
+                if self._key == "questions" and character == "[":
+                    self._advance(self._position + 1)
+                    self._state = "questions"
+                    continue
+
+                decoded = self._decode_value(final)
+
+                if decoded is None:
+                    break
+
+                value, end = decoded
+                self._advance(end)
+                events.append(("field", self._key, value))
+                self._state = "key"
+
+            elif state == "questions":
+                if character == ",":
+                    self._advance(self._position + 1)
+                elif character == "]":
+                    self._advance(self._position + 1)
+                    self._state = "key"
+                else:
+                    decoded = self._decode_value(final)
+
+                    if decoded is None:
+                        break
+
+                    question, end = decoded
+                    start_byte = self._byte_offset
+                    self._advance(end)
+                    events.append(("question", self._question_index, question, start_byte, self._byte_offset))
+                    self._question_index += 1
+
+        return events
+
+def iter_quiz_events(file_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    this function reads a quiz file a piece at a time and gives back the parser events
+
+    args:
+        file_path (str): the path of the JSON quiz file
+        chunk_size (int): the number of bytes read at a time
+
+    yields:
+        tuple: the events of QuizStreamParser, in file order
+
+    raises:
+        OSError: if the file can not be read
+        ValueError: if the file is not a valid quiz JSON object
+    """
+    parser = QuizStreamParser()
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+
+            if not chunk:
+                break
+
+            yield from parser.feed(decoder.decode(chunk))
+
+    yield from parser.feed(decoder.decode(b"", final=True))
+    yield from parser.close()
+
+def _get_offsets_path(file_path):
+    """
+    this function gives back the path of the offset index of a quiz file
+
+    args:
+        file_path (str): the path of the JSON quiz file
+
+    returns:
+        str: the path of the index (example: "data/big_quiz.json.offsets")
+    """
+    return f"{file_path}{OFFSETS_SUFFIX}"
+
+def _save_offset_index(file_path, file_stat, header, offsets):
+    """
+    this function writes the offset index next to the quiz file
+
+    the index is a JSON header line followed by the (start, end) byte positions of every question as
+    64 bit integers
+
+    args:
+        file_path (str): the path of the JSON quiz file
+        file_stat (os.stat_result): the stat of the quiz file when it was read
+        header (dict): the top level fields of the quiz (title, difficulty)
+        offsets (array): the start and end byte of every question, one after the other
+    """
+    index_header = {
+        "version": OFFSETS_VERSION,
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "count": len(offsets) // 2,
+        "byteorder": sys.byteorder,
+        "title": header.get("title"),
+        "difficulty": header.get("difficulty")
+    }
+
+    try:
+        atomic_write_bytes(_get_offsets_path(file_path), json.dumps(index_header).encode("utf-8") + b"\n" + offsets.tobytes())
+    except OSError:
+        # the index is only a cache: without it the file is simply parsed again
+        pass
+
+def load_offset_index(file_path):
+    """
+    this function loads the offset index of a quiz file, if it is still up to date
+
+    args:
+        file_path (str): the path of the JSON quiz file
+
+    returns:
+        dict or None: "count", "title", "difficulty" and "offsets" (an array with the start and end byte of
+                      every question), or None if the index is missing or the quiz file changed
+    """
+    try:
+        file_stat = os.stat(file_path)
+
+        with open(_get_offsets_path(file_path), "rb") as f:
+            index = json.loads(f.readline())
+            raw_offsets = f.read()
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(index, dict) or index.get("version") != OFFSETS_VERSION:
+        return None
+
+    if index.get("size") != file_stat.st_size or index.get("mtime_ns") != file_stat.st_mtime_ns:
+        return None
+
+    offsets = array("Q")
+
+    if len(raw_offsets) != index["count"] * 2 * offsets.itemsize:
+        return None
+
+    offsets.frombytes(raw_offsets)
+
+    if index.get("byteorder") != sys.byteorder:
+        offsets.byteswap()
+
+    index["offsets"] = offsets
+
+    return index
+
+def build_offset_index(file_path):
+    """
+    this function reads a whole quiz file once (a piece at a time) and saves its offset index
+
+    args:
+        file_path (str): the path of the JSON quiz file
+
+    returns:
+        dict: the index, like load_offset_index
+
+    raises:
+        OSError: if the file can not be read
+        ValueError: if the file is not a valid quiz JSON object
+    """
+    file_stat = os.stat(file_path)
+    header = {}
+    offsets = array("Q")
+
+    for event in iter_quiz_events(file_path):
+        if event[0] == "question":
+            offsets.append(event[3])
+            offsets.append(event[4])
+        elif event[1] in ("title", "difficulty"):
+            header[event[1]] = event[2]
+
+    _save_offset_index(file_path, file_stat, header, offsets)
+
+    return {"count": len(offsets) // 2, "title": header.get("title"), "difficulty": header.get("difficulty"), "offsets": offsets}
+
+def read_question_at(quiz_file, index, position):
+    """
+    this function reads one question of a quiz file, using the offset index to jump right to it
+
+    args:
+        quiz_file (file): the quiz file, open in binary mode
+        index (dict): the offset index of the file (see load_offset_index)
+        position (int): the position of the question in the "questions" list
+
+    returns:
+        dict: the question
+    """
+    start = index["offsets"][2 * position]
+    end = index["offsets"][2 * position + 1]
+    quiz_file.seek(start)
+
+    return json.loads(quiz_file.read(end - start))
+
+def sample_questions(file_path, count, rng=None):
+    """
+    this function picks random questions of a quiz file without loading the whole file
+
+    the offset index is built the first time (one pass over the file), then only the chosen questions
+    are read
+
+    args:
+        file_path (str): the path of the JSON quiz file
+        count (int): the number of questions to pick (all of them if the quiz has fewer)
+        rng (random.Random or None): the random generator
+
+    returns:
+        list[dict]: the chosen questions, in random order
+    """
+    index = load_offset_index(file_path) or build_offset_index(file_path)
+    positions = (rng or random).sample(range(index["count"]), min(count, index["count"]))
+
+    with open(file_path, "rb") as f:
+        return [read_question_at(f, index, position) for position in positions]
+
+class QuestionSource(ABC):
+    """
+    the base of the question lists that are read while they are played (from a file, from the AI...)
+
+    run_quiz plays them one question at a time, in the order they are given. 'count' is the total of the
+    questions, None while it is not known yet. every question is validated when it arrives: the invalid
+    ones are skipped and counted in 'skipped'. 'error' keeps the reason when the questions stopped early
+    """
+
+    def __init__(self, validate=True):
+        self.validate = validate
+        self.skipped = 0
+        self.errors = []
+        self.count = None
+        self.error = None
+
+    @abstractmethod
+    def __iter__(self):
+        """
+        this function gives back the questions one at a time; when they stop early (example: the file
+        became unreadable) it sets 'error' and ends instead of raising
+        """
+
+    def _accept(self, question, position):
+        """
+        this function validates a question that just arrived
+
+        returns:
+            bool: true if the question can be played
+        """
+        if not self.validate:
+            return True
+
+        errors = validate_question(question, f"questions[{position}]", fail_fast=True)
+
+        if errors:
+            self.skipped += 1
+            self.errors.append(format_error(errors[0]))
+            return False
+
+        return True
+
+class QuestionStream(QuestionSource):
+    """
+    the questions of a quiz file, read one at a time while they are played
+
+    with an up to date offset index, the questions are read in random order by jumping to their byte
+    position. without it, the file is parsed from the start (mixed inside a window of SHUFFLE_WINDOW
+    questions) and the index is saved at the end, so the next game can jump directly
+    """
+
+    def __init__(self, file_path, shuffle=True, rng=None, validate=True, index=None):
+        super().__init__(validate)
+        self.file_path = file_path
+        self.shuffle = shuffle
+        self.rng = rng or random.Random()
+
+        self._index = index if index is not None else load_offset_index(file_path)
+        self.count = self._index["count"] if self._index is not None else None # None until the whole file was read once
+
+    def read_questions(self, positions):
+        """
+        this function reads only the questions at the given positions, jumping to them with the offset
+        index (the index is built first if the file was never read)
+
+        args:
+            positions (iterable[int]): the positions of the questions in the file
+
+        returns:
+            list[dict]: the valid questions, in the order of the positions
+        """
+        index = self._index or load_offset_index(self.file_path) or build_offset_index(self.file_path)
+        self._index = index
+        self.count = index["count"]
+        questions = []
+
+        with open(self.file_path, "rb") as f:
+            for position in positions:
+                question = read_question_at(f, index, position)
+
+                if self._accept(question, position):
+                    questions.append(question)
+
+        return questions
+
+    def __iter__(self):
+        try:
+            index = self._index or load_offset_index(self.file_path)
+
+            if index is not None:
+                yield from self._iter_indexed(index)
+            else:
+                yield from self._iter_parsed()
+        except (OSError, ValueError) as e:
+            # the file was changed, cut or removed during the game: the questions stop here
+            self.error = f"[ERROR] The quiz file {self.file_path} could not be read anymore: {e}"
+
+    def _iter_indexed(self, index):
+        """
+        this function gives back the questions by jumping to their byte position
+        """
+        self.count = index["count"]
+        order = array("Q", range(index["count"]))
+
+        if self.shuffle:
+            self.rng.shuffle(order)
+
+        with open(self.file_path, "rb") as f:
+            for position in order:
+                question = read_question_at(f, index, position)
+
+                if self._accept(question, position):
+                    yield question
+
+    def _iter_parsed(self):
+        """
+        this function parses the file from the start, gives back the questions as soon as they are complete
+        and saves the offset index when the whole file was read
+        """
+        file_stat = os.stat(self.file_path)
+        header = {}
+        offsets = array("Q")
+        window = []
+        window_size = 1 # grows up to SHUFFLE_WINDOW while the game runs
+
+        for event in iter_quiz_events(self.file_path):
+            if event[0] == "field":
+                if event[1] in ("title", "difficulty"):
+                    header[event[1]] = event[2]
+                continue
+
+            _, position, question, start_byte, end_byte = event
+            offsets.append(start_byte)
+            offsets.append(end_byte)
+
+            if not self._accept(question, position):
+                continue
+
+            if not self.shuffle:
+                yield question
+                continue
+
+            window.append(question)
+
+            # the first question is given right away, then two questions are read for every one played
+            # until the window is full: the game starts at once and the order gets more mixed as it goes
+            if len(window) >= window_size:
+                yield self._pop_random(window)
+                window_size = min(SHUFFLE_WINDOW, window_size + 1)
+
+        while window:
+            yield self._pop_random(window)
+
+        self.count = len(offsets) // 2
+        _save_offset_index(self.file_path, file_stat, header, offsets)
+
+    def _pop_random(self, window):
+        """
+        this function takes a random question out of the window (swapping it with the last one)
+        """
+        position = self.rng.randrange(len(window))
+        window[position], window[-1] = window[-1], window[position]
+
+        return window.pop()
+
+def open_quiz_stream(file_path, shuffle=True, rng=None):
+    """
+    this function opens a quiz file for streaming play: only the title and the difficulty are read now,
+    the questions are read while they are played
+
+    args:
+        file_path (str): the path of the JSON quiz file
+        shuffle (bool): if true the questions come in random order
+        rng (random.Random or None): the random generator
+
+    returns:
+        dict: the quiz, with "title", "difficulty" and "questions" (a QuestionStream)
+
+    raises:
+        OSError: if the file can not be read
+        ValueError: if the file is not a valid quiz JSON object
+    """
+    index = header = load_offset_index(file_path)
+
+    if header is None:
+        header = {}
+
+        # the fields written before the questions are enough to start
+        for event in iter_quiz_events(file_path):
+            if event[0] == "question":
+                break
+
+            header[event[1]] = event[2]
+
+        if not isinstance(header.get("title"), str):
+            # the title comes after the questions: one full pass, saved in the offset index
+            index = header = build_offset_index(file_path)
+
+    return {
+        "title": header.get("title"),
+        "difficulty": header.get("difficulty"),
+        "questions": QuestionStream(file_path, shuffle=shuffle, rng=rng, index=index)
+    }
@@ -0,0 +1,180 @@
+import random
+from array import array
+from src.quiz_stream import QuestionStream
+
+def build_category_index(questions):
+    """
+    this function gives back the positions of the questions of every category
+
+    quiz packs and compact banks keep this index ready (so nothing is decoded), for a plain list it is
+    built with one pass over the questions
+
+    args:
+        questions (sequence): the questions of a quiz (list, CompactQuestionBank or QuizPack)
+
+    returns:
+        dict: category -> a sequence with the positions of its questions
+    """
+    if hasattr(questions, "category_index"):
+        return questions.category_index()
+
+    index = {}
+
+    for position, question in enumerate(questions):
+        index.setdefault(question["category"], array("I")).append(position)
+
+    return index
+
+def allocate_quotas(sizes, count):
+    """
+    this function splits 'count' draws among groups, proportionally to their size (largest remainder
+    method), so the drawn questions keep the same category mix of the whole quiz
+
+    args:
+        sizes (dict): group -> number of questions in the group
+        count (int): the number of questions to draw
+
+    returns:
+        dict: group -> number of questions to draw from it (never more than its size)
+    """
+    total = sum(sizes.values())
+    count = min(count, total)
+
+    if total == 0:
+        return {group: 0 for group in sizes}
+
+    quotas = {group: size * count // total for group, size in sizes.items()}
+    missing = count - sum(quotas.values())
+    # the groups that lost the biggest fraction get one more question
+    by_remainder = sorted(sizes, key=lambda group: (sizes[group] * count % total, sizes[group]), reverse=True)
+
+    for group in by_remainder:
+        if missing == 0:
+            break
+        if quotas[group] < sizes[group]:
+            quotas[group] += 1
+            missing -= 1
+
+    return quotas
+
+def stratified_positions(category_index, count, rng=None):
+    """
+    this function picks random positions keeping the category mix (O(count), the categories are not copied)
+
+    args:
+        category_index (dict): category -> sequence of positions (see build_category_index)
+        count (int): the number of positions to pick
+        rng (random.Random or None): the random generator
+
+    returns:
+        list[int]: the chosen positions, grouped by category (the game shuffles them anyway)
+    """
+    rng = rng or random
+    quotas = allocate_quotas({category: len(positions) for category, positions in category_index.items()}, count)
+    chosen = []
+
+    for category, positions in category_index.items():
+        chosen.extend(positions[i] for i in rng.sample(range(len(positions)), quotas[category]))
+
+    return chosen
+
+def reservoir_sample(items, count, rng=None):
+    """
+    this function picks 'count' random items from an iterable of unknown length, keeping only 'count'
+    items in memory (reservoir sampling, algorithm R)
+
+    args:
+        items (iterable): the items (example: a QuestionStream read for the first time)
+        count (int): the number of items to pick
+        rng (random.Random or None): the random generator
+
+    returns:
+        list: the chosen items (all of them if there are fewer than 'count')
+    """
+    rng = rng or random
+    reservoir = []
+
+    for seen, item in enumerate(items):
+        if seen < count:
+            reservoir.append(item)
+        else:
+            slot = rng.randrange(seen + 1)
+
+            if slot < count:
+                reservoir[slot] = item
+
+    return reservoir
+
+def _draw_from_stream(stream, count, rng, stratify):
+    """
+    this function draws questions from a QuestionStream
+
+    with a known size the positions are sampled and only those questions are read. a stratified draw has
+    to see every category first: it keeps one reservoir of at most 'count' questions per category
+    """
+    if not stratify:
+        if stream.count is None:
+            return reservoir_sample(stream, count, rng)
+
+        return stream.read_questions(rng.sample(range(stream.count), min(count, stream.count)))
+
+    reservoirs = {}
+    sizes = {}
+
+    for question in stream:
+        category = question["category"]
+        seen = sizes.get(category, 0)
+        sizes[category] = seen + 1
+        reservoir = reservoirs.setdefault(category, [])
+
+        if seen < count:
+            reservoir.append(question)
+        else:
+            slot = rng.randrange(seen + 1)
+
+            if slot < count:
+                reservoir[slot] = question
+
+    quotas = allocate_quotas(sizes, count)
+    drawn = []
+
+    for category, reservoir in reservoirs.items():
+        drawn.extend(rng.sample(reservoir, quotas[category]))
+
+    return drawn
+
+def draw_questions(quiz_data, count, rng=None, stratify=False):
+    """
+    this function gives back a copy of the quiz with only 'count' random questions (the "draw N" mode)
+
+    the rest of the questions is never copied nor shuffled: the positions are drawn with
+    random.sample(range(n), count), or with the category index when 'stratify' is true, and only the
+    drawn questions are read (and decoded, for a quiz pack). a stream read for the first time uses
+    reservoir sampling
+
+    args:
+        quiz_data (dict): the quiz
+        count (int): the number of questions to draw (all of them if the quiz has fewer)
+        rng (random.Random or None): the random generator
+        stratify (bool): if true every category gets a share of the questions proportional to its size
+
+    returns:
+        dict: the same quiz with a list of the drawn questions
+    """
+    rng = rng or random
+    questions = quiz_data["questions"]
+
+    if isinstance(questions, QuestionStream):
+        drawn = _draw_from_stream(questions, count, rng, stratify)
+    else:
+        if stratify:
+            positions = stratified_positions(build_category_index(questions), count, rng)
+        else:
+            positions = rng.sample(range(len(questions)), min(count, len(questions)))
+
+        drawn = [questions[position] for position in positions]
+
+    drawn_quiz = dict(quiz_data)
+    drawn_quiz["questions"] = drawn
+
+    return drawn_quiz
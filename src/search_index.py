@@ -0,0 +1,525 @@
+import bisect
+import heapq
+import json
+import math
+import mmap
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from itertools import accumulate
+from src.file_utils import atomic_write_bytes
+
+SEARCH_INDEX_FILENAME = ".search"
+SEARCH_INDEX_MAGIC = b"QZSI"
+SEARCH_INDEX_VERSION = 2
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2.0 # a match in the quiz title counts twice as much as a match in a question
+PREFIX_WEIGHT = 0.5 # a word that only starts with the searched word counts half
+MIN_PREFIX_LENGTH = 2 # shorter words are only matched exactly
+MAX_PREFIX_TERMS = 64 # the most words a single prefix can expand to
+
+# header: magic, version, flags, metadata size, word count, document count, posting count, text size
+_HEADER = struct.Struct("<4sHHQQQQQ")
+
+_TOKEN = re.compile(r"\w+")
+
+def tokenize(text):
+    """
+    this function splits a text into lowercase words (letters, digits and '_' in any language)
+
+    args:
+        text (str): the text to split
+
+    returns:
+        list[str]: the words (example: "What's Python?" -> ["what", "s", "python"])
+    """
+    return _TOKEN.findall(text.casefold())
+
+def _align(size, alignment=8):
+    """
+    this function rounds a size up to a multiple of 'alignment' (the columns are read at aligned offsets)
+    """
+    return (size + alignment - 1) // alignment * alignment
+
+def _get_layout(metadata_size, term_count, document_count, posting_count):
+    """
+    this function gives back where every part of an index file starts, after the header and the metadata:
+    the word offsets and the posting starts (term_count + 1 uint64 each), the length and the text end of
+    every document (uint32), the slot, document and count of every posting (uint32), the words (UTF-8)
+    and the question texts (UTF-8)
+
+    returns:
+        dict: part name -> (start, end) byte offsets
+    """
+    sizes = [
+        ("term_offsets", (term_count + 1) * 8),
+        ("posting_starts", (term_count + 1) * 8),
+        ("lengths", document_count * 4),
+        ("text_ends", document_count * 4),
+        ("posting_slots", posting_count * 4),
+        ("posting_documents", posting_count * 4),
+        ("posting_counts", posting_count * 4)
+    ]
+    layout = {}
+    position = _align(_HEADER.size + metadata_size)
+
+    for name, size in sizes:
+        layout[name] = (position, position + size)
+        position += size
+
+    layout["words"] = (position, None) # its size is the last word offset
+    return layout
+
+def build_search_segment(quiz_data, content_hash=None):
+    """
+    this function builds the search segment of one quiz: a small inverted index of its texts
+
+    document 0 is the title, document i + 1 is the question at position i (its text, options and
+    explanation)
+
+    args:
+        quiz_data (dict): a valid quiz
+        content_hash (str or None): the sha256 of the quiz, used to know when the segment is out of date
+
+    returns:
+        dict: "sha256", "title", "lengths" (the number of words of every document), "texts" (the text shown
+              for every document: the title, then the question texts) and "terms" (word -> [document,
+              count, document, count, ...])
+    """
+    terms = {}
+    lengths = []
+    texts = [quiz_data["title"]]
+    texts.extend(question["question"] for question in quiz_data["questions"])
+    documents = [quiz_data["title"]]
+    documents.extend(" ".join([question["question"], *question["options"], question["explanation"]]) for question in quiz_data["questions"])
+
+    for document, text in enumerate(documents):
+        words = tokenize(text)
+        lengths.append(len(words))
+
+        for word, count in Counter(words).items():
+            postings = terms.get(word)
+
+            if postings is None:
+                terms[word] = [document, count]
+            else:
+                postings.append(document)
+                postings.append(count)
+
+    return {"sha256": content_hash, "title": quiz_data["title"], "lengths": lengths, "texts": texts, "terms": terms}
+
+def build_search_index(old_index, updates):
+    """
+    this function builds the content of a search index file: the quizzes of an old index plus the changes
+
+    every quiz has a slot. a changed quiz is written again in its own slot, a removed quiz leaves its slot
+    empty (the next new quiz takes it) and a new quiz gets an empty slot or a new one at the end. the
+    postings of every word are sorted by slot, so the postings of the quizzes that did not change are
+    copied as whole slices of the old file, without looking at them one by one
+
+    args:
+        old_index (SearchIndex or None): the index to start from (None to start from nothing)
+        updates (dict): filename -> its new segment (see build_search_segment), or None to remove it
+
+    returns:
+        bytes: the content of the index file (see SearchIndex)
+    """
+    slots = [dict(slot) if slot is not None else None for slot in old_index.slots] if old_index is not None else []
+    slot_numbers = {slot["filename"]: number for number, slot in enumerate(slots) if slot is not None}
+    changed = {} # slot -> its new segment (None for a removed quiz)
+
+    for filename, segment in updates.items():
+        if segment is None and filename in slot_numbers:
+            number = slot_numbers.pop(filename)
+            slots[number] = None
+            changed[number] = None
+
+    free_slots = [number for number, slot in enumerate(slots) if slot is None]
+    free_slots.reverse()
+
+    for filename, segment in updates.items():
+        if segment is None:
+            continue
+
+        number = slot_numbers.get(filename)
+
+        if number is None:
+            number = free_slots.pop() if free_slots else len(slots)
+
+            if number == len(slots):
+                slots.append(None)
+
+        slots[number] = {"filename": filename, "sha256": segment["sha256"], "title": segment["title"]}
+        changed[number] = segment
+
+    # the documents (length and text) of every slot, one slot after the other
+    lengths = array("I")
+    text_ends = array("I")
+    text_pieces = []
+    text_size = 0
+
+    for number, slot in enumerate(slots):
+        if slot is None:
+            continue
+
+        first_document = len(lengths)
+
+        if number in changed:
+            segment = changed[number]
+            encoded_texts = [text.encode("utf-8") for text in segment["texts"]]
+            lengths.extend(segment["lengths"])
+            text_ends.extend(accumulate(len(text) for text in encoded_texts))
+            text_pieces.append(b"".join(encoded_texts))
+            slot_text_size = len(text_pieces[-1])
+        else:
+            old_first, old_count = slot["first_document"], slot["document_count"]
+            lengths.frombytes(old_index._lengths[old_first:old_first + old_count].cast("B"))
+            text_ends.frombytes(old_index._text_ends[old_first:old_first + old_count].cast("B"))
+            text_pieces.append(old_index._texts[slot["text_start"]:slot["text_start"] + slot["text_size"]])
+            slot_text_size = slot["text_size"]
+
+        document_count = len(lengths) - first_document
+        slot.update(first_document=first_document, document_count=document_count, text_start=text_size, text_size=slot_text_size,
+                    total_length=sum(lengths[first_document:]) if number in changed else slot["total_length"])
+        text_size += slot_text_size
+
+    # the postings of every word: the old ones (without the changed slots) merged with the new ones
+    new_postings = {}
+
+    for number in sorted(changed):
+        if changed[number] is not None:
+            for word, postings in changed[number]["terms"].items():
+                new_postings.setdefault(word, []).append((number, postings))
+
+    old_words = {}
+
+    if old_index is not None:
+        old_words = {old_index._vocabulary[term]: term for term in range(len(old_index._vocabulary))}
+
+    changed_slots = sorted(changed)
+    words = []
+    posting_starts = array("Q", [0])
+    posting_slots = array("I")
+    posting_documents = array("I")
+    posting_counts = array("I")
+
+    def copy_old_postings(start, end):
+        if start >= end:
+            return
+
+        posting_slots.frombytes(old_index._posting_slots[start:end].cast("B"))
+        posting_documents.frombytes(old_index._posting_documents[start:end].cast("B"))
+        posting_counts.frombytes(old_index._posting_counts[start:end].cast("B"))
+
+    def add_new_postings(number, postings):
+        posting_slots.extend(array("I", [number]) * (len(postings) // 2))
+        posting_documents.extend(postings[0::2])
+        posting_counts.extend(postings[1::2])
+
+    for word in sorted(old_words.keys() | new_postings.keys()):
+        additions = new_postings.get(word, ())
+        term = old_words.get(word)
+
+        if term is None:
+            # a new word: there is nothing to cut from the old postings
+            for number, postings in additions:
+                add_new_postings(number, postings)
+        else:
+            old_start, old_end = old_index._posting_starts[term], old_index._posting_starts[term + 1]
+            old_slots = old_index._posting_slots[old_start:old_end]
+            additions = dict(additions)
+            position = 0
+
+            for number in changed_slots:
+                cut = bisect.bisect_left(old_slots, number, position)
+                copy_old_postings(old_start + position, old_start + cut)
+                position = bisect.bisect_right(old_slots, number, cut)
+
+                if number in additions:
+                    add_new_postings(number, additions[number])
+
+            copy_old_postings(old_start + position, old_end)
+
+        # a word found only in the removed quizzes is dropped
+        if len(posting_slots) > posting_starts[-1]:
+            words.append(word.encode("utf-8"))
+            posting_starts.append(len(posting_slots))
+
+    term_offsets = array("Q", [0])
+    term_offsets.extend(accumulate(len(word) for word in words))
+    metadata = {
+        "byteorder": sys.byteorder,
+        "slots": slots,
+        "document_count": len(lengths),
+        "total_length": sum(slot["total_length"] for slot in slots if slot is not None)
+    }
+    metadata_bytes = json.dumps(metadata).encode("utf-8")
+    layout = _get_layout(len(metadata_bytes), len(words), len(lengths), len(posting_slots))
+    header = _HEADER.pack(SEARCH_INDEX_MAGIC, SEARCH_INDEX_VERSION, 0, len(metadata_bytes), len(words), len(lengths), len(posting_slots), text_size)
+    padding = b"\0" * (layout["term_offsets"][0] - _HEADER.size - len(metadata_bytes))
+
+    return b"".join([header, metadata_bytes, padding, term_offsets.tobytes(), posting_starts.tobytes(), lengths.tobytes(),
+                     text_ends.tobytes(), posting_slots.tobytes(), posting_documents.tobytes(), posting_counts.tobytes(),
+                     *words, *text_pieces])
+
+def open_search_index(file_path):
+    """
+    this function opens a search index file through a memory map
+
+    returns:
+        SearchIndex or None: the index, or None if the file is missing, damaged or from another version
+    """
+    try:
+        with open(file_path, "rb") as f:
+            index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # ValueError: an empty file cannot be mapped
+        return None
+
+    if hasattr(index_map, "madvise") and hasattr(mmap, "MADV_RANDOM"):
+        # a search only touches the postings of the searched words
+        index_map.madvise(mmap.MADV_RANDOM)
+
+    try:
+        return SearchIndex(index_map, file_path)
+    except ValueError:
+        index_map.close()
+        return None
+
+def refresh_search_index(file_path, catalog_entries, load_quiz, old_index=None):
+    """
+    this function brings the search index up to date with the quiz catalog
+
+    only the quizzes whose content hash changed are indexed again. when something changed, the index
+    file is written again (see build_search_index) and opened; if it cannot be written the new index is
+    kept only in memory
+
+    args:
+        file_path (str): the index file (example: "data/.search")
+        catalog_entries (dict): filename -> catalog entry (see refresh_catalog), with "valid" and "sha256"
+        load_quiz (callable): the function that loads a quiz by filename, with the questions in file order
+        old_index (SearchIndex or None): the index already in memory (None to open the file)
+
+    returns:
+        tuple[SearchIndex, bool]: the index and true if something changed
+    """
+    if old_index is None:
+        old_index = open_search_index(file_path)
+
+    indexed = old_index.files if old_index is not None else {}
+    valid_files = set()
+    updates = {}
+
+    for filename, entry in catalog_entries.items():
+        if not entry["valid"]:
+            continue
+
+        valid_files.add(filename)
+
+        if entry["sha256"] is not None and indexed.get(filename) == entry["sha256"]:
+            continue
+
+        try:
+            updates[filename] = build_search_segment(load_quiz(filename), entry["sha256"])
+        except (OSError, ValueError):
+            if filename in indexed:
+                updates[filename] = None
+
+    for filename in indexed.keys() - valid_files:
+        updates[filename] = None
+
+    if old_index is not None and not updates:
+        return old_index, False
+
+    content = build_search_index(old_index, updates)
+
+    try:
+        atomic_write_bytes(file_path, content)
+    except OSError:
+        # the index is only a cache: if it cannot be written the next session builds it again
+        return SearchIndex(content, file_path), True
+
+    return open_search_index(file_path) or SearchIndex(content, file_path), True
+
+class _Vocabulary(Sequence):
+    """
+    the sorted words of a search index, decoded from the UTF-8 blob only when they are compared
+    """
+    __slots__ = ("_offsets", "_words")
+
+    def __init__(self, offsets, words):
+        self._offsets = offsets
+        self._words = words
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        return str(self._words[self._offsets[index]:self._offsets[index + 1]], "utf-8")
+
+class SearchIndex:
+    """
+    the full-text search over all the quizzes, ranked with BM25, read from one index file
+
+    the file holds a sorted vocabulary (for prefix matching with a binary search) and, for every word, the
+    columns of its postings (slot of the quiz, document, count). the columns are used straight from the
+    buffer (a memory map of the file), so opening the index only reads its header and its metadata
+    """
+
+    def __init__(self, buffer, file_path=None):
+        self.file_path = file_path
+        self._buffer = buffer
+        view = memoryview(buffer)
+
+        if len(view) < _HEADER.size:
+            raise ValueError("not a search index")
+
+        magic, version, _, metadata_size, term_count, document_count, posting_count, text_size = _HEADER.unpack_from(view, 0)
+
+        if magic != SEARCH_INDEX_MAGIC or version != SEARCH_INDEX_VERSION:
+            raise ValueError("not a search index of this version")
+
+        layout = _get_layout(metadata_size, term_count, document_count, posting_count)
+        metadata = json.loads(bytes(view[_HEADER.size:_HEADER.size + metadata_size]))
+
+        if metadata.get("byteorder") != sys.byteorder:
+            raise ValueError("search index written on a machine with another byte order")
+
+        def column(name, type_code):
+            start, end = layout[name]
+
+            if end > len(view):
+                raise ValueError("damaged search index")
+
+            return view[start:end].cast(type_code)
+
+        term_offsets = column("term_offsets", "Q")
+        words_start = layout["words"][0]
+        words_end = words_start + term_offsets[-1]
+
+        if words_end + text_size > len(view):
+            raise ValueError("damaged search index")
+
+        self._posting_starts = column("posting_starts", "Q")
+        self._lengths = column("lengths", "I")
+        self._text_ends = column("text_ends", "I")
+        self._posting_slots = column("posting_slots", "I")
+        self._posting_documents = column("posting_documents", "I")
+        self._posting_counts = column("posting_counts", "I")
+        self._vocabulary = _Vocabulary(term_offsets, view[words_start:words_end])
+        self._texts = view[words_end:words_end + text_size]
+
+        self.slots = metadata["slots"]
+        self.files = {slot["filename"]: slot["sha256"] for slot in self.slots if slot is not None}
+        self.document_count = metadata["document_count"]
+        self.average_length = metadata["total_length"] / self.document_count if self.document_count else 0.0
+
+    def _find(self, word):
+        """
+        this function gives back the number of a word in the vocabulary, or None if it is not indexed
+        """
+        term = bisect.bisect_left(self._vocabulary, word)
+
+        return term if term < len(self._vocabulary) and self._vocabulary[term] == word else None
+
+    def _expand(self, word):
+        """
+        this function finds the indexed words that match a searched word
+
+        args:
+            word (str): a word of the query
+
+        returns:
+            list[tuple[int, float]]: (word number, weight): the word itself with weight 1, and the words that
+                                     start with it with weight PREFIX_WEIGHT
+        """
+        term = self._find(word)
+        matches = [(term, 1.0)] if term is not None else []
+
+        if len(word) < MIN_PREFIX_LENGTH:
+            return matches
+
+        position = bisect.bisect_right(self._vocabulary, word)
+
+        while position < len(self._vocabulary) and len(matches) < MAX_PREFIX_TERMS and self._vocabulary[position].startswith(word):
+            matches.append((position, PREFIX_WEIGHT))
+            position += 1
+
+        return matches
+
+    def _document_text(self, slot, document):
+        """
+        this function reads the text shown for a document (the title, or the text of a question)
+        """
+        first_document = slot["first_document"]
+        start = self._text_ends[first_document + document - 1] if document > 0 else 0
+        end = self._text_ends[first_document + document]
+
+        return str(self._texts[slot["text_start"] + start:slot["text_start"] + end], "utf-8")
+
+    def search(self, query, limit=10):
+        """
+        this function finds the quizzes that best match a query
+
+        every document (a title or a question) gets its BM25 score, a quiz is ranked by its best document
+
+        args:
+            query (str): the searched words (example: "solar sys" also finds "system")
+            limit (int): the highest number of results
+
+        returns:
+            list[dict]: the results, best first: "filename", "title", "score", "position" (the position of
+                        the best matching question, or None if the best match is the title) and "question"
+                        (its text, or None)
+        """
+        if not self.document_count:
+            return []
+
+        scores = {}
+        k1 = BM25_K1
+        length_norm_base = k1 * (1 - BM25_B)
+        length_norm_factor = k1 * BM25_B / self.average_length if self.average_length else 0.0
+        first_documents = [slot["first_document"] if slot is not None else 0 for slot in self.slots]
+        lengths = self._lengths
+
+        for word in set(tokenize(query)):
+            for term, weight in self._expand(word):
+                start, end = self._posting_starts[term], self._posting_starts[term + 1]
+                document_frequency = end - start
+                idf = weight * math.log(1 + (self.document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+                postings = zip(self._posting_slots[start:end].tolist(), self._posting_documents[start:end].tolist(),
+                               self._posting_counts[start:end].tolist())
+
+                for slot, document, count in postings:
+                    file_scores = scores.get(slot)
+
+                    if file_scores is None:
+                        file_scores = scores[slot] = {}
+
+                    score = idf * count * (k1 + 1) / (count + length_norm_base + length_norm_factor * lengths[first_documents[slot] + document])
+                    file_scores[document] = file_scores.get(document, 0.0) + score
+
+        results = []
+
+        for slot, file_scores in scores.items():
+            if 0 in file_scores:
+                file_scores[0] *= TITLE_BOOST
+
+            best_document = max(file_scores, key=file_scores.get)
+            results.append((file_scores[best_document], slot, best_document))
+
+        return [
+            {
+                "filename": self.slots[slot]["filename"],
+                "title": self.slots[slot]["title"],
+                "score": score,
+                "position": best_document - 1 if best_document > 0 else None,
+                "question": self._document_text(self.slots[slot], best_document) if best_document > 0 else None
+            }
+            for score, slot, best_document in heapq.nlargest(limit, results)
+        ]
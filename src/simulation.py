@@ -0,0 +1,243 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import string
+import time
+from src.colors import color_blue, color_green, color_red
+from src.engine import score_answer
+
+def make_scripted_answer_source(answers, response_times):
+    """
+    this function creates an answer source that replays a fixed list of answers
+
+    the answers are given in the order the questions are asked. when the script is over, the remaining
+    questions get an invalid answer (-1)
+
+    args:
+        answers (list[str or int]): the answer to every question, as a letter ("A", "B", ...) or as an index
+        response_times (list[float] or float): the time taken for every answer, or one time for all of them
+
+    returns:
+        callable: the answer source, called as answer_source(question, valid_options)
+    """
+    indexes = []
+
+    for answer in answers:
+        if isinstance(answer, str):
+            answer = answer.strip().upper()
+            indexes.append(string.ascii_uppercase.index(answer) if len(answer) == 1 and answer in string.ascii_uppercase else -1)
+        else:
+            indexes.append(int(answer))
+
+    if isinstance(response_times, (int, float)):
+        response_times = [float(response_times)] * len(indexes)
+
+    position = 0
+
+    def answer_source(question, valid_options):
+        nonlocal position
+
+        if position >= len(indexes):
+            return (-1, 0.0)
+
+        answer = (indexes[position], response_times[position])
+        position += 1
+
+        return answer
+
+    return answer_source
+
+def make_random_answer_source(accuracy, time_range=(0.2, 1.2), seed=None):
+    """
+    this function creates an answer source that plays like a simulated user
+
+    the right option is chosen with probability 'accuracy', otherwise one of the wrong options. the time
+    taken is a random fraction of the question time limit (or of 10 seconds if there is no limit)
+
+    args:
+        accuracy (float): the probability of a right answer, between 0 and 1
+        time_range (tuple[float, float]): the lowest and highest fraction of the time limit used to answer
+        seed (int or None): the seed of the random generator, to replay the same answers
+
+    returns:
+        callable: the answer source, called as answer_source(question, valid_options)
+    """
+    rng = random.Random(seed)
+    low_fraction, high_fraction = time_range
+
+    def answer_source(question, valid_options):
+        correct_option = question["correctOption"]
+
+        if rng.random() < accuracy:
+            user_index = correct_option
+        else:
+            # one of the other options, chosen at random
+            user_index = (correct_option + 1 + rng.randrange(len(question["options"]) - 1)) % len(question["options"])
+
+        time_limit = question.get("time_limit", 0) or 10
+
+        return (user_index, time_limit * rng.uniform(low_fraction, high_fraction))
+
+    return answer_source
+
+def simulate_session(quiz_data, answer_source, shuffle=False, rng=None):
+    """
+    this function plays a whole quiz without a terminal, using the same scoring rules of run_quiz
+
+    nothing is printed, asked or saved: the answers come from the answer source
+
+    args:
+        quiz_data (dict): a dictionary containing the quiz structure
+        answer_source (callable): the function that gives the answers, called as answer_source(question, None)
+        shuffle (bool): if true the questions are asked in a random order, like run_quiz does
+        rng (random.Random or None): the random generator used to shuffle
+
+    returns:
+        dict: the final match status (score, correct/incorrect answers, total questions)
+    """
+    questions = quiz_data["questions"]
+
+    if shuffle:
+        questions = list(questions)
+        (rng or random).shuffle(questions)
+
+    score = 0
+    correct_answers = 0
+
+    for question in questions:
+        user_index, time_taken = answer_source(question, None)
+        points_change, is_correct, feedback_message = score_answer(question, user_index, round(time_taken, 1))
+        score += points_change
+
+        if is_correct:
+            correct_answers += 1
+
+    return {
+        "score": score,
+        "correct_answers": correct_answers,
+        "incorrect_answers": len(questions) - correct_answers,
+        "total_questions": len(questions),
+        "current_question_index": len(questions)
+    }
+
+_worker_quiz_data = None
+
+def _init_worker(quiz_data):
+    """
+    this function stores the quiz inside every worker process, so it is sent only once per worker
+
+    args:
+        quiz_data (dict): the quiz to simulate
+    """
+    global _worker_quiz_data
+    _worker_quiz_data = quiz_data
+
+def _simulate_chunk(chunk):
+    """
+    this function simulates a group of sessions inside a worker process and sums up their results
+
+    args:
+        chunk (tuple[int, float, int]): (number_of_sessions, accuracy, seed)
+
+    returns:
+        dict: the partial results (sessions, score sum, squared score sum, lowest and highest score, correct answers)
+    """
+    sessions, accuracy, seed = chunk
+    answer_source = make_random_answer_source(accuracy, seed=seed)
+    totals = {"sessions": 0, "score_sum": 0, "score_square_sum": 0, "min_score": None, "max_score": None, "correct_answers": 0, "questions": 0}
+
+    for _ in range(sessions):
+        match_status = simulate_session(_worker_quiz_data, answer_source)
+        score = match_status["score"]
+        totals["sessions"] += 1
+        totals["score_sum"] += score
+        totals["score_square_sum"] += score * score
+        totals["correct_answers"] += match_status["correct_answers"]
+        totals["questions"] += match_status["total_questions"]
+
+        if totals["min_score"] is None or score < totals["min_score"]:
+            totals["min_score"] = score
+        if totals["max_score"] is None or score > totals["max_score"]:
+            totals["max_score"] = score
+
+    return totals
+
+def run_simulations(quiz_data, sessions, accuracy, processes=None, seed=None, chunk_size=5000):
+    """
+    this function simulates many sessions of a quiz in parallel over a pool of processes
+
+    args:
+        quiz_data (dict): a dictionary containing the quiz structure
+        sessions (int): the number of sessions to simulate
+        accuracy (float): the probability of a right answer of the simulated users
+        processes (int or None): the number of worker processes (None for one per CPU)
+        seed (int or None): the base seed, to replay the same simulation
+        chunk_size (int): the number of sessions given to a worker at a time
+
+    returns:
+        dict: the summary (sessions, mean/stdev/min/max score, accuracy, elapsed seconds, sessions per second)
+    """
+    base_seed = seed if seed is not None else random.randrange(2 ** 32)
+    chunks = []
+    remaining = sessions
+
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        chunks.append((size, accuracy, base_seed + len(chunks)))
+        remaining -= size
+
+    start_time = time.perf_counter()
+
+    with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(quiz_data,)) as pool:
+        partial_results = pool.map(_simulate_chunk, chunks)
+
+    elapsed = time.perf_counter() - start_time
+
+    total_sessions = sum(result["sessions"] for result in partial_results)
+    score_sum = sum(result["score_sum"] for result in partial_results)
+    score_square_sum = sum(result["score_square_sum"] for result in partial_results)
+    questions = sum(result["questions"] for result in partial_results)
+    mean_score = score_sum / total_sessions if total_sessions else 0.0
+
+    return {
+        "sessions": total_sessions,
+        "mean_score": mean_score,
+        "stdev_score": max(score_square_sum / total_sessions - mean_score ** 2, 0.0) ** 0.5 if total_sessions else 0.0,
+        "min_score": min((result["min_score"] for result in partial_results if result["min_score"] is not None), default=None),
+        "max_score": max((result["max_score"] for result in partial_results if result["max_score"] is not None), default=None),
+        "accuracy": sum(result["correct_answers"] for result in partial_results) / questions if questions else 0.0,
+        "elapsed": elapsed,
+        "sessions_per_second": total_sessions / elapsed if elapsed > 0 else 0.0
+    }
+
+def main():
+    """
+    this function is the command line entry point of the module ('python -m src.simulation data/quiz.json')
+    """
+    parser = argparse.ArgumentParser(description="Headless load test of the Quiz Engine scoring.")
+    parser.add_argument("quiz_file", help="the JSON quiz file to simulate")
+    parser.add_argument("--sessions", type=int, default=100000, help="number of simulated sessions")
+    parser.add_argument("--accuracy", type=float, default=0.7, help="probability of a right answer (0-1)")
+    parser.add_argument("--processes", type=int, default=None, help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random answers")
+    arguments = parser.parse_args()
+
+    try:
+        with open(arguments.quiz_file, "r", encoding="utf-8") as f:
+            quiz_data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(color_red(f"[ERROR] Could not load quiz {arguments.quiz_file}: {e}"))
+        raise SystemExit(1)
+
+    print(color_blue(f"Simulating {arguments.sessions} sessions of '{quiz_data['title']}' on {arguments.processes or os.cpu_count()} processes..."))
+    summary = run_simulations(quiz_data, arguments.sessions, arguments.accuracy, arguments.processes, arguments.seed)
+
+    print(f"- Sessions: {summary['sessions']}")
+    print(f"- Score: mean {summary['mean_score']:.2f}, stdev {summary['stdev_score']:.2f}, min {summary['min_score']}, max {summary['max_score']}")
+    print(f"- Correct answers: {summary['accuracy'] * 100:.1f}%")
+    print(color_green(f"- Throughput: {summary['sessions_per_second']:.0f} sessions/s ({summary['sessions_per_second'] * 60 / 1e6:.2f} million/min) in {summary['elapsed']:.2f}s"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from src.colors import color_cyan, color_green, color_red, color_yellow
+from src.file_utils import get_project_data_directory
+
+BACKEND_ENV_VARIABLE = "QUIZ_ENGINE_BACKEND" # set it to "sqlite" to use this backend instead of the JSON files
+DATABASE_FILENAME = "quiz_engine.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    id INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    question_count INTEGER NOT NULL,
+    sha256 TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    quiz_id INTEGER NOT NULL REFERENCES quizzes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    question_id INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL,
+    options TEXT NOT NULL,
+    correct_option INTEGER NOT NULL,
+    explanation TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    penalty INTEGER NOT NULL,
+    time_limit INTEGER NOT NULL,
+    PRIMARY KEY (quiz_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_questions_category ON questions (category);
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    quiz_name TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_quiz_score ON scores (quiz_name, score DESC, id);
+"""
+
+# statements are always the same strings, so sqlite3 compiles each of them once and reuses it
+SELECT_QUIZ_FILENAMES = "SELECT filename FROM quizzes ORDER BY id"
+SELECT_QUIZ_SUMMARIES = "SELECT filename, title, difficulty, question_count, sha256 FROM quizzes ORDER BY id"
+SELECT_QUIZ = "SELECT id, title, difficulty FROM quizzes WHERE filename = ?"
+SELECT_QUESTIONS = (
+    "SELECT question_id, question, category, options, correct_option, explanation, points, penalty, time_limit "
+    "FROM questions WHERE quiz_id = ? ORDER BY position"
+)
+SELECT_QUESTION_AT = (
+    "SELECT question_id, question, category, options, correct_option, explanation, points, penalty, time_limit "
+    "FROM questions WHERE quiz_id = (SELECT id FROM quizzes WHERE filename = ?) AND position = ?"
+)
+SELECT_QUESTION_INDEX = (
+    "SELECT quizzes.filename, quizzes.title, quizzes.difficulty, questions.category, questions.position "
+    "FROM questions JOIN quizzes ON quizzes.id = questions.quiz_id ORDER BY quizzes.id, questions.position"
+)
+SELECT_QUIZ_ID = "SELECT id FROM quizzes WHERE filename = ?"
+SELECT_QUIZZES_WITHOUT_HASH = "SELECT id, title, difficulty FROM quizzes WHERE sha256 IS NULL"
+INSERT_QUIZ = "INSERT INTO quizzes (filename, title, difficulty, question_count, sha256) VALUES (?, ?, ?, ?, ?)"
+UPDATE_QUIZ = "UPDATE quizzes SET title = ?, difficulty = ?, question_count = ?, sha256 = ? WHERE id = ?"
+UPDATE_QUIZ_HASH = "UPDATE quizzes SET sha256 = ? WHERE id = ?"
+DELETE_QUESTIONS = "DELETE FROM questions WHERE quiz_id = ?"
+INSERT_QUESTION = (
+    "INSERT INTO questions (quiz_id, position, question_id, question, category, options, correct_option, "
+    "explanation, points, penalty, time_limit) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+SELECT_SCORES = "SELECT username, score, quiz_name, date FROM scores ORDER BY id"
+SELECT_TOP_SCORES = "SELECT username, score, quiz_name, date FROM scores WHERE quiz_name = ? ORDER BY score DESC, id LIMIT ?"
+COUNT_SCORES = "SELECT COUNT(*) FROM scores"
+DELETE_SCORES = "DELETE FROM scores"
+INSERT_SCORE = "INSERT INTO scores (username, score, quiz_name, date) VALUES (?, ?, ?, ?)"
+
+_connections = {}
+
+def is_enabled():
+    """
+    this function tells if the application must use the SQLite backend
+
+    the backend is chosen with the QUIZ_ENGINE_BACKEND environment variable ("json" is the default)
+
+    returns:
+        bool: true if QUIZ_ENGINE_BACKEND is set to "sqlite", false otherwise
+    """
+    return os.environ.get(BACKEND_ENV_VARIABLE, "json").strip().lower() == "sqlite"
+
+def _get_database_path():
+    """
+    this function figures out the full, exact path for the SQLite database ('data/quiz_engine.db')
+
+    returns:
+        path: a path object that points to the database file
+    """
+    return get_project_data_directory() / DATABASE_FILENAME
+
+def get_connection():
+    """
+    this function opens (only once per process) the connection to the SQLite database
+
+    the database uses WAL mode, so players can read quizzes and scores while another terminal is writing,
+    and the tables are created the first time
+
+    returns:
+        sqlite3.Connection: the open connection
+    """
+    database_path = _get_database_path()
+    connection = _connections.get(database_path)
+
+    if connection is None:
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(database_path, timeout=30, cached_statements=64)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.executescript(SCHEMA)
+        _upgrade_schema(connection)
+        _connections[database_path] = connection
+
+    return connection
+
+def _upgrade_schema(connection):
+    """
+    this function brings a database created by an older version up to date: the 'sha256' column is added
+    to the quizzes table and filled for the quizzes saved before it existed
+
+    args:
+        connection (sqlite3.Connection): the open connection
+    """
+    columns = {row[1] for row in connection.execute("PRAGMA table_info(quizzes)")}
+
+    with connection:
+        if "sha256" not in columns:
+            connection.execute("ALTER TABLE quizzes ADD COLUMN sha256 TEXT")
+
+        for quiz_id, title, difficulty in connection.execute(SELECT_QUIZZES_WITHOUT_HASH).fetchall():
+            question_rows = connection.execute(SELECT_QUESTIONS, (quiz_id,)).fetchall()
+            connection.execute(UPDATE_QUIZ_HASH, (_hash_quiz(title, difficulty, question_rows), quiz_id))
+
+def _hash_quiz(title, difficulty, question_rows):
+    """
+    this function computes the content hash of a quiz as it is stored in the database
+
+    the caches built from the quizzes (example: the search index) use it like the sha256 of a JSON file,
+    to know which quizzes changed since they were built
+
+    args:
+        title (str): the title of the quiz
+        difficulty (str): the difficulty of the quiz
+        question_rows (list[tuple]): the questions, as the columns of SELECT_QUESTIONS
+
+    returns:
+        str: the sha256 hash (hexadecimal)
+    """
+    content = json.dumps([title, difficulty, [list(row) for row in question_rows]], ensure_ascii=False)
+
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def list_quiz_filenames():
+    """
+    this function gives back the names of all the quizzes saved in the database
+
+    returns:
+        list[str]: the quiz filenames, in the order they were saved (example: ["quiz1.json", "quiz2.json"])
+    """
+    rows = get_connection().execute(SELECT_QUIZ_FILENAMES).fetchall()
+
+    return [row[0] for row in rows]
+
+def iter_quiz_summaries():
+    """
+    this function goes through the quizzes saved in the database without loading their questions, one
+    row at a time (a menu that shows only one page reads only the rows it needs)
+
+    yields:
+        tuple[str, dict]: the filename and {"title", "difficulty", "question_count", "sha256"}, in the order
+                          they were saved ("sha256" is the content hash written by save_quiz)
+    """
+    for filename, title, difficulty, question_count, content_hash in get_connection().execute(SELECT_QUIZ_SUMMARIES):
+        yield filename, {"title": title, "difficulty": difficulty, "question_count": question_count, "sha256": content_hash}
+
+def load_quiz(filename):
+    """
+    this function loads one quiz from the database and rebuilds the same dictionary of the JSON file
+
+    args:
+        filename (str): the name of the quiz (example: "python_basics.json")
+
+    returns:
+        dict: the quiz with "title", "difficulty" and "questions"
+
+    raises:
+        FileNotFoundError: if there is no quiz with this name in the database
+    """
+    connection = get_connection()
+    quiz_row = connection.execute(SELECT_QUIZ, (filename,)).fetchone()
+
+    if quiz_row is None:
+        raise FileNotFoundError(f"No quiz named '{filename}' in the database")
+
+    quiz_id, title, difficulty = quiz_row
+    questions = [_question_row_to_dict(row) for row in connection.execute(SELECT_QUESTIONS, (quiz_id,))]
+
+    return {"title": title, "difficulty": difficulty, "questions": questions}
+
+def load_questions_at(filename, positions):
+    """
+    this function loads only some questions of a quiz, by their position
+
+    args:
+        filename (str): the name of the quiz (example: "python_basics.json")
+        positions (iterable[int]): the positions of the questions inside the quiz
+
+    returns:
+        list[dict]: the questions found, in the order of the positions
+    """
+    connection = get_connection()
+    questions = []
+
+    for position in positions:
+        row = connection.execute(SELECT_QUESTION_AT, (filename, position)).fetchone()
+
+        if row is not None:
+            questions.append(_question_row_to_dict(row))
+
+    return questions
+
+def build_question_index():
+    """
+    this function builds the question index (see src/question_index.py) from the database, where the
+    questions are already indexed by category
+
+    returns:
+        dict: filename -> {"sha256": None, "title", "difficulty", "categories": category -> positions}
+    """
+    files = {}
+
+    for filename, title, difficulty, category, position in get_connection().execute(SELECT_QUESTION_INDEX):
+        entry = files.get(filename)
+
+        if entry is None:
+            entry = files[filename] = {"sha256": None, "title": title, "difficulty": difficulty, "categories": {}}
+
+        entry["categories"].setdefault(category, []).append(position)
+
+    return files
+
+def _question_row_to_dict(row):
+    """
+    this function turns a row of the questions table into the question dictionary of the JSON format
+    """
+    return {
+        "id": row[0],
+        "question": row[1],
+        "category": row[2],
+        "options": json.loads(row[3]),
+        "correctOption": row[4],
+        "explanation": row[5],
+        "points": row[6],
+        "penalty": row[7],
+        "time_limit": row[8]
+    }
+
+def save_quiz(filename, quiz_data):
+    """
+    this function saves one quiz into the database, replacing the quiz with the same name if it exists
+
+    args:
+        filename (str): the name of the quiz (example: "python_basics.json")
+        quiz_data (dict): the quiz with "title", "difficulty" and "questions"
+    """
+    connection = get_connection()
+    # the columns of SELECT_QUESTIONS, so the hash is the same when it is computed again from the database
+    question_rows = [
+        (
+            question["id"],
+            question["question"],
+            question["category"],
+            json.dumps(question["options"]),
+            question["correctOption"],
+            question["explanation"],
+            question["points"],
+            question["penalty"],
+            question["time_limit"]
+        )
+        for question in quiz_data["questions"]
+    ]
+    content_hash = _hash_quiz(quiz_data["title"], quiz_data["difficulty"], question_rows)
+
+    with connection:
+        quiz_row = connection.execute(SELECT_QUIZ_ID, (filename,)).fetchone()
+
+        if quiz_row is None:
+            cursor = connection.execute(INSERT_QUIZ, (filename, quiz_data["title"], quiz_data["difficulty"], len(question_rows), content_hash))
+            quiz_id = cursor.lastrowid
+        else:
+            quiz_id = quiz_row[0]
+            connection.execute(UPDATE_QUIZ, (quiz_data["title"], quiz_data["difficulty"], len(question_rows), content_hash, quiz_id))
+            connection.execute(DELETE_QUESTIONS, (quiz_id,))
+
+        connection.executemany(INSERT_QUESTION, ((quiz_id, position, *row) for position, row in enumerate(question_rows)))
+
+def load_scores():
+    """
+    this function loads every score record saved in the database
+
+    returns:
+        list[dict]: the score records, in the order they were saved
+    """
+    rows = get_connection().execute(SELECT_SCORES).fetchall()
+
+    return [_score_row_to_record(row) for row in rows]
+
+def record_score(score_record):
+    """
+    this function adds one score record to the database
+
+    args:
+        score_record (dict): the score record to save (username, score, quiz_name, date)
+    """
+    connection = get_connection()
+
+    with connection:
+        connection.execute(INSERT_SCORE, _score_record_to_row(score_record))
+
+def replace_scores(data_list):
+    """
+    this function replaces every score record saved in the database with the given list
+
+    args:
+        data_list (list[dict]): the score records to save
+    """
+    connection = get_connection()
+
+    with connection:
+        connection.execute(DELETE_SCORES)
+        connection.executemany(INSERT_SCORE, (_score_record_to_row(record) for record in data_list))
+
+def load_top_scores(quiz_name, limit):
+    """
+    this function loads the best scores of one quiz, using the (quiz_name, score) index
+
+    args:
+        quiz_name (str): the name of the quiz
+        limit (int): the maximum number of records to give back
+
+    returns:
+        list[dict]: the score records sorted from highest to lowest score
+    """
+    rows = get_connection().execute(SELECT_TOP_SCORES, (quiz_name, limit)).fetchall()
+
+    return [_score_row_to_record(row) for row in rows]
+
+def _score_record_to_row(record):
+    """
+    this function changes a score record into the tuple of values of the 'scores' table
+
+    args:
+        record (dict): the score record
+
+    returns:
+        tuple: the values (username, score, quiz_name, date)
+    """
+    return (record["username"], record["score"], record["quiz_name"], record["date"])
+
+def _score_row_to_record(row):
+    """
+    this function changes a row of the 'scores' table into a score record
+
+    args:
+        row (tuple): the values (username, score, quiz_name, date)
+
+    returns:
+        dict: the score record
+    """
+    return {"username": row[0], "score": row[1], "quiz_name": row[2], "date": row[3]}
+
+def _read_json_scores(directory):
+    """
+    this function reads the score records of the JSON leaderboard files inside a folder
+
+    the append-only log ('leaderboard.jsonl') is used if it exists, otherwise the old 'leaderboard.json'
+
+    args:
+        directory (path): the folder that holds the leaderboard files
+
+    returns:
+        list[dict]: the score records found
+    """
+    log_file = directory / "leaderboard.jsonl"
+    legacy_file = directory / "leaderboard.json"
+    records = []
+
+    if log_file.exists():
+        with log_file.open("r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                if isinstance(record, dict):
+                    records.append(record)
+
+    elif legacy_file.exists():
+        try:
+            with legacy_file.open("r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = []
+
+        if isinstance(data, list):
+            records = [record for record in data if isinstance(record, dict)]
+
+    return records
+
+def migrate_json_data(directory="data"):
+    """
+    this function bulk imports the JSON quiz files and the JSON leaderboard of a folder into the database
+
+    invalid quiz files are skipped. quizzes already in the database are replaced. scores are imported only
+    if the database has no scores yet, so running the migration twice does not duplicate them
+
+    args:
+        directory (str): the folder that holds the JSON files (example: "data")
+
+    returns:
+        tuple[int, int]: a pair containing (imported_quizzes, imported_scores)
+    """
+    from src.data_manager import is_valid_quiz
+
+    directory = Path(directory)
+    imported_quizzes = 0
+
+    for file_path in sorted(directory.glob("*.json")):
+        if file_path.name == "leaderboard.json":
+            continue
+
+        try:
+            with file_path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = None
+
+        if not is_valid_quiz(data):
+            info = color_cyan("[INFO]")
+            print(f"{info} Skipping invalid quiz file: {file_path.name}")
+            continue
+
+        save_quiz(file_path.name, data)
+        imported_quizzes += 1
+
+    connection = get_connection()
+    imported_scores = 0
+
+    if connection.execute(COUNT_SCORES).fetchone()[0] == 0:
+        records = _read_json_scores(directory)
+
+        with connection:
+            connection.executemany(INSERT_SCORE, (_score_record_to_row(record) for record in records))
+
+        imported_scores = len(records)
+    else:
+        warn = color_yellow("[WARN]")
+        print(f"{warn} The database already contains scores, the JSON leaderboard was not imported.")
+
+    return imported_quizzes, imported_scores
+
+def main():
+    """
+    this function is the command line entry point of the module ('python -m src.sqlite_backend migrate')
+    """
+    parser = argparse.ArgumentParser(description="SQLite storage backend of the Quiz Engine.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="import the JSON quizzes and leaderboard into the database")
+    migrate_parser.add_argument("directory", nargs="?", default="data", help="the folder that holds the JSON files")
+    arguments = parser.parse_args()
+
+    if arguments.command == "migrate":
+        try:
+            imported_quizzes, imported_scores = migrate_json_data(arguments.directory)
+        except (OSError, sqlite3.Error) as e:
+            print(color_red(f"[ERROR] Migration failed: {e}"))
+            raise SystemExit(1)
+
+        success = color_green("[SUCCESS]")
+        print(f"{success} Imported {imported_quizzes} quizzes and {imported_scores} scores into {_get_database_path()}.")
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,162 @@
 import json
-from pathlib import Path
+import os
+import sqlite3
+import threading
 from src.ui_terminal import print_top_10
+from src.file_utils import atomic_write_json, atomic_write_text, get_project_data_directory, locked
+from src import sqlite_backend
 from src.colors import color_cyan, color_green, color_red
 
+TOP_K = 10 # number of best records kept for every quiz in the top scores index
+TOP_INDEX_VERSION = 1
+
 def _get_storage_path():
     """
     this function figures out the full, exact path for the leaderboard save file ('leaderboard.json')
 
-    the path is calculated starting from the main project folder (two levels up from this current file, assuming a normal project structure)
+    the path is calculated starting from the main project folder (two levels up from this current file, assuming a normal project structure),
+    unless the QUIZ_ENGINE_DATA_DIR environment variable points to another folder
 
     returns:
         path: a path object that points to the file 'data/leaderboard.json'
     """
-    script_path = Path(__file__).resolve()
-    project_root = script_path.parent.parent
-    storage_file = project_root / "data" / "leaderboard.json"
+    storage_file = get_project_data_directory() / "leaderboard.json"
 
     return storage_file
 
+def _get_lock_path():
+    """
+    this function figures out the full, exact path for the lock file of the leaderboard ('leaderboard.lock')
+
+    every write to the leaderboard log or to the top scores index happens while holding this lock
+
+    returns:
+        path: a path object that points to the file 'data/leaderboard.lock'
+    """
+    return _get_storage_path().with_suffix(".lock")
+
+def _get_log_path():
+    """
+    this function figures out the full, exact path for the append-only leaderboard log ('leaderboard.jsonl')
+
+    the log sits next to the old 'leaderboard.json' file and holds one JSON score record per line
+
+    returns:
+        path: a path object that points to the file 'data/leaderboard.jsonl'
+    """
+    return _get_storage_path().with_suffix(".jsonl")
+
+def import_legacy_leaderboard():
+    """
+    this function imports the scores of the old 'leaderboard.json' file into the append-only log
+
+    the import only happens when the log does not exist yet. after the import the old file is renamed
+    to 'leaderboard.json.imported', so the scores are never imported twice
+
+    returns:
+        int: the number of imported score records
+    """
+    if not _get_storage_path().exists():
+        return 0
+
+    with locked(_get_lock_path()):
+        return _import_legacy_leaderboard()
+
+def _import_legacy_leaderboard():
+    """
+    this function does the work of import_legacy_leaderboard, for a caller that already holds the leaderboard lock
+
+    returns:
+        int: the number of imported score records
+    """
+    legacy_file = _get_storage_path()
+    log_file = _get_log_path()
+
+    if log_file.exists() or not legacy_file.exists():
+        return 0
+
+    try:
+        with legacy_file.open("r") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        error = color_red("[ERROR]")
+        message = f"Could not import the old Leaderboard file: {e}"
+        print(f"{error} {message}")
+        return 0
+
+    if not isinstance(data, list):
+        data = []
+
+    _write_log(data)
+    legacy_file.replace(legacy_file.with_name(legacy_file.name + ".imported"))
+
+    message = f"Imported {len(data)} scores from {legacy_file.name}."
+    info = color_cyan("[INFO]")
+    print(f"{info} {message}")
+
+    return len(data)
+
+def _write_log(data_list):
+    """
+    this function writes a whole list of score records as a new leaderboard log
+
+    the records are written into a temporary file first and then moved over the old log, so a crash
+    never leaves a half written log behind
+
+    args:
+        data_list (list): the list of dictionaries that contains the leaderboard records to write
+    """
+    log_file = _get_log_path()
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+
+    atomic_write_text(log_file, "".join(json.dumps(record) + "\n" for record in data_list))
+
+def _read_log():
+    """
+    this function reads every score record from the leaderboard log
+
+    lines that cannot be decoded (for example a line cut in half by a crash) are skipped
+
+    returns:
+        tuple[list, int]: a pair containing (score_records, number_of_skipped_lines)
+    """
+    records = []
+    skipped_lines = 0
+
+    with _get_log_path().open("r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                skipped_lines += 1
+                continue
+
+            if isinstance(record, dict):
+                records.append(record)
+            else:
+                skipped_lines += 1
+
+    return records, skipped_lines
+
 def load_leaderboard():
     """
-    this function loads the leaderboard data from the specified JSON file
+    this function loads the leaderboard data from the append-only log file
 
-    it checks if the file exists and handles problems like bad JSON formatting or other input/output errors
+    the old 'leaderboard.json' file is imported first if it was never imported. if some lines of the log
+    are broken, the good records are still returned and the log is compacted in the background
 
     returns:
         list: a list of score records (it expects a list of dictionaries). it returns an empty list if the file is missing or broken
     """
-    leaderboard_file = _get_storage_path()
+    if sqlite_backend.is_enabled():
+        return sqlite_backend.load_scores()
+
+    import_legacy_leaderboard()
+
+    leaderboard_file = _get_log_path()
     if not leaderboard_file.exists():
         message = "The file containing the Leaderboard data does not exist."
         info = color_cyan("[INFO]")
@@ -35,29 +164,85 @@ def load_leaderboard():
         return []
     
     try:
-        with leaderboard_file.open("r") as f:
-            data = json.load(f)
+        records, skipped_lines = _read_log()
+    except OSError:
+        # captures input/output errors
+        return []
+
+    if skipped_lines > 0:
+        error = color_red("[ERROR]")
+        message = f"{skipped_lines} broken lines found in the Leaderboard file, compacting it."
+        print(f"{error} {message}")
+        start_background_compaction()
 
-            # checks if the loaded datas are in a list
-            if isinstance(data, list):
-                return data
-            
-    except json.JSONDecodeError:
-        error = "[ERROR]"
-        message = "The file containing the Leaderboard appears to be corrupted."
-        print("{error} {message}")
+    return records
 
-        return []
-    
-    except Exception:
-        # captures other kind of errors
-        return []
+def record_score(score_record):
+    """
+    this function adds one score record at the end of the leaderboard log
+
+    only the new record is written, so the cost does not depend on how many scores were already saved
+
+    args:
+        score_record (dict): the score record to save (username, score, quiz_name, date)
+
+    returns:
+        bool: true if the record was saved, false if it was not
+    """
+    if sqlite_backend.is_enabled():
+        try:
+            sqlite_backend.record_score(score_record)
+        except sqlite3.Error as e:
+            error = color_red("[ERROR]")
+            message = f"Could not save Leaderboard data: {e}"
+            print(f"{error} {message}")
+            return False
+
+        message = "Leaderboard data saved successfully."
+        success = color_green("[SUCCESS]")
+        print(f"{success} {message}")
+        return True
+
+    leaderboard_file = _get_log_path()
+    line = json.dumps(score_record) + "\n"
+
+    try:
+        leaderboard_file.parent.mkdir(parents=True, exist_ok=True)
+
+        with locked(_get_lock_path()):
+            _import_legacy_leaderboard()
+
+            with leaderboard_file.open("ab+") as f:
+                # a crash during a previous write could have left a line without its newline
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        line = "\n" + line
+
+                f.write(line.encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+
+            # reads back only the new line to keep the top scores of the quiz up to date
+            _sync_top_index()
+    except OSError as e:
+        error = color_red("[ERROR]")
+        message = f"Could not save Leaderboard data: {e}"
+        print(f"{error} {message}")
+        return False
+
+    message = "Leaderboard data saved successfully."
+    success = color_green("[SUCCESS]")
+    print(f"{success} {message}")
+
+    return True
     
 def save_leaderboard(data_list):
     """
-    this function saves the list of scores you give it into the leaderboard file.
+    this function saves the list of scores you give it into the leaderboard file, replacing all of its content
 
-    it makes sure the 'data' folder exists before trying to save the file
+    it makes sure the 'data' folder exists before trying to save the file. to add a single new score use
+    record_score, which does not rewrite the whole file
 
     args:
         data_list (list): the list of dictionaries that contains the leaderboard records to save
@@ -65,13 +250,16 @@ def save_leaderboard(data_list):
     returns:
         none: it prints a success message or an error message to the console 
     """
-    leaderboard_file = _get_storage_path()
+    leaderboard_file = _get_log_path()
     leaderboard_directory = leaderboard_file.parent
     try:
         leaderboard_directory.mkdir(parents=True, exist_ok=True)
         try:
-            with leaderboard_file.open("w") as f:
-                json.dump(data_list, f, indent=4)
+            if sqlite_backend.is_enabled():
+                sqlite_backend.replace_scores(data_list)
+            else:
+                with locked(_get_lock_path()):
+                    _write_log(data_list)
 
             message = "Leaderboard data saved successfully."
             success = color_green("[SUCCESS]")
@@ -85,29 +273,197 @@ def save_leaderboard(data_list):
         message = f"Unable to create save directory {leaderboard_directory}: {e}"
         print(f"{error} {message}")
 
-def display_top_10(quiz_name_filter):
+def compact_leaderboard():
     """
-    
-    this function loads all the scores, selects only the scores matching the specific quiz name, sorts the result,
-    and then shows the top 10 scores using the special UI function
+    this function rewrites the leaderboard log keeping only the records that can be decoded
+
+    the leaderboard lock is held for the whole rewrite, so no score can be appended in the meantime
+
+    returns:
+        int: the number of records kept in the compacted log
+    """
+    with locked(_get_lock_path()):
+        if not _get_log_path().exists():
+            return 0
+
+        records, skipped_lines = _read_log()
+        _write_log(records)
+
+    return len(records)
+
+def start_background_compaction():
+    """
+    this function starts the compaction of the leaderboard log in a background thread
+
+    returns:
+        threading.Thread: the started thread
+    """
+    thread = threading.Thread(target=compact_leaderboard, name="leaderboard-compaction", daemon=True)
+    thread.start()
+
+    return thread
+
+def _get_top_index_path():
+    """
+    this function figures out the full, exact path for the top scores index ('leaderboard.topk')
+
+    the index sits next to the leaderboard log and keeps the best TOP_K records of every quiz
+
+    returns:
+        path: a path object that points to the file 'data/leaderboard.topk'
+    """
+    return _get_storage_path().with_suffix(".topk")
+
+def _insert_top_record(top_records, record, k):
+    """
+    this function inserts a score record into a list of records sorted from highest to lowest score
+
+    a record with the same score as others goes after them, like a stable sort would do, and the list
+    never grows over k records
+
+    args:
+        top_records (list[dict]): the records of one quiz, already sorted from highest to lowest score
+        record (dict): the new score record
+        k (int): the maximum number of records to keep
+    """
+    position = len(top_records)
+
+    while position > 0 and top_records[position - 1]["score"] < record["score"]:
+        position -= 1
+
+    if position < k:
+        top_records.insert(position, record)
+        del top_records[k:]
+
+def _new_top_index(log_stat):
+    """
+    this function creates an empty top scores index for the current leaderboard log
+
+    args:
+        log_stat (os.stat_result or None): the stat result of the leaderboard log, None if it does not exist
+
+    returns:
+        dict: the empty index
+    """
+    return {
+        "version": TOP_INDEX_VERSION,
+        "k": TOP_K,
+        "log_inode": log_stat.st_ino if log_stat else None,
+        "log_size": 0,
+        "quizzes": {}
+    }
+
+def _load_top_index():
+    """
+    this function loads the top scores index and brings it up to date with the leaderboard log
+
+    only the part of the log written after the last update is read. if the log was rewritten (for
+    example by a compaction) the index is built again from the whole log
+
+    returns:
+        dict: the up to date index, where "quizzes" maps every quiz name to its best records
+    """
+    with locked(_get_lock_path()):
+        return _sync_top_index()
+
+def _sync_top_index():
+    """
+    this function does the work of _load_top_index, for a caller that already holds the leaderboard lock
+
+    returns:
+        dict: the up to date index, where "quizzes" maps every quiz name to its best records
+    """
+    _import_legacy_leaderboard()
+
+    log_file = _get_log_path()
+
+    try:
+        log_stat = log_file.stat()
+    except OSError:
+        log_stat = None
+
+    try:
+        with _get_top_index_path().open("r") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+
+    if (not isinstance(index, dict) or index.get("version") != TOP_INDEX_VERSION or index.get("k") != TOP_K
+            or log_stat is None or index.get("log_inode") != log_stat.st_ino or index.get("log_size", 0) > log_stat.st_size):
+        index = _new_top_index(log_stat)
+
+    if log_stat is None or index["log_size"] == log_stat.st_size:
+        return index
+
+    with log_file.open("rb") as f:
+        f.seek(index["log_size"])
+        new_content = f.read()
+
+    # a last line without its newline could still be in the middle of being written
+    new_content = new_content[:new_content.rfind(b"\n") + 1]
+
+    for line in new_content.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+
+        if isinstance(record, dict) and "quiz_name" in record and "score" in record:
+            top_records = index["quizzes"].setdefault(record["quiz_name"], [])
+            _insert_top_record(top_records, record, TOP_K)
+
+    index["log_size"] += len(new_content)
+    _save_top_index(index)
+
+    return index
+
+def _save_top_index(index):
+    """
+    this function writes the top scores index next to the leaderboard log
+
+    the index is only a cache of the log, so if it cannot be written it is simply built again later
+
+    args:
+        index (dict): the index to save
+    """
+    try:
+        atomic_write_json(_get_top_index_path(), index)
+    except OSError:
+        pass
+
+def load_top_scores(quiz_name_filter, limit=10):
+    """
+    this function reads the best scores of the specific quiz name from the top scores index
+
+    the index keeps the records of every quiz already sorted, so the whole leaderboard is never loaded
+    or sorted here
 
     args:
         quiz_name_filter (str): the name of the quiz to filter scores by
+        limit (int): the number of records to give back (at most TOP_K with the JSON leaderboard)
+
+    returns:
+        list[dict]: the best score records, from the highest score to the lowest
     """
-    all_scores = load_leaderboard()
+    if sqlite_backend.is_enabled():
+        # the (quiz_name, score) index of the database gives back the rows already sorted
+        return sqlite_backend.load_top_scores(quiz_name_filter, limit)
 
-    filtered_scores = []
+    index = _load_top_index()
 
-    for record in all_scores:
-        # assuming that every record contains the keyword "quiz_name"
-        if record["quiz_name"] == quiz_name_filter:
-            filtered_scores.append(record)
+    # takes only the first results, already ordered by decrescent points
+    return index["quizzes"].get(quiz_name_filter, [])[:limit]
 
-    # order points by decrescent ordination 
-    sorted_scores = sorted(filtered_scores, key = lambda item: item["score"], reverse = True)
+def display_top_10(quiz_name_filter):
+    """
+    
+    this function reads the best scores of the specific quiz name from the top scores index,
+    and then shows the top 10 scores using the special UI function
 
-    # takes only the first 10 results
-    top_10 = sorted_scores[:10]
+    args:
+        quiz_name_filter (str): the name of the quiz to filter scores by
+    """
+    top_10 = load_top_scores(quiz_name_filter, 10)
 
     # prints using the UI function
-    print_top_10(top_10)
\ No newline at end of file
+    print_top_10(top_10)
@@ -1,8 +1,13 @@
-import os
 import platform
+import sys
+from functools import lru_cache
 from typing import List, Dict
 import string
-from src.colors import color_red, color_yellow, color_blue, color_cyan
+from src.colors import ESC, color_red, color_yellow, color_blue, color_cyan
+
+CLEAR_SEQUENCE = f"{ESC}[H{ESC}[2J{ESC}[3J" # cursor to top-left, clear the screen, clear the scrollback
+
+_windows_ansi_enabled = False
 
 def print_welcome():
     """
@@ -45,8 +50,7 @@ def get_user_choice(max_option):
         int or str:   the number ID of the selected quiz(int), or the string 'c' if the user chooses to create a quiz
     """
     while True:
-        clear_screen()
-        print_header()
+        redraw_screen()
 
         selection_str = input(f"\nSelect a quiz (1 - {max_option}): ").strip()
 
@@ -73,19 +77,76 @@ def get_user_choice(max_option):
             error = color_red("[ERROR]")
             print(f"{error} {message}")
 
+def _enable_windows_ansi():
+    """
+    this function turns on the ANSI escape sequences in the windows console (only the first time it is called)
+
+    on the other systems the terminals already understand them, so it does nothing
+    """
+    global _windows_ansi_enabled
+
+    if _windows_ansi_enabled or platform.system() != "Windows":
+        return
+
+    _windows_ansi_enabled = True
+
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11) # standard output
+        mode = ctypes.c_uint32()
+
+        if kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            kernel32.SetConsoleMode(handle, mode.value | 0x0004) # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+    except (ImportError, AttributeError, OSError):
+        pass
+
+def _is_terminal():
+    """
+    this function tells if the output goes to a real terminal (and not to a file or a pipe)
+
+    returns:
+        bool: true if the standard output is a terminal
+    """
+    try:
+        return sys.stdout.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+def _clear_sequence():
+    """
+    this function gives back the ANSI sequence that clears the screen, or an empty string when the output
+    is not a terminal (clearing a file or a pipe makes no sense)
+
+    returns:
+        str: the sequence to write before the new screen
+    """
+    if not _is_terminal():
+        return ""
+
+    _enable_windows_ansi()
+
+    return CLEAR_SEQUENCE
+
 def clear_screen():
     """
-    this function cleans up the console based on the detected operating system
+    this function cleans up the console with ANSI escape sequences, without starting a 'clear'/'cls' process
+
+    nothing is written when the output is not a terminal
     """
-    if platform.system() == "Windows":
-        os.system("cls")
+    sequence = _clear_sequence()
 
-    else:
-        os.system("clear")
+    if sequence:
+        sys.stdout.write(sequence)
+        sys.stdout.flush()
 
-def print_header(): # ascii art font name: 'Classy'
+@lru_cache(maxsize=None)
+def _render_header(): # ascii art font name: 'Classy'
     """
-    this function prints the ascii art with the logo of the program
+    this function builds (only once) the colored ascii art with the logo of the program
+
+    returns:
+        str: the colored logo, ready to be written
     """
     header = """
                                                                   
@@ -97,7 +158,58 @@ def print_header(): # ascii art font name: 'Classy'
   ▀█████▄▄▀██▀█▄██▄▄██▄▄         ▀█████▄██ ▀█▄▀████▄██▄██ ▀█▄▀█▄▄▄
        ▀█                                        ██               
                                                ▀▀▀                """
-    print(color_cyan(header))
+    return color_cyan(header) + "\n"
+
+def print_header():
+    """
+    this function prints the ascii art with the logo of the program
+    """
+    sys.stdout.write(_render_header())
+
+def redraw_screen(content=""):
+    """
+    this function clears the console and prints the logo of the program with a single buffered write
+
+    it is the same as calling clear_screen(), print_header() and then printing 'content', but the
+    terminal receives everything at once
+
+    args:
+        content (str): the text to show under the logo (example: a page of the quiz list)
+    """
+    sys.stdout.write(_clear_sequence() + _render_header() + content)
+    sys.stdout.flush()
+
+def render_quiz_page(entries, first_number, page_number, page_count, is_final, filter_text=""):
+    """
+    this function builds the text of one page of the quiz list, so it can be written all at once
+
+    args:
+        entries (list[tuple[str, dict]]): the (filename, catalog entry) of the quizzes on the page
+        first_number (int): the number shown next to the first quiz of the page
+        page_number (int): the number of the page, starting from 0
+        page_count (int): the number of pages known so far
+        is_final (bool): true if page_count is the final number of pages ("3 of 7+" otherwise)
+        filter_text (str): the filter in use, if any
+
+    returns:
+        str: the page, ready to be written on the terminal
+    """
+    lines = [color_blue(f"\n--- SELECT QUIZ TO PLAY ---")]
+
+    if filter_text:
+        lines.append(color_cyan(f"Filter: '{filter_text}'"))
+
+    if not entries:
+        lines.append(color_yellow("No quizzes match." if filter_text else "No valid quizzes found to play."))
+
+    for number, (filename, entry) in enumerate(entries, first_number):
+        lines.append(f"{number}. {filename} - {entry['title']} ({entry['difficulty']}, {entry['question_count']} questions)")
+
+    lines.append(color_blue("-" * 35))
+    lines.append(f"Page {page_number + 1} of {page_count}{'' if is_final else '+'}")
+    lines.append(color_cyan("[n]ext  [p]revious  [g <page>] go to page  [f <text>] filter  [s]earch  [b]ack"))
+
+    return "\n".join(lines) + "\n"
 
 def display_question(question_data: Dict, question_number: int, total_questions: int):
     """
@@ -107,10 +219,12 @@ def display_question(question_data: Dict, question_number: int, total_questions:
     args:
         question_data (dict): a dictionary containing the question details
         question_number (int): the step by step number of the questions being shown
-        total_questions (int): the total number of questions in the quiz
+        total_questions (int or None): the total number of questions in the quiz (None if it is not known yet)
     """
+    shown_total = total_questions if total_questions is not None else "?"
+
     print(color_blue("-") * 35)
-    print(f"Question {question_number} of {total_questions} | Points {question_data.get("points", 1)}")
+    print(f"Question {question_number} of {shown_total} | Points {question_data.get("points", 1)}")
     print(color_blue("-") * 35)
 
     print(f"\n{question_data["question"]}\n")
@@ -169,8 +283,7 @@ def get_username():
         str: the username provided by the user
     """
     while True:
-        clear_screen()
-        print_header()
+        redraw_screen()
 
         username = input(f"Insert your Username: ")
 
@@ -191,8 +304,7 @@ def print_top_10(top_10_list):
         top_10_list (list[dict]):   a list containing the top 10 score records, already sorted from
                                     highest score to lowest
     """
-    clear_screen()
-    print_header()
+    redraw_screen()
 
     if not top_10_list:
         print(f"No results found on the Leaderboard.")
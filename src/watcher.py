@@ -0,0 +1,184 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# inotify flags, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+RESCAN_MASK = IN_Q_OVERFLOW | IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII") # watch descriptor, mask, cookie, length of the name
+READ_SIZE = 64 * 1024
+
+def is_quiz_filename(filename):
+    """
+    this function tells if a file of the quiz folder is a quiz (the same rule used by the catalog)
+
+    args:
+        filename (str): the name of the file (example: "quiz1.json")
+
+    returns:
+        bool: true for the JSON files, except the leaderboard (temporary files of the atomic writes end
+              with '.tmp', so they are ignored)
+    """
+    return filename.endswith(".json") and filename != "leaderboard.json"
+
+class PollingWatcher:
+    """
+    a watcher that finds the changes by reading the folder with os.scandir and comparing the mtime and
+    the size of every quiz with the previous poll (no file is opened)
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._seen = self._scan()
+
+    def _scan(self):
+        """
+        this function gives back filename -> (mtime_ns, size) of every quiz in the folder
+        """
+        seen = {}
+
+        try:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not is_quiz_filename(entry.name):
+                        continue
+
+                    try:
+                        file_stat = entry.stat()
+                    except OSError:
+                        continue
+
+                    seen[entry.name] = (file_stat.st_mtime_ns, file_stat.st_size)
+        except OSError:
+            pass
+
+        return seen
+
+    def poll(self):
+        """
+        this function gives back the changes since the last poll
+
+        returns:
+            list[tuple[str, str]]: ("changed", filename) for new or modified quizzes and ("deleted", filename)
+                                   for removed ones
+        """
+        seen = self._scan()
+        events = [("changed", filename) for filename, signature in seen.items() if self._seen.get(filename) != signature]
+        events.extend(("deleted", filename) for filename in self._seen.keys() - seen.keys())
+        self._seen = seen
+
+        return events
+
+    def close(self):
+        """
+        this function stops the watcher (nothing to release for the polling one)
+        """
+        pass
+
+class InotifyWatcher:
+    """
+    a watcher that gets the changes from the linux kernel (inotify, called through ctypes): a poll reads
+    only the events that happened, without looking at the files that did not change
+
+    raises:
+        OSError: if inotify is not available or the folder cannot be watched
+    """
+
+    def __init__(self, directory):
+        library_name = ctypes.util.find_library("c")
+
+        if not sys.platform.startswith("linux") or library_name is None:
+            raise OSError("inotify is not available on this system")
+
+        libc = ctypes.CDLL(library_name, use_errno=True)
+
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this system")
+
+        self.directory = directory
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK) < 0:
+            error_number = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error_number, os.strerror(error_number), directory)
+
+    def poll(self):
+        """
+        this function gives back the changes since the last poll, without blocking
+
+        returns:
+            list[tuple[str, str]]: ("changed", filename) for new or modified quizzes, ("deleted", filename)
+                                   for removed ones, and ("rescan", None) if some events were lost (the
+                                   kernel queue was full or the folder itself was moved)
+        """
+        events = []
+
+        while True:
+            try:
+                buffer = os.read(self._fd, READ_SIZE)
+            except BlockingIOError:
+                break
+
+            if not buffer:
+                break
+
+            offset = 0
+
+            while offset < len(buffer):
+                _, mask, _, name_length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                filename = os.fsdecode(buffer[offset:offset + name_length].rstrip(b"\0"))
+                offset += name_length
+
+                if mask & RESCAN_MASK:
+                    events.append(("rescan", None))
+                elif not is_quiz_filename(filename):
+                    continue
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    events.append(("deleted", filename))
+                else:
+                    # atomic writes show up as IN_MOVED_TO, other editors as IN_CLOSE_WRITE
+                    events.append(("changed", filename))
+
+        return events
+
+    def close(self):
+        """
+        this function stops the watcher and releases its file descriptor
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+def open_watcher(directory):
+    """
+    this function starts watching a quiz folder, with inotify when the system has it and with a
+    polling watcher otherwise
+
+    args:
+        directory (str): the folder to watch (example: "data")
+
+    returns:
+        InotifyWatcher or PollingWatcher: the watcher, its poll() method gives back the changes
+    """
+    try:
+        return InotifyWatcher(directory)
+    except OSError:
+        return PollingWatcher(directory)